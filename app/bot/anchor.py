@@ -8,16 +8,21 @@ from aiogram.exceptions import TelegramBadRequest
 from aiogram.types import Message, CallbackQuery, InlineKeyboardMarkup, InlineKeyboardButton
 
 from app.repositories.ui_sessions import UiSessionsRepo
-from app.repositories.users import UsersRepo
+from app.repositories.users import LangCache, UsersRepo
 from app.repositories.profiles import ProfilesRepo
 from app.repositories.favorites import FavoritesRepo
 from app.repositories.applied import AppliedRepo
+from app.repositories.blacklist import BlacklistRepo
 from app.repositories.shortkeys import ShortKeysRepo
+from app.repositories.result_sets import ResultSetsRepo
+from app.repositories.shown import ShownRepo, load_exclusions
 from app.infra.redis import KeyValueStore
+from app.infra.search_index import VacancyIndex, search_pages
 from app.config import AppConfig
 from app.integrations.adzuna_client import AdzunaClient
-from app.domain.models import Profile as DProfile, SearchParams
-from app.domain.pipeline import process
+from app.plugins.rankers import Ranker
+from app.domain.models import Card, Profile as DProfile, SearchParams
+from app.domain.pipeline import process, process_pages
 
 
 router = Router()
@@ -61,7 +66,12 @@ async def _ensure_anchor_and_state(msg: Message, session) -> tuple[int, dict[str
     row = await repo.get(msg.chat.id, msg.from_user.id)
     if row and row.anchor_message_id:
         # reuse existing state
-        return row.anchor_message_id, {"screen_state": row.screen_state, "payload": row.payload}
+        return row.anchor_message_id, {
+            "screen_state": row.screen_state,
+            "payload": row.payload,
+            "result_set_id": row.result_set_id,
+            "cursor": row.cursor,
+        }
     # Create anchor message with welcome content
     lang = "ru"
     welcome = _L(
@@ -73,7 +83,22 @@ async def _ensure_anchor_and_state(msg: Message, session) -> tuple[int, dict[str
     sent = await msg.answer(welcome, reply_markup=kb)
     await repo.upsert(msg.chat.id, msg.from_user.id, anchor_message_id=sent.message_id, screen_state="welcome", payload={})
     await session.commit()
-    return sent.message_id, {"screen_state": "welcome", "payload": {}}
+    return sent.message_id, {"screen_state": "welcome", "payload": {}, "result_set_id": None, "cursor": 0}
+
+
+def _card_company(card: Card) -> str:
+    if card.get("company"):
+        return card["company"]
+    # Cards saved before they carried "company": title is "<title> — <company>"
+    title = card.get("title", "")
+    return title.split(" — ", 1)[1] if " — " in title else ""
+
+
+async def _session_cards(store: KeyValueStore, result_set_id: str | None, cursor: int, payload: dict[str, Any]) -> tuple[list[Card], int]:
+    if result_set_id:
+        return await ResultSetsRepo(store).load(result_set_id), cursor
+    # Sessions saved before result sets kept cards inline
+    return payload.get("cards", []), int(payload.get("cursor", 0))
 
 
 async def _edit_anchor(cq_or_msg: CallbackQuery | Message, anchor_id: int, text: str, kb: InlineKeyboardMarkup | None = None):
@@ -105,11 +130,14 @@ def _render_menu(lang: str) -> tuple[str, InlineKeyboardMarkup]:
 
 
 @router.message(F.text == "/start")
-async def on_start(m: Message, session, t, lang: str):
+async def on_start(m: Message, session, store: KeyValueStore, t, lang: str):
     anchor_id, state = await _ensure_anchor_and_state(m, session)
     if state["screen_state"] != "welcome":
         # Repaint last state on same anchor
-        text, kb = _render_screen(lang, state["screen_state"], state["payload"])
+        cards, cursor = None, 0
+        if state["screen_state"] == "search_card":
+            cards, cursor = await _session_cards(store, state["result_set_id"], state["cursor"], state["payload"])
+        text, kb = _render_screen(lang, state["screen_state"], state["payload"], cards, cursor)
         await _edit_anchor(m, anchor_id, text, kb)
     # else already shows welcome
 
@@ -142,11 +170,13 @@ async def on_lang_set(cq: CallbackQuery, session, store: KeyValueStore):
     await _edit_anchor(cq, row.anchor_message_id or cq.message.message_id, text, kb)
     await ui.set_state(cq.message.chat.id, cq.from_user.id, screen_state="settings_step_1", payload=payload)
     await session.commit()
+    # After commit, so the next read on any replica loads the new row
+    await LangCache(store).invalidate(cq.from_user.id)
     await cq.answer("")
 
 
 @router.callback_query(F.data == "lang:toggle")
-async def on_lang_toggle(cq: CallbackQuery, session):
+async def on_lang_toggle(cq: CallbackQuery, session, store: KeyValueStore):
     # Toggle and re-render current screen
     users = UsersRepo(session)
     cur = await users.get_lang(cq.from_user.id)
@@ -154,9 +184,13 @@ async def on_lang_toggle(cq: CallbackQuery, session):
     await users.set_lang(cq.from_user.id, new)
     ui = UiSessionsRepo(session)
     row = await ui.upsert(cq.message.chat.id, cq.from_user.id)
-    text, kb = _render_screen(new, row.screen_state, row.payload)
+    cards, cursor = None, 0
+    if row.screen_state == "search_card":
+        cards, cursor = await _session_cards(store, row.result_set_id, row.cursor, row.payload)
+    text, kb = _render_screen(new, row.screen_state, row.payload, cards, cursor)
     await _edit_anchor(cq, row.anchor_message_id or cq.message.message_id, text, kb)
     await session.commit()
+    await LangCache(store).invalidate(cq.from_user.id)
     await cq.answer("")
 
 
@@ -393,7 +427,7 @@ def _render_card(lang: str, card: dict[str, str], payload: dict[str, Any]) -> tu
     return text, kb
 
 
-def _render_screen(lang: str, state: str, payload: dict[str, Any]) -> tuple[str, InlineKeyboardMarkup]:
+def _render_screen(lang: str, state: str, payload: dict[str, Any], cards: list[Card] | None = None, cursor: int = 0) -> tuple[str, InlineKeyboardMarkup]:
     if state == "welcome":
         return _render_welcome(lang)
     if state == "menu":
@@ -410,13 +444,13 @@ def _render_screen(lang: str, state: str, payload: dict[str, Any]) -> tuple[str,
         step = int(state.split("_")[-1])
         return _render_settings_step(lang, step, payload)
     if state == "search_card":
-        cards = payload.get("cards", [])
-        idx = int(payload.get("cursor", 0))
+        if cards is None:
+            cards, cursor = payload.get("cards", []), int(payload.get("cursor", 0))
         if not cards:
             empty = _L(lang, "😕 Подходящих вакансий нет.", "😕 No matching jobs.")
             kb = InlineKeyboardMarkup(inline_keyboard=[_footer_row(lang)])
             return empty, kb
-        return _render_card(lang, cards[idx], payload)
+        return _render_card(lang, cards[min(max(cursor, 0), len(cards) - 1)], payload)
     if state == "about":
         txt = _L(lang,
                  "ℹ️ О боте\nЯ показываю вакансии из Adzuna, убираю шум и сортирую по релевантности. Профиль и фильтры можно менять в любой момент. Ничего лишнего — сразу ссылка на отклик.",
@@ -586,8 +620,11 @@ async def settings_finalize(cq: CallbackQuery, session, t, lang: str):
 
 
 @router.callback_query(F.data.in_({"menu:search", "search:quick"}))
-async def search_direct(cq: CallbackQuery, session, cfg: AppConfig, adzuna: AdzunaClient, store: KeyValueStore, t, lang: str):
-    await search_show(cq, session, cfg, adzuna, store, t, lang)
+async def search_direct(
+    cq: CallbackQuery, session, cfg: AppConfig, adzuna: AdzunaClient, store: KeyValueStore, t, lang: str,
+    index: VacancyIndex | None = None, ranker: Ranker | None = None,
+):
+    await search_show(cq, session, cfg, adzuna, store, t, lang, index, ranker)
 
 
 # Filters interactions
@@ -742,7 +779,10 @@ async def menu_profile(cq: CallbackQuery, session, t, lang: str):
 
 
 @router.callback_query(F.data == "search:show")
-async def search_show(cq: CallbackQuery, session, cfg: AppConfig, adzuna: AdzunaClient, store: KeyValueStore, t, lang: str):
+async def search_show(
+    cq: CallbackQuery, session, cfg: AppConfig, adzuna: AdzunaClient, store: KeyValueStore, t, lang: str,
+    index: VacancyIndex | None = None, ranker: Ranker | None = None,
+):
     ui = UiSessionsRepo(session)
     row = await ui.upsert(cq.message.chat.id, cq.from_user.id)
     payload = row.payload or {"filters": {}}
@@ -762,38 +802,49 @@ async def search_show(cq: CallbackQuery, session, cfg: AppConfig, adzuna: Adzuna
         formats=prof.formats if prof and prof.formats else [],
         experience_yrs=prof.experience_yrs if prof and prof.experience_yrs else 0,
     )
+    seen, blocked = await load_exclusions(session, cfg.search.seen_days, cq.from_user.id)
+    # Free the pooled connection while Adzuna is fetched
+    await session.commit()
     params = SearchParams(max_days_old=cfg.search.max_days_old_default, sort="relevance")
     try:
-        results = await adzuna.search(
-            "gb",
-            1,
-            cfg.search.results_per_page,
-            what=profile.role or None,
-            where=(payload.get("filters", {}).get("where") or None),
-            sort=params.sort,
-            max_days_old=params.max_days_old,
-            salary_min=profile.salary_min or None,
+        pr = await process_pages(
+            search_pages(
+                index,
+                adzuna,
+                store,
+                cfg,
+                params,
+                what=profile.role or None,
+                where=(payload.get("filters", {}).get("where") or None),
+                salary_min=profile.salary_min or None,
+            ),
+            profile,
+            params,
+            cfg,
+            enough=cfg.search.enough_cards,
+            seen=seen,
+            blocked=blocked,
+            ranker=ranker,
         )
     except Exception:
-        results = []
-    pr = process(results, profile, params, cfg)
+        pr = process([], profile, params, cfg)
     cards = pr["cards"][:5]
-    payload["cards"] = cards
-    payload["cursor"] = 0
-    await ui.upsert(cq.message.chat.id, cq.from_user.id, screen_state="search_card", payload=payload)
-    text, kb = _render_screen(lang, "search_card", payload)
+    # Only the first card is on screen; card_nav records the others as they are shown
+    await ShownRepo(session, cfg.search.seen_days).record(cq.from_user.id, [c.get("vacancy_hash", "") for c in cards[:1]])
+    rs_id = await ResultSetsRepo(store, cfg.search.result_set_ttl_seconds).save(cards)
+    await ui.set_results(cq.message.chat.id, cq.from_user.id, rs_id)
+    text, kb = _render_screen(lang, "search_card", payload, cards, 0)
     await _edit_anchor(cq, anchor_id, text, kb)
     await session.commit()
     await cq.answer("")
 
 
 @router.callback_query(F.data.in_({"card:next", "card:prev", "card:summary"}))
-async def card_nav(cq: CallbackQuery, session, t, lang: str):
+async def card_nav(cq: CallbackQuery, session, cfg: AppConfig, store: KeyValueStore, t, lang: str):
     ui = UiSessionsRepo(session)
-    row = await ui.upsert(cq.message.chat.id, cq.from_user.id)
+    row = await ui.get(cq.message.chat.id, cq.from_user.id) or await ui.upsert(cq.message.chat.id, cq.from_user.id)
     payload = row.payload or {}
-    cards = payload.get("cards", [])
-    idx = int(payload.get("cursor", 0))
+    cards, idx = await _session_cards(store, row.result_set_id, row.cursor, payload)
     if cq.data == "card:next" and cards:
         idx = min(idx + 1, len(cards) - 1)
     elif cq.data == "card:prev" and cards:
@@ -805,9 +856,17 @@ async def card_nav(cq: CallbackQuery, session, t, lang: str):
         await session.commit()
         await cq.answer("")
         return
-    payload["cursor"] = idx
-    await ui.upsert(cq.message.chat.id, cq.from_user.id, screen_state="search_card", payload=payload)
-    text, kb = _render_screen(lang, "search_card", payload)
+    if not row.result_set_id and cards:
+        # Move inline cards of an older session into the result-set store once
+        rs = ResultSetsRepo(store, cfg.search.result_set_ttl_seconds)
+        await ui.set_results(cq.message.chat.id, cq.from_user.id, await rs.save(cards))
+    await ui.set_cursor(cq.message.chat.id, cq.from_user.id, idx)
+    if int(row.payload.get("seen_upto", 0)) < idx < len(cards):
+        # Record each card once, the first time paging reaches it; the mark
+        # rides along in the UI-session write
+        await ShownRepo(session, cfg.search.seen_days).record(cq.from_user.id, [cards[idx].get("vacancy_hash", "")])
+        row.payload["seen_upto"] = idx
+    text, kb = _render_screen(lang, "search_card", payload, cards, idx)
     await _edit_anchor(cq, row.anchor_message_id or cq.message.message_id, text, kb)
     await session.commit()
     await cq.answer("")
@@ -818,8 +877,7 @@ async def card_actions(cq: CallbackQuery, session, store: KeyValueStore, t, lang
     ui = UiSessionsRepo(session)
     row = await ui.upsert(cq.message.chat.id, cq.from_user.id)
     payload = row.payload or {}
-    cards = payload.get("cards", [])
-    idx = int(payload.get("cursor", 0))
+    cards, idx = await _session_cards(store, row.result_set_id, row.cursor, payload)
     card = cards[idx] if 0 <= idx < len(cards) else None
     if not card:
         await cq.answer("")
@@ -835,7 +893,7 @@ async def card_actions(cq: CallbackQuery, session, store: KeyValueStore, t, lang
         applied.add(url)
         payload["applied_urls"] = list(applied)
         await ui.upsert(cq.message.chat.id, cq.from_user.id, screen_state="search_card", payload=payload)
-        text, kb = _render_screen(lang, "search_card", payload)
+        text, kb = _render_screen(lang, "search_card", payload, cards, idx)
         await _edit_anchor(cq, row.anchor_message_id or cq.message.message_id, text, kb)
         await session.commit()
         await cq.answer(_L(lang, "Готово", "Done"))
@@ -844,6 +902,10 @@ async def card_actions(cq: CallbackQuery, session, store: KeyValueStore, t, lang
         await session.commit()
         await cq.answer(_L(lang, "⭐ Сохранено", "⭐ Saved"))
     elif cq.data == "card:hide":
+        company = _card_company(card)
+        if company:
+            await BlacklistRepo(session).add(cq.from_user.id, company)
+            await session.commit()
         await cq.answer(_L(lang, "🙈 Скрыто", "🙈 Hidden"))
     elif cq.data == "card:similar":
         await cq.answer(_L(lang, "🧭 Похожие (демо)", "🧭 Similar (demo)"))
@@ -27,7 +27,11 @@ async def handle_action(cq: CallbackQuery, data: str | None, session, store: Key
         await session.commit()
         await cq.answer(t("actions.saved"), show_alert=False)
     elif act == "hide":
-        # Hides by company is part of pipeline; here only acknowledge
+        # The pipeline drops this company from later searches and digests
+        company = payload["args"].get("company") if payload else None
+        if company:
+            await BlacklistRepo(session).add(cq.from_user.id, company)
+            await session.commit()
         await cq.answer(t("actions.hidden"), show_alert=False)
     elif act == "report" and url:
         # For brevity, just ack
@@ -9,11 +9,13 @@ import httpx
 from app.bot.fsm_states import SearchFSM
 from app.bot.keyboards import card_kb
 from app.config import AppConfig
-from app.domain.models import Profile as DProfile, SearchParams
-from app.domain.pipeline import process
+from app.domain.models import SearchParams
+from app.domain.pipeline import process_pages
 from app.integrations.adzuna_client import AdzunaClient
-from app.repositories.profiles import ProfilesRepo
+from app.plugins.rankers import Ranker
+from app.repositories.profiles import ProfilesRepo, to_domain
 from app.repositories.shortkeys import ShortKeysRepo
+from app.repositories.shown import ShownRepo, load_exclusions
 from app.telemetry.logger import get_logger
 
 
@@ -72,6 +74,7 @@ async def find_cmd(
     t,
     lang: str,
     state: FSMContext,
+    ranker: Ranker | None = None,
 ):
     # Progress: three short steps
     await m.answer(t("search.progress.step1"))
@@ -85,26 +88,26 @@ async def find_cmd(
         await state.update_data(flow="search")
         await m.answer(t("profile.form.role"))
         return
-    profile = DProfile(
-        role=prof.role or "",
-        skills=prof.skills or [],
-        locations=prof.locations or [],
-        salary_min=prof.salary_min or 0,
-        salary_max=prof.salary_max,
-        formats=prof.formats or [],
-        experience_yrs=prof.experience_yrs or 0,
-    )
+    profile = to_domain(prof)
+    seen, blocked = await load_exclusions(session, cfg.search.seen_days, m.from_user.id)
+    # End the read transaction so the pooled connection is free during the Adzuna call
+    await session.commit()
     params = SearchParams(max_days_old=cfg.search.max_days_old_default, sort="relevance")
     try:
-        results = await adzuna.search(
-            "gb",
-            1,
-            cfg.search.results_per_page,
-            what=profile.role,
-            where=profile.locations[0] if profile.locations else None,
-            sort=params.sort,
-            max_days_old=params.max_days_old,
-            salary_min=profile.salary_min or None,
+        pr = await process_pages(
+            adzuna.search_pages(
+                params,
+                what=profile.role,
+                where=profile.locations[0] if profile.locations else None,
+                salary_min=profile.salary_min or None,
+            ),
+            profile,
+            params,
+            cfg,
+            enough=cfg.search.enough_cards,
+            seen=seen,
+            blocked=blocked,
+            ranker=ranker,
         )
     except ValueError as e:
         log.warning("search.invalid_params", err=str(e))
@@ -114,7 +117,6 @@ async def find_cmd(
         log.warning("search.api_error", err=str(e))
         await m.answer(t("search.api_error"))
         return
-    pr = process(results, profile, params, cfg)
     if not pr["cards"]:
         loc = profile.locations[0] if profile.locations else "—"
         msg = (
@@ -126,8 +128,10 @@ async def find_cmd(
         return
     sk = ShortKeysRepo(store)
     for c in pr["cards"][:5]:
-        key = await sk.generate({"act": "card", "args": {"url": c["apply_url"]}})
+        key = await sk.generate({"act": "card", "args": {"url": c["apply_url"], "company": c.get("company")}})
         await m.answer(_format_card_message(c, t), reply_markup=card_kb(c["apply_url"], key, t, lang))
+    await ShownRepo(session, cfg.search.seen_days).record(m.from_user.id, [c.get("vacancy_hash", "") for c in pr["cards"][:5]])
+    await session.commit()
 
     # Results summary
     shown = min(5, len(pr["cards"]))
@@ -148,6 +152,7 @@ async def search_start(
     t,
     lang: str,
     state: FSMContext | None = None,
+    ranker: Ranker | None = None,
 ):
     # Trigger same flow as /find
     await cq.message.answer(t("search.progress.step1"))
@@ -165,26 +170,26 @@ async def search_start(
             await cq.message.answer(t("search.sub"))
         await cq.answer("")
         return
-    profile = DProfile(
-        role=prof.role or "",
-        skills=prof.skills or [],
-        locations=prof.locations or [],
-        salary_min=prof.salary_min or 0,
-        salary_max=prof.salary_max,
-        formats=prof.formats or [],
-        experience_yrs=prof.experience_yrs or 0,
-    )
+    profile = to_domain(prof)
+    seen, blocked = await load_exclusions(session, cfg.search.seen_days, cq.from_user.id)
+    # End the read transaction so the pooled connection is free during the Adzuna call
+    await session.commit()
     params = SearchParams(max_days_old=cfg.search.max_days_old_default, sort="relevance")
     try:
-        results = await adzuna.search(
-            "gb",
-            1,
-            cfg.search.results_per_page,
-            what=profile.role,
-            where=profile.locations[0] if profile.locations else None,
-            sort=params.sort,
-            max_days_old=params.max_days_old,
-            salary_min=profile.salary_min or None,
+        pr = await process_pages(
+            adzuna.search_pages(
+                params,
+                what=profile.role,
+                where=profile.locations[0] if profile.locations else None,
+                salary_min=profile.salary_min or None,
+            ),
+            profile,
+            params,
+            cfg,
+            enough=cfg.search.enough_cards,
+            seen=seen,
+            blocked=blocked,
+            ranker=ranker,
         )
     except ValueError as e:
         log.warning("search.invalid_params", err=str(e))
@@ -196,7 +201,6 @@ async def search_start(
         await cq.message.answer(t("search.api_error"))
         await cq.answer("")
         return
-    pr = process(results, profile, params, cfg)
     if not pr["cards"]:
         loc = profile.locations[0] if profile.locations else "—"
         msg = (
@@ -209,8 +213,10 @@ async def search_start(
         return
     sk = ShortKeysRepo(store)
     for c in pr["cards"][:5]:
-        key = await sk.generate({"act": "card", "args": {"url": c["apply_url"]}})
+        key = await sk.generate({"act": "card", "args": {"url": c["apply_url"], "company": c.get("company")}})
         await cq.message.answer(_format_card_message(c, t), reply_markup=card_kb(c["apply_url"], key, t, lang))
+    await ShownRepo(session, cfg.search.seen_days).record(cq.from_user.id, [c.get("vacancy_hash", "") for c in pr["cards"][:5]])
+    await session.commit()
     shown = min(5, len(pr["cards"]))
     total = len(pr["cards"])  # API total not available
     res_header = t("results.title")
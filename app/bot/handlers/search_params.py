@@ -11,10 +11,12 @@ from app.bot.fsm_states import SearchFSM
 from app.bot.keyboards import card_kb
 from app.config import AppConfig
 from app.domain.models import Profile as DProfile, SearchParams
-from app.domain.pipeline import process
+from app.domain.pipeline import process_pages
 from app.integrations.adzuna_client import AdzunaClient
+from app.plugins.rankers import Ranker
 from app.repositories.profiles import ProfilesRepo
 from app.repositories.shortkeys import ShortKeysRepo
+from app.repositories.shown import ShownRepo, load_exclusions
 from app.telemetry.logger import get_logger
 from .search import _format_card_message
 
@@ -78,6 +80,7 @@ async def handle_location(
     store,
     t,
     lang: str,
+    ranker: Ranker | None = None,
 ):
     txt = (m.text or "").strip()
     if not _valid_location(txt):
@@ -99,6 +102,7 @@ async def handle_location(
             formats=[],
             experience_yrs=0,
         )
+        seen, blocked = await load_exclusions(session, cfg.search.seen_days, m.from_user.id)
         await session.commit()
         profile = DProfile(
             role=role,
@@ -111,14 +115,19 @@ async def handle_location(
         )
         params = SearchParams(max_days_old=cfg.search.max_days_old_default, sort="relevance")
         try:
-            results = await adzuna.search(
-                "gb",
-                1,
-                cfg.search.results_per_page,
-                what=role,
-                where=txt,
-                sort=params.sort,
-                max_days_old=params.max_days_old,
+            pr = await process_pages(
+                adzuna.search_pages(
+                    params,
+                    what=role,
+                    where=txt,
+                ),
+                profile,
+                params,
+                cfg,
+                enough=cfg.search.enough_cards,
+                seen=seen,
+                blocked=blocked,
+                ranker=ranker,
             )
         except ValueError as e:
             log.warning("search.invalid_params", err=str(e))
@@ -131,7 +140,6 @@ async def handle_location(
             await state.clear()
             return
 
-        pr = process(results, profile, params, cfg)
         if not pr["cards"]:
             msg = (
                 t("search.no_results")
@@ -142,8 +150,10 @@ async def handle_location(
         else:
             sk = ShortKeysRepo(store)
             for c in pr["cards"][:5]:
-                key = await sk.generate({"act": "card", "args": {"url": c["apply_url"]}})
+                key = await sk.generate({"act": "card", "args": {"url": c["apply_url"], "company": c.get("company")}})
                 await m.answer(_format_card_message(c, t), reply_markup=card_kb(c["apply_url"], key, t, lang))
+            await ShownRepo(session, cfg.search.seen_days).record(m.from_user.id, [c.get("vacancy_hash", "") for c in pr["cards"][:5]])
+            await session.commit()
             shown = min(5, len(pr["cards"]))
             total = len(pr["cards"])
             res_header = t("results.title")
@@ -9,7 +9,8 @@ from app.bot.keyboards import (
     main_menu_kb,
     with_lang_row,
 )
-from app.repositories.users import UsersRepo
+from app.infra.redis import KeyValueStore
+from app.repositories.users import LangCache, UsersRepo
 
 
 router = Router()
@@ -21,10 +22,11 @@ async def start_cmd(m: Message, t):
 
 
 @router.callback_query(F.data.startswith("lang:"))
-async def set_lang(cq: CallbackQuery, t, session, state: FSMContext):
+async def set_lang(cq: CallbackQuery, t, session, store: KeyValueStore, state: FSMContext):
     lang = cq.data.split(":")[1]
     await UsersRepo(session).set_lang(cq.from_user.id, lang)
     await session.commit()
+    await LangCache(store).invalidate(cq.from_user.id)
     # Show main menu after language selection
     kb = with_lang_row(main_menu_kb(t), lang, t)
     await cq.message.edit_text(f"{t('start.lang_set')}\n\n{t('menu.title')}\n{t('menu.sub')}", reply_markup=kb)
@@ -0,0 +1,13 @@
+from __future__ import annotations
+
+import json
+from functools import lru_cache
+from pathlib import Path
+
+_DIR = Path(__file__).parent
+
+
+@lru_cache(maxsize=None)
+def load(lang: str) -> dict[str, str]:
+    """UI strings for ``lang`` (``ru`` or ``en``) from this package's JSON files."""
+    return json.loads((_DIR / f"{lang}.json").read_text("utf-8"))
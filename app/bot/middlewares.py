@@ -5,28 +5,32 @@ from typing import Any, Callable, Dict, Awaitable
 from aiogram import BaseMiddleware
 from aiogram.types import Message, CallbackQuery
 
-from app.repositories.users import UsersRepo
+from app.infra.db import LazySession
+from app.infra.redis import InMemoryStore, KeyValueStore
+from app.repositories.users import LangCache, UsersRepo
+from app.telemetry.metrics import counter
 
 
 class RateLimitMiddleware(BaseMiddleware):
-    def __init__(self, per_minute: int, store):
+    """Drops updates from users over ``per_minute`` in a sliding one-minute window.
+
+    Register it first so rejected updates never open a DB session.
+    """
+
+    def __init__(self, per_minute: int, store, kind: str = "msg"):
         super().__init__()
         self.limit = per_minute
         self.store = store
+        self.kind = kind
 
     async def __call__(self, handler: Callable[[Message, Dict[str, Any]], Awaitable[Any]], event: Message, data: Dict[str, Any]) -> Any:  # type: ignore[override]
         user_id = event.from_user.id if getattr(event, "from_user", None) else None
-        if user_id:
-            key = f"rate:{user_id}"
-            cur = await self.store.get(key)  # type: ignore[attr-defined]
-            count = int(cur or 0)
-            if count >= self.limit:
-                # drop silently
-                return
-            if count == 0:
-                await self.store.setex(key, 60, "1")  # type: ignore[attr-defined]
-            else:
-                await self.store.setex(key, 60, str(count + 1))  # naive TTL reset acceptable
+        if user_id and not await self.store.allow(f"rate:{self.kind}:{user_id}", self.limit, 60):
+            counter("ratelimit_dropped", kind=self.kind)
+            if isinstance(event, CallbackQuery):
+                # Stop the client spinner; the tap itself is dropped
+                await event.answer()
+            return
         return await handler(event, data)
 
 
@@ -36,26 +40,40 @@ class InjectSessionMiddleware(BaseMiddleware):
         self.session_factory = session_factory
 
     async def __call__(self, handler, event, data):  # type: ignore[override]
-        data["session"] = self.session_factory()
+        session = LazySession(self.session_factory)
+        data["session"] = session
         try:
             return await handler(event, data)
         finally:
-            await data["session"].close()
+            await session.close()
 
 
 class I18nMiddleware(BaseMiddleware):
-    def __init__(self, ru: dict[str, str], en: dict[str, str]):
+    def __init__(
+        self, ru: dict[str, str], en: dict[str, str], session_factory=None, store: KeyValueStore | None = None
+    ):
         super().__init__()
         self.ru = ru
         self.en = en
+        self.session_factory = session_factory
+        self.langs = LangCache(store if store is not None else InMemoryStore())
+
+    async def _lang(self, user_id: int, session) -> str | None:
+        u_lang = await self.langs.get(user_id)
+        if u_lang is not None:
+            return u_lang or None
+        # Cache miss: use the injected session, else a short-lived one
+        if session is not None:
+            return await UsersRepo(session).get_lang_cached(user_id, self.langs)
+        if self.session_factory is not None:
+            async with self.session_factory() as s:
+                return await UsersRepo(s).get_lang_cached(user_id, self.langs)
+        return None
 
     async def __call__(self, handler, event, data):  # type: ignore[override]
-        # load language from users repo if possible
-        session = data.get("session")
         lang = "ru"
-        if session and getattr(event, "from_user", None):
-            repo = UsersRepo(session)
-            u_lang = await repo.get_lang(event.from_user.id)
+        if getattr(event, "from_user", None):
+            u_lang = await self._lang(event.from_user.id, data.get("session"))
             if u_lang:
                 lang = u_lang
         t = self.ru if lang == "ru" else self.en
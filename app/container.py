@@ -13,8 +13,12 @@ from sqlalchemy.ext.asyncio import create_async_engine
 from app.config import AppConfig, Settings, load_app_config
 from app.infra.db import Base, make_engine, make_session_factory
 from app.infra.redis import InMemoryStore, KeyValueStore, RedisStore
+from app.infra.search_index import VacancyIndex, make_index
 from app.infra.dispatcher import Dispatcher
+from app.infra.throttle import OutgoingRateLimiter
 from app.integrations.adzuna_client import AdzunaClient
+from app.jobs.corpus import VacancyCorpus
+from app.plugins.rankers import Ranker, get_ranker
 from app.telemetry.logger import setup_logging
 
 
@@ -26,6 +30,9 @@ class Container:
     adzuna: AdzunaClient
     bot: Bot
     dp: Dispatcher
+    corpus: VacancyCorpus | None = None
+    index: VacancyIndex | None = None
+    ranker: Ranker | None = None
 
 
 async def build_container() -> Container:
@@ -42,7 +49,7 @@ async def build_container() -> Container:
         store = InMemoryStore()  # graceful degradation
 
     # DB
-    engine = make_engine(settings.POSTGRES_DSN)
+    engine = make_engine(settings.POSTGRES_DSN, cfg.db)
     try:
         async with engine.connect() as conn:
             await conn.execute(text("SELECT 1"))
@@ -52,9 +59,25 @@ async def build_container() -> Container:
             await conn.run_sync(Base.metadata.create_all)
     session_factory = make_session_factory(engine)
 
-    adzuna = AdzunaClient(settings, cfg)
+    # Resolved once and injected into handlers and the digest; fails fast on
+    # an unknown scoring.ranker name
+    ranker = get_ranker(cfg.scoring.ranker)
+    # The index reads the corpus, so it needs the corpus to be on
+    index = None
+    corpus = None
+    if cfg.corpus.enabled:
+        listeners = []
+        if cfg.index.enabled:
+            index = make_index(engine.dialect.name, session_factory, cfg.index)
+            await index.warm()
+            listeners.append(index.add)
+        if hasattr(ranker, "update"):
+            listeners.append(ranker.update)
+        corpus = VacancyCorpus(session_factory, cfg.corpus, listeners)
+    adzuna = AdzunaClient(settings, cfg, store, sink=corpus.add if corpus else None)
 
     bot = Bot(settings.BOT_TOKEN, default=DefaultBotProperties(parse_mode=ParseMode.HTML))
+    bot.session.middleware(OutgoingRateLimiter(store, cfg.ratelimit))
     # FSM storage backed by Redis; fallback to in-memory on failure
     try:
         dp_storage = RedisStorage.from_url(settings.REDIS_URL)
@@ -69,5 +92,10 @@ async def build_container() -> Container:
     dp["store"] = store
     dp["session_factory"] = session_factory
     dp["adzuna"] = adzuna
+    dp["index"] = index
+    dp["ranker"] = ranker
 
-    return Container(settings=settings, cfg=cfg, store=store, adzuna=adzuna, bot=bot, dp=dp)
+    return Container(
+        settings=settings, cfg=cfg, store=store, adzuna=adzuna, bot=bot, dp=dp, corpus=corpus, index=index,
+        ranker=ranker,
+    )
@@ -1,15 +1,121 @@
 from __future__ import annotations
 
-from collections import OrderedDict
-from typing import Iterable
+import hashlib
+import zlib
+from collections import defaultdict
+from typing import Iterable, Sequence
 
 from .models import NormalizedJob
 
+MINHASH_SIZE = 64  # bins; must be a power of two
+MIN_SHINGLES = 8  # shorter texts get no signature and are never near-duplicates
+_BIN_BITS = MINHASH_SIZE.bit_length() - 1
+
+
+def minhash(text: str) -> tuple[int, ...] | None:
+    """One-permutation MinHash of the 3-word shingles of ``text``.
+
+    Each shingle is hashed once; the low bits pick one of ``MINHASH_SIZE``
+    bins and the bin keeps the smallest remaining value. Empty bins borrow
+    from the next filled bin (rotation densification). Matching positions
+    between two signatures estimate the Jaccard similarity of the shingle sets.
+    """
+    ids = list(map(zlib.crc32, text.lower().encode().split()))
+    # hash() of an int tuple is not salted per process, unlike hash() of a str
+    shingles = {hash(t) & 0xFFFFFFFF for t in zip(ids, ids[1:], ids[2:])}
+    if len(shingles) < MIN_SHINGLES:
+        return None
+    mask = MINHASH_SIZE - 1
+    bins: list[int | None] = [None] * MINHASH_SIZE
+    for h in shingles:
+        b, v = h & mask, h >> _BIN_BITS
+        cur = bins[b]
+        if cur is None or v < cur:
+            bins[b] = v
+    sig = list(bins)
+    for i in range(MINHASH_SIZE):
+        if sig[i] is None:
+            # Offset by distance so a borrowed value never equals a native one
+            d = 1
+            while bins[(i + d) & mask] is None:
+                d += 1
+            sig[i] = bins[(i + d) & mask] + (d << 32)  # type: ignore[operator]
+    return tuple(sig)  # type: ignore[arg-type]
+
+
+def lsh_bands(threshold: float, size: int = MINHASH_SIZE) -> int:
+    """Number of LSH bands for ``threshold``.
+
+    Picks the most rows per band whose S-curve midpoint ``(1/b)**(1/r)`` is
+    still at or below ``threshold``, so pairs above it almost always share a
+    band while few dissimilar pairs do.
+    """
+    bands = size
+    rows = 1
+    while rows * 2 <= size and size % (rows * 2) == 0:
+        r = rows * 2
+        if (r / size) ** (1 / r) > threshold:
+            break
+        rows, bands = r, size // r
+    return bands
+
+
+def _similarity(a: Sequence[int], b: Sequence[int]) -> float:
+    return sum(x == y for x, y in zip(a, b)) / len(a)
+
+
+def collapse_near(jobs: list[NormalizedJob], threshold: float) -> list[NormalizedJob]:
+    """Merge jobs whose MinHash similarity is at least ``threshold``.
+
+    Signatures are bucketed by LSH band, so only jobs sharing a band are
+    compared. The first job of a group keeps its position; ``choose_better``
+    picks which copy fills it, and later jobs are compared with that copy.
+    Signatures are computed here, so only jobs that survived the filters and
+    exact dedup pay for them.
+    """
+    if threshold <= 0:
+        return jobs
+    bands = lsh_bands(threshold)
+    rows = MINHASH_SIZE // bands
+    out: list[NormalizedJob] = []
+    sigs: list[tuple[int, ...]] = []
+    buckets: dict[tuple[int, tuple[int, ...]], list[int]] = defaultdict(list)
+    for j in jobs:
+        sig = j.get("minhash")
+        if sig is None and j["description"]:
+            sig = j["minhash"] = minhash(j["description"])
+        if not sig:
+            out.append(j)
+            sigs.append(())
+            continue
+        keys = [(b, sig[b * rows : (b + 1) * rows]) for b in range(bands)]
+        cands = sorted({slot for k in keys for slot in buckets.get(k, ())})
+        slot = next((c for c in cands if _similarity(sigs[c], sig) >= threshold), None)
+        if slot is not None:
+            best = choose_better(out[slot], j)
+            if best is j:
+                out[slot] = j
+                sigs[slot] = sig
+                for k in keys:
+                    buckets[k].append(slot)
+            continue
+        slot = len(out)
+        out.append(j)
+        sigs.append(sig)
+        for k in keys:
+            buckets[k].append(slot)
+    return out
+
 
 def _triple_key(j: NormalizedJob) -> str:
     return f"{j['title'].lower()}|{j['company'].lower()}|{(j['city_region'] or '').lower()}"
 
 
+def vacancy_hash(j: NormalizedJob) -> str:
+    """Stable 64-bit id of a vacancy (title, company, place), as stored in ``shown_cache``."""
+    return hashlib.blake2b(_triple_key(j).encode(), digest_size=8).hexdigest()
+
+
 def choose_better(a: NormalizedJob, b: NormalizedJob) -> NormalizedJob:
     # Prefer wider salary range
     a_span = ((a.get("salary_max") or 0) - (a.get("salary_min") or 0))
@@ -20,30 +126,71 @@ def choose_better(a: NormalizedJob, b: NormalizedJob) -> NormalizedJob:
     return a if a["created"] >= b["created"] else b
 
 
-def deduplicate(jobs: Iterable[NormalizedJob]) -> list[NormalizedJob]:
-    by_url: dict[str, NormalizedJob] = OrderedDict()
-    by_triple: dict[str, NormalizedJob] = OrderedDict()
+class Deduplicator:
+    """Incremental form of ``deduplicate``: feed jobs one by one, read survivors at the end.
 
-    for j in jobs:
+    Jobs sharing a URL or a title|company|city triple are merged, transitively,
+    with a union-find over groups numbered in first-seen order; each group
+    keeps its ``choose_better`` winner. With ``near_threshold`` > 0 survivors
+    are also collapsed by ``collapse_near``.
+    """
+
+    def __init__(self, near_threshold: float = 0.0) -> None:
+        self.near_threshold = near_threshold
+        self.seen = 0
+        self.groups = 0  # exact-duplicate groups so far, before near collapsing
+        self._parent: list[int] = []
+        self._best: list[NormalizedJob] = []
+        self._by_url: dict[str, int] = {}
+        self._by_triple: dict[str, int] = {}
+
+    def _find(self, g: int) -> int:
+        parent = self._parent
+        root = g
+        while parent[root] != root:
+            root = parent[root]
+        while parent[g] != root:
+            parent[g], g = root, parent[g]
+        return root
+
+    def add(self, j: NormalizedJob) -> None:
+        self.seen += 1
         url = j.get("redirect_url") or ""
+        triple = _triple_key(j)
+        hits = []
+        g = self._by_triple.get(triple)
+        if g is not None:
+            hits.append(self._find(g))
         if url:
-            prev = by_url.get(url)
-            if prev:
-                by_url[url] = choose_better(prev, j)
-            else:
-                by_url[url] = j
-        t = _triple_key(j)
-        prev_t = by_triple.get(t)
-        if prev_t:
-            by_triple[t] = choose_better(prev_t, j)
+            g = self._by_url.get(url)
+            if g is not None:
+                hits.append(self._find(g))
+        if not hits:
+            root = len(self._parent)
+            self._parent.append(root)
+            self._best.append(j)
+            self.groups += 1
         else:
-            by_triple[t] = j
+            # The oldest group absorbs the others so survivors keep first-seen order
+            root = min(hits)
+            for other in sorted(set(hits)):
+                if other != root:
+                    self._parent[other] = root
+                    self.groups -= 1
+                    self._best[root] = choose_better(self._best[root], self._best[other])
+            self._best[root] = choose_better(self._best[root], j)
+        self._by_triple[triple] = root
+        if url:
+            self._by_url[url] = root
 
-    # Merge preferring url dict (keeps order)
-    merged: dict[str, NormalizedJob] = OrderedDict()
-    for j in by_url.values():
-        merged[j["redirect_url"]] = j
-    for j in by_triple.values():
-        merged.setdefault(j["redirect_url"] or _triple_key(j), j)
-    return list(merged.values())
+    def result(self) -> list[NormalizedJob]:
+        parent, best = self._parent, self._best
+        exact = [best[g] for g in range(len(parent)) if parent[g] == g]
+        return collapse_near(exact, self.near_threshold)
 
+
+def deduplicate(jobs: Iterable[NormalizedJob], near_threshold: float = 0.0) -> list[NormalizedJob]:
+    d = Deduplicator(near_threshold)
+    for j in jobs:
+        d.add(j)
+    return d.result()
@@ -1,40 +1,38 @@
 from __future__ import annotations
 
-import re
 from datetime import datetime, timezone
 from typing import Iterable
 
 from .models import NormalizedJob, Profile, SearchParams
+from .normalization import UNKNOWN_COMPANY
+from .patterns import is_remote
+from .skills import SkillHits, matcher_for, normalize_skill, normalize_text
 
 
-REMOTE_MARKERS = [
-    "remote",
-    "remotely",
-    "удаленно",
-    "home office",
-]
+_UNKNOWN_KEY = UNKNOWN_COMPANY.casefold()
+
+
+def normalize_company(name: str) -> str:
+    """Key a company is blacklisted and matched under: casefolded, single-spaced.
+
+    The placeholder for vacancies without a company maps to ``""`` so it is
+    never blacklisted (and never matches).
+    """
+    key = " ".join(name.casefold().split())
+    return "" if key == _UNKNOWN_KEY else key
 
 
 def _normalize_skill(s: str) -> str:
-    s = s.strip().lower()
-    s = s.replace("javascript", "js")
-    s = s.replace("typescript", "ts")
-    return s
+    return normalize_skill(s)
 
 
 def skill_matches(text: str, skills: Iterable[str]) -> int:
-    t = text.lower().replace("javascript", "js").replace("typescript", "ts")
-    count = 0
-    for sk in skills:
-        skn = _normalize_skill(sk)
-        if re.search(rf"\b{re.escape(skn)}\b", t):
-            count += 1
-    return count
+    m = matcher_for(skills)
+    return m.count(m.find(normalize_text(text)))
 
 
 def has_remote_marker(text: str) -> bool:
-    t = text.lower()
-    return any(m in t for m in REMOTE_MARKERS)
+    return is_remote(text)
 
 
 def location_ok(job: NormalizedJob, profile: Profile, params: SearchParams) -> bool:
@@ -44,7 +42,7 @@ def location_ok(job: NormalizedJob, profile: Profile, params: SearchParams) -> b
         locs.append(params.where.lower())
     if job["city_region"].lower() in locs:
         return True
-    if has_remote_marker(job["description"]):
+    if job["is_remote"]:
         return True
     return False
 
@@ -56,15 +54,11 @@ def salary_ok(job: NormalizedJob, profile: Profile, params: SearchParams) -> boo
     min_job = job.get("salary_min")
     max_job = job.get("salary_max")
     if min_job is None and max_job is None:
-        # allow when unspecified but negotiable marker present
-        if re.search(r"competitive|negotiable|market rate|по договоренности", job["description"], re.I):
-            return True
-        return True  # be permissive in filter; ranking will penalize
+        # be permissive in filter whether or not negotiable; ranking will penalize
+        return True
     # explicit numbers
     if max_job is not None and max_job < min_required:
-        if re.search(r"competitive|negotiable|market rate|по договоренности", job["description"], re.I):
-            return True
-        return False
+        return job["is_negotiable"]
     if min_job is not None and min_job < min_required and (max_job or 0) < min_required:
         return False
     return True
@@ -87,18 +81,22 @@ def age_ok(job: NormalizedJob, params: SearchParams) -> bool:
     return (now - job["created"]).days <= params.max_days_old
 
 
-def passes_filters(job: NormalizedJob, profile: Profile, params: SearchParams) -> bool:
+def prefilter_ok(job: NormalizedJob, params: SearchParams) -> bool:
+    """Checks that do not need the job description (see ``normalize_head``)."""
+    return contract_ok(job, params, job.get("category_label")) and age_ok(job, params)
+
+
+def passes_filters(
+    job: NormalizedJob, profile: Profile, params: SearchParams, hits: SkillHits | None = None
+) -> bool:
+    """Checks that need the description; callers run ``prefilter_ok`` first."""
     # skills: need >=2 matches across title + description
-    skills = profile.skills
-    m = skill_matches(job["title"] + " " + job["description"], skills)
+    matcher = matcher_for(profile.skills)
+    if hits is None:
+        hits = matcher.match(job)
+    m = matcher.count(hits.title | hits.desc)
     if m < 2:
         return False
     if not location_ok(job, profile, params):
         return False
-    if not salary_ok(job, profile, params):
-        return False
-    if not contract_ok(job, params, job.get("category_label")):
-        return False
-    if not age_ok(job, params):
-        return False
-    return True
+    return salary_ok(job, profile, params)
@@ -50,6 +50,7 @@ class NormalizedJob(TypedDict):
     title: str
     company: str
     city_region: str
+    location: str  # Adzuna's full location display name, e.g. "Hackney, London"
     created: datetime
     posted_at_human: str
     redirect_url: str
@@ -59,6 +60,12 @@ class NormalizedJob(TypedDict):
     category_label: str | None
     category_tag: str | None
     description: str
+    # Features extracted once during normalization (see app.domain.patterns)
+    is_remote: bool
+    is_negotiable: bool
+    is_clickbait: bool
+    # MinHash of description shingles, filled in lazily by app.domain.dedup.collapse_near
+    minhash: tuple[int, ...] | None
 
 
 class Card(TypedDict):
@@ -67,6 +74,8 @@ class Card(TypedDict):
     summary: str
     apply_url: str
     short_reason: str
+    vacancy_hash: NotRequired[str]
+    company: NotRequired[str]
 
 
 class PipelineResult(TypedDict):
@@ -74,3 +83,5 @@ class PipelineResult(TypedDict):
     shown: int
     filtered_out_by_rules: int
     duplicates_removed: int
+    already_seen: NotRequired[int]
+    debug: NotRequired[dict[str, float]]  # stage -> seconds, sampled runs only
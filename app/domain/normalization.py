@@ -6,8 +6,12 @@ from datetime import datetime, timezone
 from typing import Iterable
 
 from .models import AdzunaRaw, NormalizedJob
+from .patterns import is_clickbait, is_negotiable, is_remote
 
 
+# Company shown for vacancies that do not name one
+UNKNOWN_COMPANY = "Компания не указана"
+
 _TAG_RE = re.compile(r"<[^>]+>")
 _MD_RE = re.compile(r"(^|\s)[*_#>`~]{1,3}")
 _WS_RE = re.compile(r"\s+")
@@ -64,20 +68,33 @@ def summary_from_description(desc: str, limit: int = 300) -> str:
     return cut
 
 
-def normalize_item(raw: AdzunaRaw) -> NormalizedJob:
+def attach_description(job: NormalizedJob, raw: AdzunaRaw) -> None:
+    """Strip the raw description into ``job`` and extract the description features."""
+    desc = _strip_text(raw.get("description", ""))
+    job["description"] = desc
+    job["is_remote"] = is_remote(desc)
+    job["is_negotiable"] = is_negotiable(desc)
+
+
+def normalize_head(raw: AdzunaRaw) -> NormalizedJob:
+    """Normalize every field except the (long) description, which is left empty
+    together with its features until ``attach_description``.
+
+    Lets callers run cheap filters before paying for HTML stripping.
+    """
     created = datetime.fromisoformat(raw["created"]).astimezone(timezone.utc)
     title = _strip_text(raw.get("title", "").strip())
-    company = _strip_text(raw.get("company", {}).get("display_name", "") or "Компания не указана")
+    company = _strip_text(raw.get("company", {}).get("display_name", "") or UNKNOWN_COMPANY)
     loc_display = _strip_text(raw.get("location", {}).get("display_name", ""))
     city_region = _first_city_region(loc_display)
     salary_min = int(raw.get("salary_min") or 0) or None
     salary_max = int(raw.get("salary_max") or 0) or None
-    desc = _strip_text(raw.get("description", ""))
     category = raw.get("category") or {}
     return {
         "title": title,
         "company": company,
         "city_region": city_region,
+        "location": loc_display,
         "created": created,
         "posted_at_human": _posted_human(created),
         "redirect_url": raw.get("redirect_url", ""),
@@ -86,6 +103,15 @@ def normalize_item(raw: AdzunaRaw) -> NormalizedJob:
         "salary_text": _salary_text(salary_min, salary_max),
         "category_label": category.get("label"),
         "category_tag": category.get("tag"),
-        "description": desc,
+        "description": "",
+        "is_remote": False,
+        "is_negotiable": False,
+        "is_clickbait": is_clickbait(title),
+        "minhash": None,
     }
 
+
+def normalize_item(raw: AdzunaRaw) -> NormalizedJob:
+    job = normalize_head(raw)
+    attach_description(job, raw)
+    return job
@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+import re
+
+
+# Precompiled once at import; matching is case-insensitive like the old inline calls
+REMOTE_RE = re.compile(r"remote|remotely|удаленно|home office", re.I)
+NEGOTIABLE_RE = re.compile(r"competitive|negotiable|market rate|по договоренности", re.I)
+CLICKBAIT_RE = re.compile(r"urgent|immediate start|limited time|superstar|rockstar|ninja", re.I)
+
+
+def is_remote(text: str) -> bool:
+    return REMOTE_RE.search(text) is not None
+
+
+def is_negotiable(text: str) -> bool:
+    return NEGOTIABLE_RE.search(text) is not None
+
+
+def is_clickbait(title: str) -> bool:
+    return CLICKBAIT_RE.search(title) is not None
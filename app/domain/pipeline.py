@@ -1,65 +1,235 @@
 from __future__ import annotations
 
-from typing import Iterable
+import heapq
+import random
+from contextlib import aclosing
+from datetime import datetime
+from time import perf_counter
+from typing import TYPE_CHECKING, AsyncGenerator, Container, Iterable, Iterator, Sequence
 
 from app.config import AppConfig
-from .dedup import deduplicate
-from .filters import passes_filters
+from .dedup import Deduplicator, vacancy_hash
+from .filters import normalize_company, passes_filters, prefilter_ok
 from .models import AdzunaRaw, Card, NormalizedJob, PipelineResult, Profile, SearchParams
-from .normalization import normalize_item, summary_from_description
-from .scoring import compute_score
+from .normalization import attach_description, normalize_head, summary_from_description
+from .scoring import compute_scores
+from .skills import SkillHits, SkillMatcher, matcher_for
 from app.plugins.postprocessors.enforce_salary_mix import enforce
+from app.telemetry.metrics import counter, observe
 
+if TYPE_CHECKING:
+    from app.plugins.rankers.base import Ranker
 
-def process(
+
+TOP_K = 50  # cap to reasonable number before pagination
+STAGES = ("normalize", "filter", "dedup", "score", "rank", "cards", "enforce")
+
+
+class _Counters:
+    __slots__ = ("filtered_out", "seen")
+
+    def __init__(self) -> None:
+        self.filtered_out = 0
+        self.seen = 0
+
+
+def _no_clock() -> float:
+    return 0.0
+
+
+def _filtered(
     items: Iterable[AdzunaRaw],
     profile: Profile,
     params: SearchParams,
-    cfg: AppConfig,
-) -> PipelineResult:
-    normalized: list[NormalizedJob] = [normalize_item(i) for i in items]
-
-    filtered: list[NormalizedJob] = []
-    filtered_out = 0
-    for j in normalized:
-        if passes_filters(j, profile, params):
-            filtered.append(j)
-        else:
-            filtered_out += 1
-
-    deduped = deduplicate(filtered)
-    dup_removed = len(filtered) - len(deduped)
-
-    scored = [
-        (j, compute_score(j, profile, cfg, params.category))
-        for j in deduped
-    ]
-
-    # Sort by score desc; tie-breakers: has salary > fresher
-    scored.sort(key=lambda x: (x[1], 1 if (x[0]["salary_min"] or x[0]["salary_max"]) else 0, x[0]["created"]), reverse=True)
-
-    cards: list[Card] = []
-    for j, sc in scored[:50]:  # cap to reasonable number before pagination
-        title_line = f"{j['title']} — {j['company']}"
-        subtitle = f"{j['city_region']} • {j['salary_text']} • {j['posted_at_human']}"
-        summary = summary_from_description(j["description"], 300)
-        short_reason = f"score={sc}"
-        cards.append(
-            {
-                "title": title_line,
-                "subtitle": subtitle,
-                "summary": summary,
-                "apply_url": j["redirect_url"],
-                "short_reason": short_reason,
-            }
-        )
+    matcher: SkillMatcher,
+    counters: _Counters,
+    seen: Container[str] | None,
+    blocked: Container[str] | None,
+    times: dict[str, float] | None = None,
+) -> Iterator[tuple[NormalizedJob, SkillHits]]:
+    # With ``times`` (sampled runs) each step's wall time is added to it;
+    # otherwise the clock is a no-op and the sums go to a throwaway dict
+    clock = perf_counter if times is not None else _no_clock
+    acc = times if times is not None else dict.fromkeys(STAGES, 0.0)
+    for raw in items:
+        t0 = clock()
+        j = normalize_head(raw)
+        t1 = clock()
+        acc["normalize"] += t1 - t0
+        # Age/category first so rejected jobs never pay for description stripping
+        if not prefilter_ok(j, params) or (blocked and normalize_company(j["company"]) in blocked):
+            acc["filter"] += clock() - t1
+            counters.filtered_out += 1
+            continue
+        if seen and vacancy_hash(j) in seen:
+            acc["filter"] += clock() - t1
+            counters.seen += 1
+            continue
+        t2 = clock()
+        acc["filter"] += t2 - t1
+        attach_description(j, raw)
+        t3 = clock()
+        acc["normalize"] += t3 - t2
+        h = matcher.match(j)
+        ok = passes_filters(j, profile, params, h)
+        acc["filter"] += clock() - t3
+        if not ok:
+            counters.filtered_out += 1
+            continue
+        yield j, h
+
 
-    cards = enforce(cards)
+def _rank_key(x: tuple[NormalizedJob, float]) -> tuple[float, int, datetime]:
+    # Score desc; tie-breakers: has salary > fresher
+    j, sc = x
+    return sc, 1 if (j["salary_min"] or j["salary_max"]) else 0, j["created"]
 
+
+def _card(j: NormalizedJob, sc: float) -> Card:
     return {
-        "cards": cards,
-        "shown": len(cards),
-        "filtered_out_by_rules": filtered_out,
-        "duplicates_removed": dup_removed,
+        "title": f"{j['title']} — {j['company']}",
+        "subtitle": f"{j['city_region']} • {j['salary_text']} • {j['posted_at_human']}",
+        "summary": summary_from_description(j["description"], 300),
+        "apply_url": j["redirect_url"],
+        "short_reason": f"score={sc}",
+        "vacancy_hash": vacancy_hash(j),
+        "company": j["company"],
     }
 
+
+class Pipeline:
+    """Incremental form of ``process``: ``feed`` raw batches as they arrive, then ``result``.
+
+    Jobs from companies in ``blocked`` (``normalize_company`` keys) and jobs
+    whose ``vacancy_hash`` is in ``seen`` (already shown to the user) are
+    dropped right after the cheap prefilter, before description and scoring.
+    ``ranker`` (the instance configured as ``scoring.ranker``) adds to scores.
+    """
+
+    def __init__(
+        self,
+        profile: Profile,
+        params: SearchParams,
+        cfg: AppConfig,
+        seen: Container[str] | None = None,
+        blocked: Container[str] | None = None,
+        ranker: Ranker | None = None,
+    ) -> None:
+        self.profile = profile
+        self.params = params
+        self.cfg = cfg
+        self.seen = seen
+        self.blocked = blocked
+        self.ranker = ranker
+        # One compiled matcher per profile; hits are shared by filter and scorer
+        self._matcher = matcher_for(profile.skills)
+        self._counters = _Counters()
+        self._dedup = Deduplicator(cfg.dedup.near_threshold)
+        self._hits: dict[int, SkillHits] = {}
+        # Sampled per-stage wall time; None keeps unsampled runs off the clock
+        rate = cfg.telemetry.pipeline_sample_rate
+        self._times: dict[str, float] | None = (
+            dict.fromkeys(STAGES, 0.0) if rate > 0 and random.random() < rate else None
+        )
+
+    def feed(self, items: Iterable[AdzunaRaw]) -> int:
+        """Consume a batch; return how many distinct jobs have passed the filters so far.
+
+        The count is of exact-duplicate groups; near-duplicates are only
+        collapsed in ``result``, so it can run slightly high.
+        """
+        times = self._times
+        clock = perf_counter if times is not None else _no_clock
+        passed = _filtered(
+            items, self.profile, self.params, self._matcher, self._counters, self.seen, self.blocked, times
+        )
+        dedup_time = 0.0
+        for j, h in passed:
+            t0 = clock()
+            self._dedup.add(j)
+            dedup_time += clock() - t0
+            self._hits[id(j)] = h
+        if times is not None:
+            times["dedup"] += dedup_time
+        return self._dedup.groups
+
+    def _lap(self, stage: str, since: float) -> float:
+        now = perf_counter()
+        if self._times is not None:
+            self._times[stage] += now - since
+        return now
+
+    def result(self) -> PipelineResult:
+        t = perf_counter()
+        deduped = self._dedup.result()
+        t = self._lap("dedup", t)
+        scores = compute_scores(
+            deduped,
+            self.profile,
+            self.cfg,
+            self.params.category,
+            [self._hits[id(j)] for j in deduped],
+            self.ranker,
+        )
+        t = self._lap("score", t)
+        scored = zip(deduped, scores)
+        # Bounded heap instead of a full sort; nlargest keeps sort stability
+        top = heapq.nlargest(TOP_K, scored, key=_rank_key)
+        t = self._lap("rank", t)
+        rendered = [_card(j, sc) for j, sc in top]
+        t = self._lap("cards", t)
+        cards = enforce(rendered)
+        self._lap("enforce", t)
+
+        res: PipelineResult = {
+            "cards": cards,
+            "shown": len(cards),
+            "filtered_out_by_rules": self._counters.filtered_out,
+            "duplicates_removed": self._dedup.seen - len(deduped),
+        }
+        if self.seen is not None:
+            res["already_seen"] = self._counters.seen
+            counter("pipeline_jobs", self._counters.seen, stage="already_seen")
+        counter("pipeline_runs")
+        counter("pipeline_jobs", res["filtered_out_by_rules"], stage="filtered_out_by_rules")
+        counter("pipeline_jobs", res["duplicates_removed"], stage="duplicates_removed")
+        counter("pipeline_jobs", res["shown"], stage="shown")
+        if self._times is not None:
+            for stage, secs in self._times.items():
+                observe("pipeline_stage_seconds", secs, stage=stage)
+            res["debug"] = dict(self._times)
+        return res
+
+
+def process(
+    items: Iterable[AdzunaRaw],
+    profile: Profile,
+    params: SearchParams,
+    cfg: AppConfig,
+    seen: Container[str] | None = None,
+    blocked: Container[str] | None = None,
+    ranker: Ranker | None = None,
+) -> PipelineResult:
+    pipe = Pipeline(profile, params, cfg, seen, blocked, ranker)
+    pipe.feed(items)
+    return pipe.result()
+
+
+async def process_pages(
+    pages: AsyncGenerator[Sequence[AdzunaRaw], None],
+    profile: Profile,
+    params: SearchParams,
+    cfg: AppConfig,
+    *,
+    enough: int,
+    seen: Container[str] | None = None,
+    blocked: Container[str] | None = None,
+    ranker: Ranker | None = None,
+) -> PipelineResult:
+    """Run ``pages`` through the pipeline as they arrive; stop once ``enough`` jobs pass."""
+    pipe = Pipeline(profile, params, cfg, seen, blocked, ranker)
+    async with aclosing(pages):
+        async for page in pages:
+            if pipe.feed(page) >= enough:
+                break
+    return pipe.result()
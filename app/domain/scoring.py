@@ -1,42 +1,50 @@
 from __future__ import annotations
 
-import re
 from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any, Callable, Sequence
 
-from app.config import AppConfig
+from app.config import AppConfig, ScoringWeights
 from .models import NormalizedJob, Profile
+from .skills import SkillHits, matcher_for, normalize_text
 
+if TYPE_CHECKING:
+    from app.plugins.rankers.base import Ranker
 
-CLICKBAIT_PATTERNS = [
-    r"urgent|immediate start|limited time|superstar|rockstar|ninja",
-]
+
+try:
+    import numpy as np
+except Exception:  # pragma: no cover - optional
+    np = None  # type: ignore[assignment]
 
 
 def _norm(text: str) -> str:
-    t = text.lower()
-    t = t.replace("javascript", "js").replace("typescript", "ts")
-    return t
+    return normalize_text(text)
 
 
-def title_desc_skill_score(job: NormalizedJob, profile: Profile) -> float:
+def title_desc_skill_score(
+    job: NormalizedJob, profile: Profile, hits: SkillHits | None = None
+) -> float:
     # TF in title (weight 2) and desc (1)
-    title = _norm(job["title"])
-    desc = _norm(job["description"])
-    skills = [_norm(s) for s in profile.skills]
-    if not skills:
+    if not profile.skills:
         return 0.0
-    title_hits = sum(2 for s in skills if re.search(rf"\b{re.escape(s)}\b", title))
-    desc_hits = sum(1 for s in skills if re.search(rf"\b{re.escape(s)}\b", desc))
-    tf = (title_hits + desc_hits) / (3 * len(skills))
+    matcher = matcher_for(profile.skills)
+    if hits is None:
+        hits = matcher.match(job)
+    title_hits = 2 * matcher.count(hits.title)
+    desc_hits = matcher.count(hits.desc)
+    tf = (title_hits + desc_hits) / (3 * len(profile.skills))
     return min(1.0, tf)
 
 
 def location_score(job: NormalizedJob, profile: Profile) -> float:
+    return _location_score(job, [p.lower() for p in profile.locations])
+
+
+def _location_score(job: NormalizedJob, prefs: list[str]) -> float:
     jr = (job["city_region"] or "").lower()
-    prefs = [p.lower() for p in profile.locations]
     if jr in prefs:
         return 1.0
-    if re.search(r"remote|remotely|удаленно|home office", job["description"], re.I):
+    if job["is_remote"]:
         return 1.0
     # region/country fuzzy fallback
     for p in prefs:
@@ -48,7 +56,7 @@ def location_score(job: NormalizedJob, profile: Profile) -> float:
 def salary_score(job: NormalizedJob, profile: Profile) -> float:
     min_required = profile.salary_min
     if job["salary_min"] is None and job["salary_max"] is None:
-        if re.search(r"competitive|negotiable|market rate|по договоренности", job["description"], re.I):
+        if job["is_negotiable"]:
             return 0.5
         return 0.2
     min_job = job.get("salary_min") or 0
@@ -62,9 +70,12 @@ def salary_score(job: NormalizedJob, profile: Profile) -> float:
     return 0.5
 
 
-def freshness_score(job: NormalizedJob) -> float:
-    now = datetime.now(timezone.utc)
-    days = (now - job["created"]).days
+def freshness_score(job: NormalizedJob, now: datetime | None = None) -> float:
+    now = now or datetime.now(timezone.utc)
+    return _freshness_from_days((now - job["created"]).days)
+
+
+def _freshness_from_days(days: int) -> float:
     if days <= 0:
         return 1.0
     if days == 1:
@@ -83,24 +94,82 @@ def category_score(job: NormalizedJob, preferred: str | None) -> float:
     return 1.0 if preferred.lower() in label else 0.0
 
 
-def is_clickbait(title: str) -> bool:
-    return any(re.search(p, title, re.I) for p in CLICKBAIT_PATTERNS)
+def _pick(cond: bool, a: float, b: float) -> float:
+    return a if cond else b
 
 
-def compute_score(job: NormalizedJob, profile: Profile, cfg: AppConfig, preferred_category: str | None) -> float:
-    w = cfg.scoring.weights
-    td = title_desc_skill_score(job, profile)
-    loc = location_score(job, profile)
-    sal = salary_score(job, profile)
-    fr = freshness_score(job)
-    cat = category_score(job, preferred_category)
+def _combine(
+    w: ScoringWeights, mult: float, td: Any, loc: Any, sal: Any, fr: Any, cat: Any, bait: Any, extra: Any,
+    where: Callable[..., Any] = _pick,
+) -> Any:
+    # One formula for scalars and NumPy columns; ``where`` is _pick or np.where
     score = (
-        w.title_desc * td + w.location * loc + w.salary * sal + w.freshness * fr + w.category * cat
+        w.title_desc * td + w.location * loc + w.salary * sal + w.freshness * fr + w.category * cat + extra
     )
     score = score / 100.0 * 100.0
-    if td < 0.4:
-        score = score * 0.7
-    if is_clickbait(job["title"]):
-        score = score * cfg.scoring.clickbait_multiplier
-    return round(score, 2)
-
+    score = score * where(td < 0.4, 0.7, 1.0)
+    return score * where(bait, mult, 1.0)
+
+
+def compute_score(
+    job: NormalizedJob,
+    profile: Profile,
+    cfg: AppConfig,
+    preferred_category: str | None,
+    hits: SkillHits | None = None,
+    ranker: Ranker | None = None,
+) -> float:
+    return compute_scores(
+        [job], profile, cfg, preferred_category, [hits] if hits is not None else None, ranker
+    )[0]
+
+
+def compute_scores(
+    jobs: Sequence[NormalizedJob],
+    profile: Profile,
+    cfg: AppConfig,
+    preferred_category: str | None,
+    hits: Sequence[SkillHits] | None = None,
+    ranker: Ranker | None = None,
+) -> list[float]:
+    """Score a whole batch.
+
+    Component columns are built once per batch (weights, ``now`` and profile
+    locations read once) and combined by ``_combine``; with NumPy available
+    freshness and the combine step run as vector operations. Without a
+    ``ranker`` this equals ``compute_score`` per job. ``ranker`` adds
+    ``scoring.ranker_weight`` times its score and sees the whole batch, so
+    until its corpus is warm its IDF comes from the batch.
+    """
+    if not jobs:
+        return []
+    now = datetime.now(timezone.utc)
+    prefs = [p.lower() for p in profile.locations]
+    td = [
+        title_desc_skill_score(j, profile, hits[i] if hits is not None else None)
+        for i, j in enumerate(jobs)
+    ]
+    loc = [_location_score(j, prefs) for j in jobs]
+    sal = [salary_score(j, profile) for j in jobs]
+    days = [(now - j["created"]).days for j in jobs]
+    cat = [category_score(j, preferred_category) for j in jobs]
+    bait = [j["is_clickbait"] for j in jobs]
+    rw = cfg.scoring.ranker_weight
+    extra = [rw * x for x in ranker.scores(jobs, profile)] if ranker is not None else [0.0] * len(jobs)
+    w = cfg.scoring.weights
+    mult = cfg.scoring.clickbait_multiplier
+
+    if np is None:
+        return [
+            round(_combine(w, mult, td[i], loc[i], sal[i], _freshness_from_days(days[i]), cat[i], bait[i], extra[i]), 2)
+            for i in range(len(jobs))
+        ]
+    d = np.array(days)
+    fr = np.select([d <= 0, d == 1, d <= 7, d <= 14], [1.0, 0.8, 0.6, 0.3], default=0.1)
+    f64 = np.float64
+    score = _combine(
+        w, mult, np.array(td, dtype=f64), np.array(loc, dtype=f64), np.array(sal, dtype=f64), fr,
+        np.array(cat, dtype=f64), np.array(bait, dtype=bool), np.array(extra, dtype=f64), where=np.where,
+    )
+    # Python's round() on each element, not np.round, to keep identical ties
+    return [round(s, 2) for s in score.tolist()]
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Iterable
+
+from .models import NormalizedJob
+
+
+def normalize_text(text: str) -> str:
+    t = text.lower()
+    return t.replace("javascript", "js").replace("typescript", "ts")
+
+
+def normalize_skill(s: str) -> str:
+    return normalize_text(s.strip())
+
+
+@dataclass(frozen=True)
+class SkillHits:
+    title: frozenset[str]
+    desc: frozenset[str]
+
+
+class SkillMatcher:
+    """Word-boundary matcher over a fixed set of normalized profile skills.
+
+    All skills are compiled into one lookahead alternation (longest first) so a
+    text is scanned once instead of once per skill, overlapping matches
+    included. A skill that is a prefix of a longer skill is shadowed by it at
+    the same position, so those few are re-checked with their own pattern.
+    """
+
+    def __init__(self, skills: Iterable[str]) -> None:
+        self.skills: tuple[str, ...] = tuple(normalize_skill(s) for s in skills)
+        unique = sorted({s for s in self.skills if s}, key=len, reverse=True)
+        self._re: re.Pattern[str] | None = None
+        if unique:
+            alt = "|".join(re.escape(s) for s in unique)
+            self._re = re.compile(rf"\b(?=({alt})\b)")
+        self._shadowed: list[tuple[str, re.Pattern[str]]] = [
+            (s, re.compile(rf"\b{re.escape(s)}\b"))
+            for s in unique
+            if any(s != o and o.startswith(s) for o in unique)
+        ]
+
+    def find(self, text: str) -> frozenset[str]:
+        """Return the normalized skills found in already normalized ``text``."""
+        if self._re is None:
+            return frozenset()
+        found = set(self._re.findall(text))
+        for s, pat in self._shadowed:
+            if s not in found and pat.search(text):
+                found.add(s)
+        return frozenset(found)
+
+    def match(self, job: NormalizedJob) -> SkillHits:
+        return SkillHits(
+            title=self.find(normalize_text(job["title"])),
+            desc=self.find(normalize_text(job["description"])),
+        )
+
+    def count(self, hits: frozenset[str]) -> int:
+        # Duplicated profile skills are counted per occurrence, as before
+        return sum(1 for s in self.skills if s in hits)
+
+
+@lru_cache(maxsize=1024)
+def _cached(skills: tuple[str, ...]) -> SkillMatcher:
+    return SkillMatcher(skills)
+
+
+def matcher_for(skills: Iterable[str]) -> SkillMatcher:
+    """Return a shared compiled matcher for ``skills`` (built once per skill set)."""
+    return _cached(tuple(skills))
@@ -1,31 +1,159 @@
 from __future__ import annotations
 
 from contextlib import asynccontextmanager
-from typing import AsyncIterator
+from typing import Any, AsyncIterator, Iterable, Mapping
 
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import DeclarativeBase
 
+from app.config import DBConfig
+
 
 class Base(DeclarativeBase):
     pass
 
 
-def make_engine(dsn: str) -> AsyncEngine:
+def make_engine(dsn: str, cfg: DBConfig | None = None) -> AsyncEngine:
     # Convert psycopg sync DSN to async+psycopg
     if dsn.startswith("postgresql+") and not dsn.startswith("postgresql+psycopg://"):
         # assume already correct
         pass
     async_dsn = dsn.replace("postgresql+psycopg://", "postgresql+asyncpg://")
+    cfg = cfg or DBConfig()
+    kwargs: dict[str, Any] = {}
+    if async_dsn.startswith("postgresql"):
+        kwargs.update(
+            pool_size=cfg.pool_size,
+            max_overflow=cfg.max_overflow,
+            pool_timeout=cfg.pool_timeout,
+            pool_recycle=cfg.pool_recycle,
+        )
+        if async_dsn.startswith("postgresql+asyncpg://"):
+            # asyncpg's per-connection prepared statement cache; 0 behind pgbouncer
+            kwargs["connect_args"] = {"prepared_statement_cache_size": cfg.statement_cache_size}
     # Use asyncpg for performance in async context
-    engine = create_async_engine(async_dsn, pool_pre_ping=True)
+    engine = create_async_engine(async_dsn, pool_pre_ping=True, **kwargs)
     return engine
 
 
+def dialect_insert(session: Any, model: type[Base]) -> Any:
+    """``INSERT`` with ``on_conflict_do_*`` for the session's backend (Postgres or sqlite)."""
+    name = session.get_bind().dialect.name
+    if name == "postgresql":
+        return postgresql.insert(model)
+    if name == "sqlite":
+        return sqlite.insert(model)
+    raise NotImplementedError(f"No upsert support for {name}")
+
+
+def upsert_stmt(session: Any, model: type[Base], rows: list[dict[str, Any]], update: Iterable[str] = ()) -> Any:
+    """Multi-row ``INSERT .. ON CONFLICT (pk)``: ``DO UPDATE`` of ``update``, else ``DO NOTHING``."""
+    ins = dialect_insert(session, model).values(rows)
+    keys = [c.name for c in model.__table__.primary_key]
+    update = list(update)
+    if not update:
+        return ins.on_conflict_do_nothing(index_elements=keys)
+    return ins.on_conflict_do_update(index_elements=keys, set_={c: ins.excluded[c] for c in update})
+
+
+# Bound parameters one statement may carry. 999 is sqlite's default before
+# 3.32; asyncpg encodes the count as a 16-bit number.
+_MAX_PARAMS = {"sqlite": 999, "postgresql": 32767}
+
+
+def rows_per_statement(session: Any, columns: int, cap: int | None = None, *, extra: int = 0) -> int:
+    """Most rows of ``columns`` parameters one statement may carry, at most ``cap``.
+
+    ``extra`` is what the rest of the statement binds besides the rows.
+    """
+    limit = _MAX_PARAMS.get(session.get_bind().dialect.name, 999) - extra
+    rows = max(1, limit // max(1, columns))
+    return min(rows, cap) if cap else rows
+
+
+def row_params(model: type[Base]) -> int:
+    """Parameters an ``INSERT`` binds per row of ``model``.
+
+    Every column, not just the keys passed in: Python-side defaults such as
+    ``added_at`` are bound per row too.
+    """
+    return len(model.__table__.columns)
+
+
+def unique_rows(model: type[Base], rows: Iterable[Mapping[str, Any]]) -> list[dict[str, Any]]:
+    """Rows deduplicated by primary key, last one wins.
+
+    Postgres rejects an upsert that touches the same row twice.
+    """
+    keys = [c.name for c in model.__table__.primary_key]
+    out: dict[tuple[Any, ...], dict[str, Any]] = {}
+    for r in rows:
+        out[tuple(r[k] for k in keys)] = dict(r)
+    return list(out.values())
+
+
+async def bulk_upsert(
+    session: AsyncSession,
+    model: type[Base],
+    rows: Iterable[Mapping[str, Any]],
+    update: Iterable[str] = (),
+    chunk: int | None = None,
+) -> None:
+    """Upsert ``rows`` in as few statements as the parameter limit allows; see ``upsert_stmt``.
+
+    ``chunk`` further caps the rows per statement.
+    """
+    items = unique_rows(model, rows)
+    if not items:
+        return
+    update = list(update)
+    chunk = rows_per_statement(session, row_params(model), chunk)
+    for i in range(0, len(items), chunk):
+        await session.execute(upsert_stmt(session, model, items[i : i + chunk], update))
+
+
 def make_session_factory(engine: AsyncEngine) -> async_sessionmaker[AsyncSession]:
     return async_sessionmaker(engine, expire_on_commit=False)
 
 
+class LazySession:
+    """Stands in for an ``AsyncSession`` and only builds it on first use.
+
+    Updates that never touch the DB (rate limited, cached or static screens)
+    then cost no session at all. The session itself checks a connection out
+    on its first statement and returns it to the pool on commit/rollback.
+    """
+
+    __slots__ = ("_factory", "_session")
+
+    def __init__(self, factory: async_sessionmaker[AsyncSession]) -> None:
+        self._factory = factory
+        self._session: AsyncSession | None = None
+
+    @property
+    def started(self) -> bool:
+        return self._session is not None
+
+    def __getattr__(self, name: str) -> Any:
+        if self._session is None:
+            self._session = self._factory()
+        return getattr(self._session, name)
+
+    async def commit(self) -> None:
+        if self._session is not None:
+            await self._session.commit()
+
+    async def rollback(self) -> None:
+        if self._session is not None:
+            await self._session.rollback()
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
 @asynccontextmanager
 async def session_scope(session_factory: async_sessionmaker[AsyncSession]) -> AsyncIterator[AsyncSession]:
     session = session_factory()
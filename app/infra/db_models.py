@@ -56,6 +56,7 @@ class Subscription(Base):
     schedule_cron: Mapped[str] = mapped_column(Text)
     enabled: Mapped[bool] = mapped_column(Boolean, default=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
+    next_run_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), index=True)
 
 
 class Applied(Base):
@@ -73,6 +74,26 @@ class ShownCache(Base):
     shown_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
 
 
+class Vacancy(Base):
+    """Every normalized job seen in an Adzuna response, keyed like ``shown_cache``."""
+
+    __tablename__ = "vacancies"
+    vacancy_hash: Mapped[str] = mapped_column(Text, primary_key=True)
+    redirect_url: Mapped[str] = mapped_column(Text, nullable=False, default="")
+    title: Mapped[str] = mapped_column(Text, nullable=False)
+    company: Mapped[str] = mapped_column(Text, nullable=False)
+    city_region: Mapped[str] = mapped_column(Text, nullable=False, default="")
+    location: Mapped[str] = mapped_column(Text, nullable=False, default="")
+    created: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)
+    salary_min: Mapped[int | None] = mapped_column(Integer)
+    salary_max: Mapped[int | None] = mapped_column(Integer)
+    category_tag: Mapped[str | None] = mapped_column(Text, index=True)
+    category_label: Mapped[str | None] = mapped_column(Text)
+    description: Mapped[str] = mapped_column(Text, nullable=False, default="")
+    first_seen_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
+    last_seen_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
+
+
 class Complaint(Base):
     __tablename__ = "complaints"
     user_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
@@ -97,4 +118,6 @@ class UiSession(Base):
     anchor_message_id: Mapped[int | None] = mapped_column(BigInteger)
     screen_state: Mapped[str] = mapped_column(String(64), nullable=False, default="welcome")
     payload: Mapped[dict] = mapped_column(MutableDict.as_mutable(JSON), nullable=False, default=dict)
+    result_set_id: Mapped[str | None] = mapped_column(String(32))
+    cursor: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow)
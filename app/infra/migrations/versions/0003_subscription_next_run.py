@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0003_subscription_next_run"
+down_revision = "0002_ui_sessions_and_profile_ext"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Persistent next fire time so restarts neither skip nor repeat digests
+    op.add_column("subscriptions", sa.Column("next_run_at", sa.DateTime(timezone=True), nullable=True))
+    op.create_index("ix_subscriptions_next_run_at", "subscriptions", ["next_run_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_subscriptions_next_run_at", table_name="subscriptions")
+    op.drop_column("subscriptions", "next_run_at")
@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0004_ui_session_result_sets"
+down_revision = "0003_subscription_next_run"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Cards live in the result-set store; the session row keeps a pointer and cursor
+    op.add_column("ui_sessions", sa.Column("result_set_id", sa.String(length=32), nullable=True))
+    op.add_column("ui_sessions", sa.Column("cursor", sa.Integer(), nullable=False, server_default="0"))
+
+
+def downgrade() -> None:
+    op.drop_column("ui_sessions", "cursor")
+    op.drop_column("ui_sessions", "result_set_id")
@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0005_vacancies"
+down_revision = "0004_ui_session_result_sets"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "vacancies",
+        sa.Column("vacancy_hash", sa.Text(), primary_key=True),
+        sa.Column("redirect_url", sa.Text(), nullable=False, server_default=""),
+        sa.Column("title", sa.Text(), nullable=False),
+        sa.Column("company", sa.Text(), nullable=False),
+        sa.Column("city_region", sa.Text(), nullable=False, server_default=""),
+        sa.Column("created", sa.DateTime(timezone=True)),
+        sa.Column("salary_min", sa.Integer()),
+        sa.Column("salary_max", sa.Integer()),
+        sa.Column("category_tag", sa.Text()),
+        sa.Column("category_label", sa.Text()),
+        sa.Column("description", sa.Text(), nullable=False, server_default=""),
+        sa.Column("first_seen_at", sa.DateTime(timezone=True)),
+        sa.Column("last_seen_at", sa.DateTime(timezone=True)),
+    )
+    op.create_index("ix_vacancies_created", "vacancies", ["created"])
+    op.create_index("ix_vacancies_category_tag", "vacancies", ["category_tag"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_vacancies_category_tag", table_name="vacancies")
+    op.drop_index("ix_vacancies_created", table_name="vacancies")
+    op.drop_table("vacancies")
@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+from alembic import op
+
+
+revision = "0006_vacancy_search"
+down_revision = "0005_vacancies"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Postgres only; the sqlite fallback uses the in-process MemoryIndex
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute(
+        "ALTER TABLE vacancies ADD COLUMN search_tsv tsvector GENERATED ALWAYS AS ("
+        "to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(company, '') || ' ' || coalesce(description, ''))"
+        ") STORED"
+    )
+    op.execute("CREATE INDEX ix_vacancies_search_tsv ON vacancies USING GIN (search_tsv)")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute("DROP INDEX IF EXISTS ix_vacancies_search_tsv")
+    op.execute("ALTER TABLE vacancies DROP COLUMN IF EXISTS search_tsv")
@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0007_vacancy_location"
+down_revision = "0006_vacancy_search"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Full location display name; "where" matches any of its comma-separated parts
+    op.add_column("vacancies", sa.Column("location", sa.Text(), nullable=False, server_default=""))
+    op.execute("UPDATE vacancies SET location = city_region")
+
+
+def downgrade() -> None:
+    op.drop_column("vacancies", "location")
@@ -16,6 +16,45 @@ class KeyValueStore(Protocol):
     async def setex(self, key: str, seconds: int, value: str) -> None: ...
     async def set_nx(self, key: str, value: str, ex: int) -> bool: ...
     async def delete(self, key: str) -> None: ...
+    async def allow(self, key: str, limit: int, window: float) -> bool: ...
+    async def expire_if_eq(self, key: str, value: str, seconds: int) -> bool: ...
+    async def delete_if_eq(self, key: str, value: str) -> bool: ...
+
+
+# Sliding-window counter: the previous fixed window's count is weighted by how
+# much of it still overlaps the sliding window. Denied calls are not counted.
+_ALLOW_LUA = """
+local prev = tonumber(redis.call('GET', KEYS[2]) or '0')
+local cur = tonumber(redis.call('GET', KEYS[1]) or '0')
+if prev * (1 - tonumber(ARGV[2])) + cur >= tonumber(ARGV[1]) then
+  return 0
+end
+redis.call('INCR', KEYS[1])
+redis.call('PEXPIRE', KEYS[1], ARGV[3])
+return 1
+"""
+
+
+# Compare-and-set on a key's value, for leases: only the holder may extend or drop it
+_EXPIRE_IF_EQ_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+  return redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+_DELETE_IF_EQ_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+  return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+def _window(now: float, window: float) -> tuple[int, float]:
+    """Index of the fixed window containing ``now`` and the elapsed fraction of it."""
+    pos = now / window
+    idx = int(pos)
+    return idx, pos - idx
 
 
 class RedisStore:
@@ -23,6 +62,9 @@ class RedisStore:
         if Redis is None:  # pragma: no cover - only in environments without redis
             raise RuntimeError("redis package not available")
         self._r: Redis = Redis.from_url(url, decode_responses=True)
+        self._allow = self._r.register_script(_ALLOW_LUA)
+        self._expire_if_eq = self._r.register_script(_EXPIRE_IF_EQ_LUA)
+        self._delete_if_eq = self._r.register_script(_DELETE_IF_EQ_LUA)
 
     async def get(self, key: str) -> Optional[str]:
         return await self._r.get(key)
@@ -36,11 +78,30 @@ class RedisStore:
     async def delete(self, key: str) -> None:
         await self._r.delete(key)
 
+    async def allow(self, key: str, limit: int, window: float) -> bool:
+        """Count a hit against ``limit`` per sliding ``window`` seconds; one round trip."""
+        idx, elapsed = _window(time.time(), window)
+        # Hash-tag the base key so both windows land in one Redis Cluster slot
+        res = await self._allow(
+            keys=[f"{{{key}}}:{idx}", f"{{{key}}}:{idx - 1}"],
+            args=[limit, elapsed, int(window * 2000)],
+        )
+        return bool(res)
+
+    async def expire_if_eq(self, key: str, value: str, seconds: int) -> bool:
+        return bool(await self._expire_if_eq(keys=[key], args=[value, seconds]))
+
+    async def delete_if_eq(self, key: str, value: str) -> bool:
+        return bool(await self._delete_if_eq(keys=[key], args=[value]))
+
 
 @dataclass
 class InMemoryStore:
     data: dict[str, tuple[str, float]] = field(default_factory=dict)
     lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    # key -> (window index, previous count, current count, expires at)
+    windows: dict[str, tuple[int, int, int, float]] = field(default_factory=dict)
+    max_windows: int = 10_000
 
     async def get(self, key: str) -> Optional[str]:
         async with self.lock:
@@ -73,3 +134,39 @@ class InMemoryStore:
         async with self.lock:
             self.data.pop(key, None)
 
+    def _holds(self, key: str, value: str) -> bool:
+        v = self.data.get(key)
+        return v is not None and v[0] == value and not (v[1] and v[1] < time.time())
+
+    async def expire_if_eq(self, key: str, value: str, seconds: int) -> bool:
+        async with self.lock:
+            if not self._holds(key, value):
+                return False
+            self.data[key] = (value, time.time() + seconds)
+            return True
+
+    async def delete_if_eq(self, key: str, value: str) -> bool:
+        async with self.lock:
+            if not self._holds(key, value):
+                return False
+            del self.data[key]
+            return True
+
+    async def allow(self, key: str, limit: int, window: float) -> bool:
+        # No await between read and write, so this is atomic on the event loop
+        now = time.time()
+        idx, elapsed = _window(now, window)
+        w = self.windows.get(key)
+        if w is None or w[0] < idx - 1:
+            prev, cur = 0, 0
+        elif w[0] == idx - 1:
+            prev, cur = w[2], 0
+        else:
+            prev, cur = w[1], w[2]
+        allowed = prev * (1 - elapsed) + cur < limit
+        if allowed:
+            cur += 1
+        if len(self.windows) >= self.max_windows and key not in self.windows:
+            self.windows = {k: v for k, v in self.windows.items() if v[3] > now}
+        self.windows[key] = (idx, prev, cur, now + 2 * window)
+        return allowed
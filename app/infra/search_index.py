@@ -0,0 +1,305 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+from collections import OrderedDict
+from dataclasses import astuple, dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncGenerator, Protocol, Sequence
+
+from sqlalchemy import any_, func, literal, literal_column, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import AppConfig, IndexConfig
+from app.domain.dedup import vacancy_hash
+from app.domain.models import AdzunaRaw, NormalizedJob, SearchParams
+from app.domain.normalization import normalize_head
+from app.infra.db_models import Vacancy
+from app.infra.redis import KeyValueStore
+from app.integrations.adzuna_client import AdzunaClient
+from app.telemetry.metrics import counter
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def _tokens(text: str | None) -> list[str]:
+    return _TOKEN_RE.findall((text or "").lower())
+
+
+def _place(where: str | None) -> str:
+    # The most specific part of "where", e.g. "hackney" for "Hackney, London"
+    return (where or "").split(",")[0].strip().lower()
+
+
+def _parts(location: str) -> frozenset[str]:
+    return frozenset(p.strip().lower() for p in location.split(",") if p.strip())
+
+
+def _utc(dt: datetime) -> datetime:
+    # sqlite hands back naive UTC
+    return dt if dt.tzinfo is not None else dt.replace(tzinfo=timezone.utc)
+
+
+@dataclass(frozen=True)
+class IndexQuery:
+    """The subset of ``AdzunaClient.search`` parameters the local index answers."""
+
+    what: str | None = None
+    where: str | None = None
+    max_days_old: int | None = None
+    salary_min: int | None = None
+    sort: str | None = None
+
+
+def _query_key(country: str, q: IndexQuery) -> str:
+    norm = [country.lower(), *((v.strip().lower() if isinstance(v, str) else v) for v in astuple(q))]
+    return "search:fresh:" + hashlib.sha1(json.dumps(norm).encode("utf-8")).hexdigest()
+
+
+def _raw(
+    title: str,
+    company: str,
+    location: str,
+    created: datetime,
+    redirect_url: str,
+    salary_min: int | None,
+    salary_max: int | None,
+    category_label: str | None,
+    category_tag: str | None,
+    description: str,
+) -> AdzunaRaw:
+    return {
+        "title": title,
+        "company": {"display_name": company},
+        "location": {"display_name": location},
+        "created": _utc(created).isoformat(),
+        "redirect_url": redirect_url,
+        "salary_min": salary_min,
+        "salary_max": salary_max,
+        "category": {"label": category_label, "tag": category_tag},
+        "description": description,
+    }
+
+
+def _row_raw(v: Vacancy) -> AdzunaRaw:
+    return _raw(
+        v.title, v.company, v.location or v.city_region, v.created, v.redirect_url, v.salary_min,
+        v.salary_max, v.category_label, v.category_tag, v.description,
+    )
+
+
+class VacancyIndex(Protocol):
+    def add(self, jobs: Sequence[NormalizedJob]) -> None: ...
+    async def warm(self) -> None: ...
+    async def search(self, q: IndexQuery, limit: int) -> list[AdzunaRaw]: ...
+
+
+class PostgresIndex:
+    """Full-text search over ``vacancies.search_tsv`` (GIN-indexed, see 0006_vacancy_search).
+
+    Only vacancies seen in an Adzuna response within ``fresh_seconds`` match,
+    so results stay about as current as the API's.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession], fresh_seconds: int) -> None:
+        self.session_factory = session_factory
+        self.fresh_seconds = fresh_seconds
+
+    def add(self, jobs: Sequence[NormalizedJob]) -> None:
+        pass  # search_tsv is a generated column
+
+    async def warm(self) -> None:
+        pass
+
+    async def search(self, q: IndexQuery, limit: int) -> list[AdzunaRaw]:
+        now = datetime.now(timezone.utc)
+        tsv = literal_column("vacancies.search_tsv")
+        stmt = select(Vacancy).where(Vacancy.last_seen_at >= now - timedelta(seconds=self.fresh_seconds))
+        tsq = func.plainto_tsquery(literal_column("'simple'::regconfig"), q.what or "")
+        if q.what:
+            stmt = stmt.where(tsv.op("@@")(tsq))
+        if _place(q.where):
+            parts = func.regexp_split_to_array(func.lower(Vacancy.location), r"\s*,\s*")
+            stmt = stmt.where(literal(_place(q.where)) == any_(parts))
+        if q.max_days_old is not None:
+            stmt = stmt.where(Vacancy.created >= now - timedelta(days=q.max_days_old))
+        if q.salary_min:
+            stmt = stmt.where(func.coalesce(Vacancy.salary_max, Vacancy.salary_min) >= q.salary_min)
+        if q.what and q.sort != "date":
+            stmt = stmt.order_by(func.ts_rank(tsv, tsq).desc(), Vacancy.created.desc())
+        else:
+            stmt = stmt.order_by(Vacancy.created.desc())
+        async with self.session_factory() as s:
+            rows = (await s.execute(stmt.limit(limit))).scalars().all()
+        return [_row_raw(v) for v in rows]
+
+
+@dataclass
+class _Doc:
+    job: NormalizedJob
+    tokens: frozenset[str]
+    title_tokens: frozenset[str]
+    places: frozenset[str]
+    seen_at: datetime
+
+
+class MemoryIndex:
+    """Embedded inverted index for the sqlite fallback, fed by ``VacancyCorpus``.
+
+    Holds at most ``max_docs`` vacancies, evicting the least recently seen.
+    ``warm`` loads the fresh part of ``vacancies`` after a restart.
+    """
+
+    def __init__(
+        self, session_factory: async_sessionmaker[AsyncSession], fresh_seconds: int, max_docs: int = 50_000
+    ) -> None:
+        self.session_factory = session_factory
+        self.fresh_seconds = fresh_seconds
+        self.max_docs = max_docs
+        self._docs: OrderedDict[str, _Doc] = OrderedDict()
+        self._postings: dict[str, set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def _drop(self, key: str) -> None:
+        doc = self._docs.pop(key)
+        for t in doc.tokens:
+            post = self._postings.get(t)
+            if post is not None:
+                post.discard(key)
+                if not post:
+                    del self._postings[t]
+
+    def _put(self, j: NormalizedJob, seen_at: datetime) -> None:
+        key = vacancy_hash(j)
+        if key in self._docs:
+            self._drop(key)
+        title_tokens = frozenset(_tokens(j["title"]))
+        tokens = title_tokens | frozenset(_tokens(j["company"])) | frozenset(_tokens(j["description"]))
+        self._docs[key] = _Doc(j, tokens, title_tokens, _parts(j["location"] or j["city_region"]), seen_at)
+        for t in tokens:
+            self._postings.setdefault(t, set()).add(key)
+
+    def _trim(self) -> None:
+        while len(self._docs) > self.max_docs:
+            self._drop(next(iter(self._docs)))
+
+    def add(self, jobs: Sequence[NormalizedJob]) -> None:
+        now = datetime.now(timezone.utc)
+        for j in jobs:
+            self._put(j, now)
+        self._trim()
+
+    async def warm(self) -> None:
+        """Load the ``max_docs`` most recently seen fresh vacancies, oldest first."""
+        fresh = datetime.now(timezone.utc) - timedelta(seconds=self.fresh_seconds)
+        stmt = (
+            select(Vacancy)
+            .where(Vacancy.last_seen_at >= fresh)
+            .order_by(Vacancy.last_seen_at.desc())
+            .limit(self.max_docs)
+        )
+        async with self.session_factory() as s:
+            rows = (await s.execute(stmt)).scalars().all()
+        for v in reversed(rows):
+            # Stored descriptions are already stripped, so skip attach_description
+            j = normalize_head(_row_raw(v))
+            j["description"] = v.description
+            self._put(j, _utc(v.last_seen_at))
+        self._trim()
+
+    async def search(self, q: IndexQuery, limit: int) -> list[AdzunaRaw]:
+        now = datetime.now(timezone.utc)
+        fresh = now - timedelta(seconds=self.fresh_seconds)
+        words = set(_tokens(q.what))
+        if words:
+            # Every word must match, as in Adzuna's "what"; start from the rarest
+            posts = sorted((self._postings.get(w, set()) for w in words), key=len)
+            keys: Any = set(posts[0]).intersection(*posts[1:])
+        else:
+            keys = self._docs.keys()
+        place = _place(q.where)
+        cutoff = now - timedelta(days=q.max_days_old) if q.max_days_old is not None else None
+        hits: list[_Doc] = []
+        for key in keys:
+            doc = self._docs[key]
+            j = doc.job
+            if doc.seen_at < fresh:
+                continue
+            if place and place not in doc.places:
+                continue
+            if cutoff is not None and j["created"] < cutoff:
+                continue
+            if q.salary_min and (j["salary_max"] or j["salary_min"] or 0) < q.salary_min:
+                continue
+            hits.append(doc)
+        if words and q.sort != "date":
+            hits.sort(key=lambda d: (len(words & d.title_tokens), d.job["created"]), reverse=True)
+        else:
+            hits.sort(key=lambda d: d.job["created"], reverse=True)
+        return [
+            _raw(
+                j["title"], j["company"], j["location"] or j["city_region"], j["created"], j["redirect_url"],
+                j["salary_min"], j["salary_max"], j["category_label"], j["category_tag"], j["description"],
+            )
+            for j in (d.job for d in hits[:limit])
+        ]
+
+
+def make_index(
+    dialect: str, session_factory: async_sessionmaker[AsyncSession], cfg: IndexConfig
+) -> VacancyIndex:
+    if dialect == "postgresql":
+        return PostgresIndex(session_factory, cfg.fresh_seconds)
+    return MemoryIndex(session_factory, cfg.fresh_seconds, cfg.max_docs)
+
+
+async def search_pages(
+    index: VacancyIndex | None,
+    adzuna: AdzunaClient,
+    store: KeyValueStore,
+    cfg: AppConfig,
+    params: SearchParams,
+    *,
+    what: str | None = None,
+    where: str | None = None,
+    salary_min: int | None = None,
+    country: str = "gb",
+) -> AsyncGenerator[list[dict[str, Any]], None]:
+    """``AdzunaClient.search_pages``, served from ``index`` when it can stand in for Adzuna.
+
+    That is when Adzuna answered this same query within ``index.fresh_seconds``
+    (so its results went into the corpus) and the index has at least
+    ``index.min_results`` hits. Local hits come back as a single page;
+    otherwise (or on an index error) pages come from Adzuna as usual.
+    """
+    q = IndexQuery(what=what, where=where, max_days_old=params.max_days_old, salary_min=salary_min, sort=params.sort)
+    key = _query_key(country, q)
+    if index is not None:
+        try:
+            hits: list[AdzunaRaw] = []
+            if await store.get(key) is not None:
+                hits = await index.search(q, cfg.search.max_pages * cfg.search.results_per_page)
+        except Exception:  # noqa: BLE001 - the API is the source of truth
+            counter("search_source", source="index_error")
+            hits = []
+        if hits and len(hits) >= cfg.index.min_results:
+            counter("search_source", source="index")
+            yield hits  # type: ignore[misc]
+            return
+    counter("search_source", source="adzuna")
+    upstream = adzuna.search_pages(params, what=what, where=where, salary_min=salary_min, country=country)
+    marked = index is None
+    try:
+        async for page in upstream:
+            if not marked:
+                marked = True
+                try:
+                    await store.setex(key, cfg.index.fresh_seconds, "1")
+                except Exception:  # noqa: BLE001 - only costs a later Adzuna call
+                    pass
+            yield page
+    finally:
+        await upstream.aclose()
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import asyncio
+import math
+import random
+import zlib
+from contextlib import suppress
+
+from aiogram.types import Update
+
+from app.infra.redis import KeyValueStore
+from app.telemetry.logger import get_logger
+from app.telemetry.metrics import gauge
+
+log = get_logger("infra.sharding")
+
+LEASE_PREFIX = "bot:shard:"
+REPLICA_PREFIX = "bot:replica:"
+
+
+def shard_of(key: int, shards: int) -> int:
+    # crc32 rather than hash() so every process agrees on the mapping
+    return zlib.crc32(str(key).encode()) % shards if shards > 1 else 0
+
+
+def chat_id_of(update: Update) -> int | None:
+    """Chat an update belongs to (user id for chat-less events); ``None`` if neither."""
+    try:
+        ev = update.event
+    except Exception:  # noqa: BLE001 - unknown update type
+        return None
+    chat = getattr(ev, "chat", None) or getattr(getattr(ev, "message", None), "chat", None)
+    if chat is not None:
+        return int(chat.id)
+    user = getattr(ev, "from_user", None) or getattr(ev, "user", None)
+    return int(user.id) if user is not None else None
+
+
+class ShardLeases:
+    """Holds leases on chat-id hash ranges in the ``KeyValueStore``.
+
+    Each of ``shards`` ranges is owned by whichever process last set
+    ``bot:shard:<n>``; the value is the owner's URL so peers can forward
+    updates to it. Leases are renewed every ``ttl / 3`` seconds with a
+    compare-and-set and picked up by survivors once a dead owner's lease
+    expires.
+
+    Live processes also hold one of ``shards`` ``bot:replica:<n>`` slots, and
+    each keeps at most its fair share ``ceil(shards / live)`` of leases
+    (capped by ``max_owned`` if set), releasing extras when a replica joins.
+    """
+
+    def __init__(
+        self,
+        store: KeyValueStore,
+        shards: int,
+        owner: str,
+        *,
+        ttl: int = 30,
+        max_owned: int = 0,
+    ) -> None:
+        self.store = store
+        self.shards = shards
+        self.owner = owner
+        self.ttl = ttl
+        self.max_owned = max_owned
+        self.owned: set[int] = set()
+        self._slot: int | None = None
+        self._task: asyncio.Task[None] | None = None
+
+    def owns(self, shard: int) -> bool:
+        return shard in self.owned
+
+    async def owner_of(self, shard: int) -> str | None:
+        return await self.store.get(f"{LEASE_PREFIX}{shard}")
+
+    async def _heartbeat(self) -> None:
+        if self._slot is not None and await self.store.expire_if_eq(
+            f"{REPLICA_PREFIX}{self._slot}", self.owner, self.ttl
+        ):
+            return
+        self._slot = None
+        for n in range(self.shards):
+            if await self.store.set_nx(f"{REPLICA_PREFIX}{n}", self.owner, ex=self.ttl):
+                self._slot = n
+                return
+
+    async def live_replicas(self) -> int:
+        slots = await asyncio.gather(*(self.store.get(f"{REPLICA_PREFIX}{n}") for n in range(self.shards)))
+        return max(1, sum(v is not None for v in slots))
+
+    async def fair_share(self) -> int:
+        share = math.ceil(self.shards / await self.live_replicas())
+        return min(share, self.max_owned) if self.max_owned else share
+
+    async def renew(self) -> None:
+        """Extend held leases, drop lost ones, then release or claim shards toward the fair share."""
+        await self._heartbeat()
+        for shard in sorted(self.owned):
+            if not await self.store.expire_if_eq(f"{LEASE_PREFIX}{shard}", self.owner, self.ttl):
+                self.owned.discard(shard)
+                log.warning("shard.lost", shard=shard)
+        limit = await self.fair_share()
+        for shard in sorted(self.owned, reverse=True)[: max(0, len(self.owned) - limit)]:
+            await self.store.delete_if_eq(f"{LEASE_PREFIX}{shard}", self.owner)
+            self.owned.discard(shard)
+            log.info("shard.released", shard=shard)
+        # Random start so replicas booting together spread over the ranges
+        start = random.randrange(self.shards)
+        for i in range(self.shards):
+            if len(self.owned) >= limit:
+                break
+            shard = (start + i) % self.shards
+            if shard not in self.owned and await self.store.set_nx(
+                f"{LEASE_PREFIX}{shard}", self.owner, ex=self.ttl
+            ):
+                self.owned.add(shard)
+                log.info("shard.acquired", shard=shard)
+        gauge("shards_owned", len(self.owned), owner=self.owner)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._keep_alive())
+
+    async def _keep_alive(self) -> None:
+        while True:
+            await asyncio.sleep(self.ttl / 3)
+            try:
+                await self.renew()
+            except Exception as e:  # noqa: BLE001 - store hiccup; retry next tick
+                log.warning("shard.renew_error", err=str(e))
+
+    async def release(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        for shard in list(self.owned):
+            await self.store.delete_if_eq(f"{LEASE_PREFIX}{shard}", self.owner)
+        self.owned.clear()
+        if self._slot is not None:
+            await self.store.delete_if_eq(f"{REPLICA_PREFIX}{self._slot}", self.owner)
+            self._slot = None
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+from aiogram import Bot
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.methods import Response, TelegramMethod
+from aiogram.methods.base import TelegramType
+
+from app.config import RateLimit
+from app.infra.redis import KeyValueStore
+from app.telemetry.metrics import counter
+
+# Methods that post a new message; edits and answers are not throttled
+_SEND_PREFIXES = ("Send", "Forward", "Copy")
+
+
+class OutgoingRateLimiter(BaseRequestMiddleware):
+    """Holds outgoing sends until they fit Telegram's global and per-chat limits.
+
+    Limits are counted in the shared store, so they hold across processes.
+    """
+
+    def __init__(self, store: KeyValueStore, cfg: RateLimit, max_wait: float = 30.0) -> None:
+        self.store = store
+        self.cfg = cfg
+        self.max_wait = max_wait
+
+    def _limits(self, chat_id: Any) -> list[tuple[str, int, float]]:
+        # Per-chat first so a send parked on its chat does not hold a global slot
+        limits = []
+        if isinstance(chat_id, int):
+            # Negative ids are groups and channels, which Telegram limits harder
+            per_chat = self.cfg.send_per_group_per_minute if chat_id < 0 else self.cfg.send_per_chat_per_minute
+            limits.append((f"tg:send:{chat_id}", per_chat, 60.0))
+        limits.append(("tg:send:global", self.cfg.send_global_per_sec, 1.0))
+        return limits
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        if type(method).__name__.startswith(_SEND_PREFIXES):
+            await self._wait(self._limits(getattr(method, "chat_id", None)))
+        return await make_request(bot, method)
+
+    async def _wait(self, limits: list[tuple[str, int, float]]) -> None:
+        waited = 0.0
+        for key, limit, window in limits:
+            if limit <= 0:
+                continue
+            step = max(window / limit, 0.02)
+            while not await self.store.allow(key, limit, window):
+                if waited >= self.max_wait:
+                    # Let Telegram answer 429 rather than stall the handler forever
+                    counter("telegram_send_throttle_timeout")
+                    return
+                counter("telegram_send_throttled", scope="global" if key.endswith("global") else "chat")
+                await asyncio.sleep(step)
+                waited += step
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import asyncio
+import hmac
+from contextlib import suppress
+
+import aiohttp
+from aiogram import Bot, Dispatcher
+from aiogram.types import Update
+from aiohttp import web
+from pydantic import ValidationError
+
+from app.infra.sharding import ShardLeases, chat_id_of, shard_of
+from app.telemetry.logger import get_logger
+from app.telemetry.metrics import counter, gauge
+
+log = get_logger("infra.webhook")
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+FORWARDED_HEADER = "X-Shard-Forwarded"
+
+
+class WebhookIngress:
+    """Accepts Telegram webhook POSTs and processes them on a bounded worker pool.
+
+    The request handler only validates and enqueues, so Telegram gets its 200
+    quickly; a full queue answers 503 and Telegram redelivers the update later.
+    Each chat hashes to one worker queue, so a chat's updates run in order.
+    With ``leases``, updates for chats whose shard this process does not own
+    are forwarded to the owner's URL instead.
+    """
+
+    def __init__(
+        self,
+        dp: Dispatcher,
+        bot: Bot,
+        secret: str,
+        *,
+        queue_size: int = 1000,
+        workers: int = 8,
+        leases: ShardLeases | None = None,
+    ) -> None:
+        self.dp = dp
+        self.bot = bot
+        self.leases = leases
+        self._secret = secret
+        n = max(1, workers)
+        self._queues: list[asyncio.Queue[Update]] = [
+            asyncio.Queue(maxsize=max(1, queue_size // n)) for _ in range(n)
+        ]
+        self._workers: list[asyncio.Task[None]] = []
+        self._http: aiohttp.ClientSession | None = None
+
+    def setup(self, app: web.Application, path: str) -> None:
+        app.router.add_post(path, self.handle)
+
+    async def handle(self, request: web.Request) -> web.Response:
+        token = request.headers.get(SECRET_HEADER, "")
+        if not self._secret or not hmac.compare_digest(token, self._secret):
+            counter("webhook_updates", result="forbidden")
+            return web.Response(status=401)
+        body = await request.read()
+        try:
+            update = Update.model_validate_json(body, context={"bot": self.bot})
+        except (ValueError, ValidationError):
+            counter("webhook_updates", result="invalid")
+            return web.Response(status=400)
+        chat_id = chat_id_of(update)
+        if self.leases is not None and chat_id is not None:
+            shard = shard_of(chat_id, self.leases.shards)
+            if not self.leases.owns(shard):
+                return await self._forward(request, shard, body)
+        key = chat_id if chat_id is not None else update.update_id
+        queue = self._queues[shard_of(key, len(self._queues))]
+        try:
+            queue.put_nowait(update)
+        except asyncio.QueueFull:
+            counter("webhook_updates", result="rejected")
+            return web.Response(status=503)
+        counter("webhook_updates", result="accepted")
+        gauge("webhook_queue_depth", sum(q.qsize() for q in self._queues))
+        return web.Response()
+
+    async def _forward(self, request: web.Request, shard: int, body: bytes) -> web.Response:
+        assert self.leases is not None
+        owner = await self.leases.owner_of(shard)
+        # No owner yet, or a peer disagrees about ownership: let Telegram retry
+        if not owner or owner == self.leases.owner or request.headers.get(FORWARDED_HEADER):
+            counter("webhook_updates", result="unowned")
+            return web.Response(status=503)
+        if self._http is None:
+            self._http = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=5))
+        headers = {
+            SECRET_HEADER: self._secret,
+            FORWARDED_HEADER: "1",
+            "Content-Type": "application/json",
+        }
+        try:
+            async with self._http.post(owner.rstrip("/") + request.path, data=body, headers=headers) as resp:
+                status = resp.status
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            log.warning("webhook.forward_error", shard=shard, owner=owner, err=str(e))
+            status = 503
+        counter("webhook_updates", result="forwarded")
+        return web.Response(status=status)
+
+    def start(self) -> None:
+        if not self._workers:
+            self._workers = [asyncio.create_task(self._work(q)) for q in self._queues]
+
+    async def _work(self, queue: asyncio.Queue[Update]) -> None:
+        while True:
+            update = await queue.get()
+            try:
+                await self.dp.feed_update(self.bot, update)
+            except Exception as e:  # noqa: BLE001
+                log.warning("webhook.update_error", update_id=update.update_id, err=str(e))
+            finally:
+                queue.task_done()
+
+    async def stop(self, drain_timeout: float = 5.0) -> None:
+        """Give queued updates ``drain_timeout`` seconds to finish, then cancel workers."""
+        if self._workers:
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(
+                    asyncio.gather(*(q.join() for q in self._queues)), timeout=drain_timeout
+                )
+        for t in self._workers:
+            t.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        if self._http is not None:
+            await self._http.close()
+            self._http = None
@@ -1,13 +1,18 @@
 from __future__ import annotations
 
 import asyncio
-from typing import Any, Sequence
+import hashlib
+import json
+from typing import Any, AsyncGenerator, Callable, Sequence
 
 import httpx
 
 from app.config import AppConfig, Settings
+from app.domain.models import SearchParams
+from app.infra.cache import TTLCache
 from app.infra.http import create_async_client
-from app.telemetry.metrics import timer
+from app.infra.redis import KeyValueStore
+from app.telemetry.metrics import counter, timer
 from app.telemetry.logger import get_logger
 
 
@@ -33,11 +38,36 @@ VALID_COUNTRIES: Sequence[str] = (
 )
 
 
+def _cache_key(country: str, page: int, results_per_page: int, **query: Any) -> str:
+    norm = {
+        k: (v.strip().lower() if isinstance(v, str) else v)
+        for k, v in query.items()
+        if v is not None and v != ""
+    }
+    raw = json.dumps([country.lower(), page, results_per_page, norm], sort_keys=True)
+    return "adz:search:" + hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
 class AdzunaClient:
-    def __init__(self, settings: Settings, cfg: AppConfig) -> None:
+    def __init__(
+        self,
+        settings: Settings,
+        cfg: AppConfig,
+        store: KeyValueStore | None = None,
+        sink: Callable[[list[dict[str, Any]]], None] | None = None,
+    ) -> None:
         self._settings = settings
         self._cfg = cfg
+        # Sees every page fetched upstream (not cache hits), e.g. VacancyCorpus.add
+        self._sink = sink
         self._client: httpx.AsyncClient | None = None
+        # Trimmed results are cached in the shared store; the local LRU serves
+        # when no store is configured or it is unreachable.
+        self._store = store
+        self._local: TTLCache[str, list[dict[str, Any]]] = TTLCache(
+            maxsize=cfg.search.cache_local_entries, ttl=cfg.search.cache_ttl_seconds
+        )
+        self._inflight: dict[str, asyncio.Task[list[dict[str, Any]]]] = {}
 
     def _client_or_create(self) -> httpx.AsyncClient:
         if self._client is None:
@@ -50,6 +80,84 @@ class AdzunaClient:
             await self._client.aclose()
             self._client = None
 
+    def _validate(self, country: str, page: int, results_per_page: int) -> None:
+        if not self._settings.ADZUNA_APP_ID or not self._settings.ADZUNA_APP_KEY:
+            raise ValueError("Adzuna credentials are not configured")
+        if country.lower() not in VALID_COUNTRIES:
+            raise ValueError(f"Unsupported country: {country}")
+        if page < 1 or results_per_page < 1:
+            raise ValueError("Invalid pagination parameters")
+
+    async def search_many(
+        self,
+        country: str,
+        pages: int,
+        results_per_page: int,
+        *,
+        concurrency: int = 3,
+        **query: Any,
+    ) -> AsyncGenerator[list[dict[str, Any]], None]:
+        """Fetch pages ``1..pages`` and yield them in page order.
+
+        Page 1 is fetched alone; pages 2.. start only once the caller asks for
+        more, then run with at most ``concurrency`` requests in flight. Closing
+        the generator early cancels the remaining fetches. A failing page is
+        skipped; the error propagates only if no page succeeded.
+        """
+        self._validate(country, pages, results_per_page)
+        sem = asyncio.Semaphore(max(1, concurrency))
+
+        async def one(page: int) -> list[dict[str, Any]]:
+            async with sem:
+                return await self.search(country, page, results_per_page, **query)
+
+        tasks = [asyncio.create_task(one(1))]
+        got_any = False
+        err: Exception | None = None
+        try:
+            for i in range(pages):
+                if i == 1:
+                    tasks += [asyncio.create_task(one(p)) for p in range(2, pages + 1)]
+                try:
+                    page_items = await tasks[i]
+                except (ValueError, asyncio.CancelledError):
+                    raise
+                except Exception as e:  # noqa: BLE001
+                    log.warning("adzuna.search_many.page_error", page=i + 1, err=str(e))
+                    err = e
+                    continue
+                got_any = True
+                yield page_items
+            if not got_any and err is not None:
+                raise err
+        finally:
+            for t in tasks:
+                t.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def search_pages(
+        self,
+        params: SearchParams,
+        *,
+        what: str | None = None,
+        where: str | None = None,
+        salary_min: int | None = None,
+        country: str = "gb",
+    ) -> AsyncGenerator[list[dict[str, Any]], None]:
+        """``search_many`` with page count, page size and concurrency from ``cfg.search``."""
+        s = self._cfg.search
+        return self.search_many(
+            country,
+            s.max_pages,
+            s.results_per_page,
+            concurrency=s.page_concurrency,
+            what=what,
+            where=where,
+            sort=params.sort,
+            max_days_old=params.max_days_old,
+            salary_min=salary_min,
+        )
+
     async def search(
         self,
         country: str,
@@ -62,13 +170,77 @@ class AdzunaClient:
         max_days_old: int | None = None,
         salary_min: int | None = None,
     ) -> list[dict[str, Any]]:
-        if not self._settings.ADZUNA_APP_ID or not self._settings.ADZUNA_APP_KEY:
-            raise ValueError("Adzuna credentials are not configured")
-        if country.lower() not in VALID_COUNTRIES:
-            raise ValueError(f"Unsupported country: {country}")
-        if page < 1 or results_per_page < 1:
-            raise ValueError("Invalid pagination parameters")
+        self._validate(country, page, results_per_page)
+
+        query: dict[str, Any] = {
+            "what": what,
+            "where": where,
+            "sort": sort,
+            "max_days_old": max_days_old,
+            "salary_min": salary_min,
+        }
+        ttl = self._cfg.search.cache_ttl_seconds
+        if ttl <= 0:
+            return await self._fetch(country, page, results_per_page, **query)
+
+        key = _cache_key(country, page, results_per_page, **query)
+        cached = await self._cache_get(key)
+        if cached is not None:
+            counter("adzuna_cache", result="hit")
+            return cached
+        # Single-flight: identical concurrent queries share one upstream call
+        task = self._inflight.get(key)
+        if task is None:
+            counter("adzuna_cache", result="miss")
+            task = asyncio.create_task(self._fetch_and_store(key, ttl, country, page, results_per_page, query))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            counter("adzuna_cache", result="coalesced")
+        return list(await asyncio.shield(task))
 
+    async def _cache_get(self, key: str) -> list[dict[str, Any]] | None:
+        if self._store is not None:
+            try:
+                v = await self._store.get(key)
+            except Exception as e:  # noqa: BLE001
+                log.warning("adzuna.cache.store_error", err=str(e))
+            else:
+                return json.loads(v) if v else None
+        hit = self._local.get(key)
+        return list(hit) if hit is not None else None
+
+    async def _fetch_and_store(
+        self,
+        key: str,
+        ttl: int,
+        country: str,
+        page: int,
+        results_per_page: int,
+        query: dict[str, Any],
+    ) -> list[dict[str, Any]]:
+        out = await self._fetch(country, page, results_per_page, **query)
+        if self._store is not None:
+            try:
+                await self._store.setex(key, ttl, json.dumps(out))
+                return out
+            except Exception as e:  # noqa: BLE001
+                log.warning("adzuna.cache.store_error", err=str(e))
+        self._local.set(key, out)
+        return out
+
+    async def _fetch(
+        self,
+        country: str,
+        page: int,
+        results_per_page: int,
+        *,
+        what: str | None = None,
+        where: str | None = None,
+        sort: str | None = None,
+        max_days_old: int | None = None,
+        salary_min: int | None = None,
+    ) -> list[dict[str, Any]]:
         base = self._settings.ADZUNA_BASE_URL.rstrip("/")
         url = f"{base}/{country}/search/{page}"
         params: dict[str, Any] = {
@@ -89,27 +261,28 @@ class AdzunaClient:
 
         client = self._client_or_create()
         backoffs = [0.2, 0.4, 0.8]
+        out: list[dict[str, Any]] = []
         for attempt, backoff in enumerate(backoffs, start=1):
             try:
                 with timer("adzuna_search", attempt=str(attempt)):
                     resp = await client.get(url, params=params)
                 resp.raise_for_status()
                 data = resp.json()
-                out: list[dict[str, Any]] = []
+                out = []
                 seen: set[str] = set()
                 for it in data.get("results", []):
-                    url = it.get("redirect_url")
-                    if url and url in seen:
+                    link = it.get("redirect_url")
+                    if link and link in seen:
                         continue
-                    if url:
-                        seen.add(url)
+                    if link:
+                        seen.add(link)
                     out.append(
                         {
                             "title": it.get("title"),
                             "company": {"display_name": (it.get("company") or {}).get("display_name")},
                             "location": {"display_name": (it.get("location") or {}).get("display_name")},
                             "created": it.get("created"),
-                            "redirect_url": url,
+                            "redirect_url": link,
                             "salary_min": it.get("salary_min"),
                             "salary_max": it.get("salary_max"),
                             "category": {
@@ -119,11 +292,17 @@ class AdzunaClient:
                             "description": it.get("description") or "",
                         }
                     )
-                return out
+                break
             except Exception as e:  # noqa: BLE001
                 log.warning("adzuna.search.error", attempt=attempt, err=str(e))
                 if attempt == len(backoffs):
                     raise
                 await asyncio.sleep(backoff)
-        return []
+        # Outside the retry loop: a failing sink must not refetch the page
+        if self._sink is not None and out:
+            try:
+                self._sink(out)
+            except Exception as e:  # noqa: BLE001 - the corpus is best effort
+                log.warning("adzuna.sink_error", err=str(e))
+        return out
 
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import asyncio
+from contextlib import suppress
+from typing import Any, Callable, Sequence
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import CorpusConfig
+from app.domain.models import NormalizedJob
+from app.domain.normalization import normalize_item
+from app.infra.db import session_scope
+from app.repositories.vacancies import VacanciesRepo
+from app.telemetry.logger import get_logger
+from app.telemetry.metrics import counter
+
+log = get_logger("jobs.corpus")
+
+
+class VacancyCorpus:
+    """Collects raw Adzuna results and writes them to ``vacancies`` in batches.
+
+    ``add`` only appends to a buffer, so it is safe to call from the request
+    path; a background task normalizes and upserts the buffer every
+    ``flush_seconds``, then hands the normalized batch to each of ``listeners``
+    (the local search index, corpus-IDF rankers).
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        cfg: CorpusConfig,
+        listeners: Sequence[Callable[[list[NormalizedJob]], None]] = (),
+    ) -> None:
+        self.session_factory = session_factory
+        self.cfg = cfg
+        self.listeners = list(listeners)
+        self._pending: list[dict[str, Any]] = []
+        self._task: asyncio.Task[None] | None = None
+
+    def add(self, items: list[dict[str, Any]]) -> None:
+        room = self.cfg.max_pending - len(self._pending)
+        if room < len(items):
+            counter("vacancies_dropped", len(items) - max(room, 0))
+        if room > 0:
+            self._pending.extend(items[:room])
+
+    async def flush(self) -> int:
+        batch, self._pending = self._pending, []
+        jobs = []
+        for raw in batch:
+            try:
+                jobs.append(normalize_item(raw))  # type: ignore[arg-type]
+            except Exception:  # noqa: BLE001 - malformed upstream item
+                counter("vacancies_dropped")
+        if not jobs:
+            return 0
+        try:
+            async with session_scope(self.session_factory) as s:
+                await VacanciesRepo(s).upsert_many(jobs, chunk=self.cfg.batch_size)
+        except Exception:
+            counter("vacancies_dropped", len(jobs))
+            raise
+        counter("vacancies_upserted", len(jobs))
+        for listen in self.listeners:
+            listen(jobs)
+        return len(jobs)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.cfg.flush_seconds)
+            try:
+                await self.flush()
+            except Exception as e:  # noqa: BLE001 - DB hiccup; this batch is lost
+                log.warning("corpus.flush_error", err=str(e))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        try:
+            await self.flush()
+        except Exception as e:  # noqa: BLE001
+            log.warning("corpus.flush_error", err=str(e))
@@ -1,22 +1,221 @@
 from __future__ import annotations
 
 import asyncio
-from typing import Awaitable, Callable
+import heapq
+import itertools
+from collections import defaultdict
+from contextlib import suppress
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone, tzinfo
+from typing import Awaitable, Callable, Hashable
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from app.telemetry.logger import get_logger
+
+
+log = get_logger("jobs.scheduler")
+
+_ALIASES = {
+    "@hourly": "0 * * * *",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@weekly": "0 0 * * 0",
+    "@monthly": "0 0 1 * *",
+}
+# Fields: minute, hour, day of month, month, day of week (0 or 7 = Sunday)
+_BOUNDS = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+
+def _parse_field(spec: str, lo: int, hi: int) -> frozenset[int]:
+    out: set[int] = set()
+    for part in spec.split(","):
+        step = 1
+        if "/" in part:
+            part, step_s = part.split("/", 1)
+            step = int(step_s)
+            if step < 1:
+                raise ValueError(f"Invalid cron step: {step_s}")
+        if part == "*":
+            a, b = lo, hi
+        elif "-" in part:
+            a_s, b_s = part.split("-", 1)
+            a, b = int(a_s), int(b_s)
+        else:
+            a = int(part)
+            b = hi if step > 1 else a
+        if a < lo or b > hi or a > b:
+            raise ValueError(f"Cron value out of range: {part}")
+        out.update(range(a, b + 1, step))
+    return frozenset(out)
+
+
+def zone(name: str | None) -> tzinfo:
+    try:
+        return ZoneInfo(name or "UTC")
+    except (ZoneInfoNotFoundError, ValueError):
+        return timezone.utc
+
+
+@dataclass(frozen=True)
+class CronSpec:
+    minutes: frozenset[int]
+    hours: frozenset[int]
+    days: frozenset[int]
+    months: frozenset[int]
+    weekdays: frozenset[int]  # cron numbering, Sunday = 0
+    any_day: bool
+    any_weekday: bool
+
+    @classmethod
+    def parse(cls, expr: str) -> CronSpec:
+        expr = _ALIASES.get(expr.strip(), expr.strip())
+        fields = expr.split()
+        if len(fields) != 5:
+            raise ValueError(f"Expected 5 cron fields, got {expr!r}")
+        minutes, hours, days, months, weekdays = (
+            _parse_field(f, lo, hi) for f, (lo, hi) in zip(fields, _BOUNDS)
+        )
+        return cls(
+            minutes=minutes,
+            hours=hours,
+            days=days,
+            months=months,
+            weekdays=frozenset(d % 7 for d in weekdays),
+            any_day=fields[2] == "*",
+            any_weekday=fields[4] == "*",
+        )
+
+    def _day_ok(self, d: date) -> bool:
+        if d.month not in self.months:
+            return False
+        dom = d.day in self.days
+        dow = (d.weekday() + 1) % 7 in self.weekdays
+        # Vixie cron: when both fields are restricted either one may match
+        if self.any_day or self.any_weekday:
+            return dom and dow
+        return dom or dow
+
+    def next_after(self, after: datetime, tz: tzinfo = timezone.utc) -> datetime:
+        """First fire time strictly after ``after``, evaluated in ``tz``, returned in UTC."""
+        local = after.astimezone(tz)
+        day = local.date()
+        hours = sorted(self.hours)
+        minutes = sorted(self.minutes)
+        # Walk days rather than minutes so sparse schedules stay cheap
+        for offset in range(366 * 5):
+            d = day + timedelta(days=offset)
+            if not self._day_ok(d):
+                continue
+            for h in hours:
+                for m in minutes:
+                    cand = datetime.combine(d, time(h, m), tzinfo=tz).astimezone(timezone.utc)
+                    if cand > after:
+                        return cand
+        raise ValueError("Cron expression never fires")
+
+
+Handler = Callable[[list[tuple[Hashable, datetime]]], Awaitable[dict[Hashable, datetime | None]]]
 
 
 class Scheduler:
-    def __init__(self):
-        self._tasks: list[asyncio.Task] = []
+    """One timer loop over a min-heap of next fire times for any number of schedules.
+
+    A job registers a handler; due entries of that job are handed to it in one
+    batch and the handler returns the next fire time per key (``None`` drops it).
+    If the handler raises, the batch is retried after ``retry_seconds``, doubling
+    per consecutive failure up to ``max_retry_seconds``.
+    """
+
+    def __init__(self, retry_seconds: float = 30.0, max_retry_seconds: float = 600.0) -> None:
+        self.retry_seconds = retry_seconds
+        self.max_retry_seconds = max_retry_seconds
+        self._failures: dict[str, int] = defaultdict(int)
+        # (fire at, seq, job, key, slot); slot is the time handed to the handler,
+        # which stays the original one when a failed batch is retried later
+        self._heap: list[tuple[datetime, int, str, Hashable, datetime]] = []
+        self._seq = itertools.count()
+        self._handlers: dict[str, Handler] = {}
+        self._gen: dict[str, int] = defaultdict(int)
+        self._wake = asyncio.Event()
+        self._loop_task: asyncio.Task[None] | None = None
+        self._running: set[asyncio.Task[None]] = set()
+
+    def register(self, job: str, handler: Handler) -> None:
+        self._handlers[job] = handler
+
+    def schedule(self, job: str, key: Hashable, when: datetime, fire_at: datetime | None = None) -> None:
+        heapq.heappush(self._heap, (fire_at or when, next(self._seq), job, key, when))
+        self._wake.set()
+        self._ensure_loop()
 
-    def cron_daily(self, hour: int, minute: int, coro: Callable[[], Awaitable[None]]):
-        async def runner():
-            while True:
-                await asyncio.sleep(3600)  # placeholder; real cron parsing omitted
+    def reset(self, job: str) -> None:
+        """Drop every pending entry of ``job``; results of in-flight runs are ignored."""
+        self._gen[job] += 1
+        self._heap = [e for e in self._heap if e[2] != job]
+        heapq.heapify(self._heap)
+
+    def cron_daily(self, hour: int, minute: int, coro: Callable[[], Awaitable[None]], tz: str = "UTC") -> None:
+        spec = CronSpec.parse(f"{minute} {hour} * * *")
+        tzi = zone(tz)
+        job = f"daily:{hour:02d}:{minute:02d}:{next(self._seq)}"
+
+        async def handler(items: list[tuple[Hashable, datetime]]) -> dict[Hashable, datetime | None]:
+            try:
                 await coro()
+            except Exception as e:  # noqa: BLE001
+                log.warning("scheduler.job_error", job=job, err=str(e))
+            return {key: spec.next_after(datetime.now(timezone.utc), tzi) for key, _ in items}
 
-        self._tasks.append(asyncio.create_task(runner()))
+        self.register(job, handler)
+        self.schedule(job, job, spec.next_after(datetime.now(timezone.utc), tzi))
 
-    async def stop(self):
-        for t in self._tasks:
-            t.cancel()
+    def _ensure_loop(self) -> None:
+        if self._loop_task is None or self._loop_task.done():
+            self._loop_task = asyncio.create_task(self._run())
 
+    async def _run(self) -> None:
+        while True:
+            self._wake.clear()
+            if not self._heap:
+                await self._wake.wait()
+                continue
+            now = datetime.now(timezone.utc)
+            delay = (self._heap[0][0] - now).total_seconds()
+            if delay > 0:
+                with suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self._wake.wait(), timeout=delay)
+                continue
+            due: dict[str, list[tuple[Hashable, datetime]]] = defaultdict(list)
+            while self._heap and self._heap[0][0] <= now:
+                _, _, job, key, slot = heapq.heappop(self._heap)
+                if job in self._handlers:
+                    due[job].append((key, slot))
+            for job, items in due.items():
+                t = asyncio.create_task(self._fire(job, self._gen[job], items))
+                self._running.add(t)
+                t.add_done_callback(self._running.discard)
+
+    async def _fire(self, job: str, gen: int, items: list[tuple[Hashable, datetime]]) -> None:
+        try:
+            nxt = await self._handlers[job](items)
+        except Exception as e:  # noqa: BLE001
+            self._failures[job] += 1
+            delay = min(self.retry_seconds * 2 ** (self._failures[job] - 1), self.max_retry_seconds)
+            log.warning("scheduler.handler_error", job=job, err=str(e), retry_in=delay)
+            if gen == self._gen[job]:
+                retry_at = datetime.now(timezone.utc) + timedelta(seconds=delay)
+                for key, slot in items:
+                    self.schedule(job, key, slot, fire_at=retry_at)
+            return
+        self._failures.pop(job, None)
+        if gen != self._gen[job]:
+            return  # job was reset while firing; the reload owns rescheduling
+        for key, when in nxt.items():
+            if when is not None:
+                self.schedule(job, key, when)
+
+    async def stop(self) -> None:
+        tasks = [t for t in (self._loop_task, *self._running) if t is not None]
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
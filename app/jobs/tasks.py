@@ -1,15 +1,242 @@
 from __future__ import annotations
 
-from typing import Sequence
+import asyncio
+import html
+from collections import defaultdict
+from contextlib import aclosing
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone, tzinfo
+from typing import Any, Hashable, Sequence
 
+from aiogram import Bot
+from aiogram.exceptions import TelegramAPIError, TelegramForbiddenError, TelegramRetryAfter
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.bot import i18n
 from app.config import AppConfig
-from app.domain.models import Card
+from app.domain.models import Card, Profile as DProfile, SearchParams
+from app.domain.pipeline import process
+from app.infra.db import session_scope
+from app.jobs.scheduler import CronSpec, Scheduler, zone
 from app.integrations.adzuna_client import AdzunaClient
+from app.plugins.rankers import Ranker
+from app.repositories.blacklist import BlacklistRepo
+from app.repositories.profiles import ProfilesRepo, to_domain
+from app.repositories.shown import ShownRepo
+from app.repositories.subscriptions import SubscriptionsRepo
+from app.repositories.users import UsersRepo
+from app.telemetry.logger import get_logger
+
+
+log = get_logger("jobs.digest")
+
+
+@dataclass(frozen=True)
+class DigestQuery:
+    """Adzuna query shared by every subscriber with the same search inputs."""
+
+    what: str | None
+    where: str | None
+    salary_min: int | None
+
+
+def query_for(profile: DProfile) -> DigestQuery:
+    return DigestQuery(
+        what=(profile.role or "").strip().lower() or None,
+        where=(profile.locations[0].strip().lower() if profile.locations else None) or None,
+        salary_min=profile.salary_min or None,
+    )
+
+
+def group_by_query(profiles: dict[int, DProfile]) -> dict[DigestQuery, list[tuple[int, DProfile]]]:
+    groups: dict[DigestQuery, list[tuple[int, DProfile]]] = defaultdict(list)
+    for user_id, prof in profiles.items():
+        groups[query_for(prof)].append((user_id, prof))
+    return groups
+
+
+def _render_digest(cards: Sequence[Card], lang: str) -> str:
+    blocks = [f"<b>{i18n.load(lang)['digest.header']}</b>"]
+    for i, c in enumerate(cards, start=1):
+        title = html.escape(c["title"])
+        if c["apply_url"]:
+            title = f'<a href="{html.escape(c["apply_url"], quote=True)}">{title}</a>'
+        blocks.append(f"{i}. {title}\n📍 {html.escape(c['subtitle'])}")
+    return "\n\n".join(blocks)
+
+
+async def _fetch(adzuna: AdzunaClient, q: DigestQuery, params: SearchParams) -> list[dict[str, Any]]:
+    results: list[dict[str, Any]] = []
+    pages = adzuna.search_pages(params, what=q.what, where=q.where, salary_min=q.salary_min)
+    async with aclosing(pages):
+        async for page in pages:
+            results.extend(page)
+    return results
+
+
+async def _deliver(bot: Bot, chat_id: int, text: str) -> bool:
+    # Pacing is the bot session's OutgoingRateLimiter
+    for _ in range(3):
+        try:
+            await bot.send_message(chat_id, text, disable_web_page_preview=True)
+            return True
+        except TelegramRetryAfter as e:
+            await asyncio.sleep(e.retry_after)
+        except TelegramForbiddenError:
+            # User blocked the bot; nothing to deliver
+            return False
+        except TelegramAPIError as e:
+            log.warning("digest.send_error", chat_id=chat_id, err=str(e))
+            return False
+    return False
+
+
+async def send_subscriptions(
+    cfg: AppConfig,
+    adzuna: AdzunaClient,
+    session_factory: async_sessionmaker[AsyncSession],
+    bot: Bot,
+    user_ids: Sequence[int] | None = None,
+    ranker: Ranker | None = None,
+) -> int:
+    """Send a digest of up to ``cfg.digest.max_cards`` cards to each subscriber.
+
+    Subscribers whose profiles produce the same Adzuna query share one fetch;
+    the pipeline then runs per profile on the shared results, skipping
+    blacklisted companies and vacancies the subscriber has already been
+    shown. Pass ``user_ids`` to limit the run to specific (e.g. due)
+    subscribers. Returns messages sent.
+    """
+    async with session_scope(session_factory) as s:
+        if user_ids is None:
+            user_ids = sorted({sub.user_id for sub in await SubscriptionsRepo(s).list_enabled()})
+        db_profiles = await ProfilesRepo(s).get_many(user_ids)
+        langs = await UsersRepo(s).get_langs(user_ids)
+        seen = await ShownRepo(s, cfg.search.seen_days).seen_many(user_ids)
+        blocked = await BlacklistRepo(s).companies_many(user_ids)
+    profiles = {uid: to_domain(p) for uid, p in db_profiles.items()}
+    groups = group_by_query(profiles)
+    log.info("digest.start", subscribers=len(profiles), queries=len(groups))
+
+    params = SearchParams(max_days_old=cfg.search.max_days_old_default, sort="relevance")
+    fetch_sem = asyncio.Semaphore(max(1, cfg.digest.fetch_concurrency))
+    send_sem = asyncio.Semaphore(max(1, cfg.digest.send_concurrency))
+    delivered: list[tuple[int, str]] = []
+
+    async def send_one(user_id: int, cards: list[Card]) -> bool:
+        async with send_sem:
+            ok = await _deliver(bot, user_id, _render_digest(cards, langs.get(user_id, "ru")))
+        if ok:
+            delivered.extend((user_id, c.get("vacancy_hash", "")) for c in cards)
+        return ok
+
+    async def run_group(q: DigestQuery, members: list[tuple[int, DProfile]]) -> int:
+        async with fetch_sem:
+            try:
+                results = await _fetch(adzuna, q, params)
+            except Exception as e:  # noqa: BLE001
+                log.warning("digest.fetch_error", what=q.what, where=q.where, err=str(e))
+                return 0
+        sends = []
+        for user_id, prof in members:
+            pr = process(results, prof, params, cfg, seen.get(user_id), blocked.get(user_id), ranker)
+            cards = select_digest(pr["cards"], cfg.digest.max_cards)
+            if cards:
+                sends.append(send_one(user_id, cards))
+        return sum(await asyncio.gather(*sends))
+
+    counts = await asyncio.gather(*(run_group(q, m) for q, m in groups.items()))
+    sent = sum(counts)
+    if delivered:
+        async with session_scope(session_factory) as s:
+            await ShownRepo(s, cfg.search.seen_days).record_many(delivered)
+    log.info("digest.done", sent=sent)
+    return sent
+
+
+DIGEST_JOB = "digest"
+DIGEST_REFRESH_JOB = "digest:refresh"
+
+
+def _as_utc(dt: datetime) -> datetime:
+    # sqlite hands back naive datetimes; everything we persist is UTC
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+async def schedule_digests(
+    scheduler: Scheduler,
+    cfg: AppConfig,
+    adzuna: AdzunaClient,
+    session_factory: async_sessionmaker[AsyncSession],
+    bot: Bot,
+    ranker: Ranker | None = None,
+) -> None:
+    """Put every enabled subscription on ``scheduler`` by its cron and user timezone.
+
+    Next fire times live in ``subscriptions.next_run_at``: missed slots fire
+    once after a restart, and each slot is claimed with a compare-and-set
+    before sending so it is never delivered twice.
+    """
+    specs: dict[Hashable, tuple[CronSpec, tzinfo]] = {}
+
+    async def load() -> None:
+        now = datetime.now(timezone.utc)
+        async with session_scope(session_factory) as s:
+            repo = SubscriptionsRepo(s)
+            rows = await repo.list_enabled_with_tz()
+            scheduler.reset(DIGEST_JOB)
+            specs.clear()
+            fresh: list[tuple[int, str, datetime]] = []
+            for sub, tz in rows:
+                try:
+                    spec = CronSpec.parse(sub.schedule_cron or "")
+                except ValueError as e:
+                    log.warning("digest.bad_cron", user_id=sub.user_id, kind=sub.kind, err=str(e))
+                    continue
+                tzi = zone(tz)
+                key = (sub.user_id, sub.kind)
+                specs[key] = (spec, tzi)
+                if sub.next_run_at is None:
+                    when = spec.next_after(now, tzi)
+                    fresh.append((sub.user_id, sub.kind, when))
+                else:
+                    when = _as_utc(sub.next_run_at)
+                scheduler.schedule(DIGEST_JOB, key, when)
+            await repo.set_next_runs(fresh)
+        log.info("digest.schedules_loaded", count=len(specs))
+
+    async def fire(items: list[tuple[Hashable, datetime]]) -> dict[Hashable, datetime | None]:
+        now = datetime.now(timezone.utc)
+        nxt: dict[Hashable, datetime | None] = {}
+        slots: dict[tuple[datetime, datetime], list[tuple[int, str]]] = defaultdict(list)
+        for key, when in items:
+            if key not in specs:
+                nxt[key] = None
+                continue
+            spec, tzi = specs[key]
+            nxt[key] = spec.next_after(now, tzi)
+            slots[(when, nxt[key])].append(key)  # type: ignore[arg-type]
+        claimed: list[tuple[int, str]] = []
+        async with session_scope(session_factory) as s:
+            repo = SubscriptionsRepo(s)
+            for (when, new), keys in slots.items():
+                claimed += await repo.claim_runs(keys, when, new)
+        if claimed:
+            await send_subscriptions(cfg, adzuna, session_factory, bot, sorted({u for u, _ in claimed}), ranker)
+        return nxt
 
+    async def refresh(items: list[tuple[Hashable, datetime]]) -> dict[Hashable, datetime | None]:
+        await load()
+        return {DIGEST_REFRESH_JOB: datetime.now(timezone.utc) + timedelta(seconds=cfg.digest.refresh_seconds)}
 
-async def send_subscriptions(cfg: AppConfig, adzuna: AdzunaClient) -> None:
-    # Placeholder: in real impl, load subs from DB, per user run pipeline and send up to 7 cards
-    return
+    scheduler.register(DIGEST_JOB, fire)
+    scheduler.register(DIGEST_REFRESH_JOB, refresh)
+    await load()
+    scheduler.schedule(
+        DIGEST_REFRESH_JOB,
+        DIGEST_REFRESH_JOB,
+        datetime.now(timezone.utc) + timedelta(seconds=cfg.digest.refresh_seconds),
+    )
 
 
 def select_digest(cards: Sequence[Card], limit: int = 7) -> list[Card]:
@@ -2,10 +2,8 @@ from __future__ import annotations
 
 import asyncio
 import contextlib
-import json
 import os
 import sys
-from pathlib import Path
 
 from aiohttp import web
 from aiogram import Router
@@ -13,6 +11,7 @@ from aiogram.exceptions import TelegramConflictError
 
 from app.bot.handlers import health as h_health
 from app.bot import anchor as h_anchor
+from app.bot import i18n
 from app.bot.middlewares import (
     I18nMiddleware,
     InjectDepsMiddleware,
@@ -21,6 +20,11 @@ from app.bot.middlewares import (
 )
 from app.container import build_container
 from app.infra.redis import KeyValueStore
+from app.infra.sharding import ShardLeases
+from app.infra.webhook import WebhookIngress
+from app.jobs.scheduler import Scheduler
+from app.jobs.tasks import schedule_digests
+from app.telemetry import metrics
 
 
 async def _keep_lock_alive(
@@ -38,32 +42,69 @@ async def _keep_lock_alive(
 
 async def main() -> None:
     c = await build_container()
-    # Acquire a simple distributed lock to avoid running multiple instances
+    webhook_url = c.settings.WEBHOOK_URL
     lock_key = "bot:lock"
-    lock_ttl = 60
-    lock_value = str(os.getpid())
-    if not await c.store.set_nx(lock_key, lock_value, ex=lock_ttl):
-        print("Another bot instance is already running. Exiting.", file=sys.stderr)
-        return
-    lock_refresher = asyncio.create_task(
-        _keep_lock_alive(c.store, lock_key, lock_value, lock_ttl)
-    )
-    # Ensure no leftover webhooks interfere with polling
-    await c.bot.delete_webhook(drop_pending_updates=True)
-    # Probe for existing long-polling sessions to avoid noisy errors
-    try:
-        await c.bot.get_updates(limit=1, timeout=0)
-    except TelegramConflictError:
-        print("Another bot instance is already running. Exiting.", file=sys.stderr)
-        await c.store.delete(lock_key)
-        return
+    lock_refresher: asyncio.Task[None] | None = None
+    leases: ShardLeases | None = None
+    if webhook_url:
+        # Webhook replicas share the load; no single-instance lock needed
+        if not c.settings.WEBHOOK_SECRET:
+            print("WEBHOOK_SECRET is required in webhook mode. Exiting.", file=sys.stderr)
+            return
+        if c.cfg.sharding.shards > 1:
+            if not c.settings.SHARD_URL:
+                print("SHARD_URL is required when sharding. Exiting.", file=sys.stderr)
+                return
+            leases = ShardLeases(
+                c.store,
+                c.cfg.sharding.shards,
+                c.settings.SHARD_URL,
+                ttl=c.cfg.sharding.lease_ttl,
+                max_owned=c.cfg.sharding.max_per_process,
+            )
+            await leases.renew()
+            leases.start()
+    else:
+        # Acquire a simple distributed lock to avoid running multiple instances
+        lock_ttl = 60
+        lock_value = str(os.getpid())
+        if not await c.store.set_nx(lock_key, lock_value, ex=lock_ttl):
+            print("Another bot instance is already running. Exiting.", file=sys.stderr)
+            return
+        lock_refresher = asyncio.create_task(
+            _keep_lock_alive(c.store, lock_key, lock_value, lock_ttl)
+        )
+        # Ensure no leftover webhooks interfere with polling
+        await c.bot.delete_webhook(drop_pending_updates=True)
+        # Probe for existing long-polling sessions to avoid noisy errors
+        try:
+            await c.bot.get_updates(limit=1, timeout=0)
+        except TelegramConflictError:
+            print("Another bot instance is already running. Exiting.", file=sys.stderr)
+            await c.store.delete(lock_key)
+            return
 
     # Lightweight web server for Render.com health checks
     async def http_health(_: web.Request) -> web.Response:
         return web.Response(text="OK")
 
+    async def http_metrics(_: web.Request) -> web.Response:
+        return web.Response(body=metrics.render().encode(), headers={"Content-Type": metrics.CONTENT_TYPE})
+
     app = web.Application()
     app.router.add_get("/", http_health)
+    app.router.add_get("/metrics", http_metrics)
+    ingress: WebhookIngress | None = None
+    if webhook_url:
+        ingress = WebhookIngress(
+            c.dp,
+            c.bot,
+            c.settings.WEBHOOK_SECRET,
+            queue_size=c.cfg.webhook.queue_size,
+            workers=c.cfg.webhook.workers,
+            leases=leases,
+        )
+        ingress.setup(app, c.cfg.webhook.path)
     port = int(os.environ.get("PORT", "8080"))
     runner = web.AppRunner(app)
     await runner.setup()
@@ -71,23 +112,28 @@ async def main() -> None:
     await site.start()
 
     # Middlewares
-    ru = json.loads(Path("app/bot/i18n/ru.json").read_text("utf-8"))
-    en = json.loads(Path("app/bot/i18n/en.json").read_text("utf-8"))
-    c.dp.message.middleware(I18nMiddleware(ru, en))
-    c.dp.callback_query.middleware(I18nMiddleware(ru, en))
+    ru, en = i18n.load("ru"), i18n.load("en")
+    # Rate limits first so dropped updates never reach the DB
+    c.dp.message.middleware(RateLimitMiddleware(c.cfg.ratelimit.per_user_per_minute, c.store))
+    c.dp.callback_query.middleware(
+        RateLimitMiddleware(c.cfg.ratelimit.callbacks_per_user_per_minute, c.store, kind="cb")
+    )
+    c.dp.message.middleware(I18nMiddleware(ru, en, c.dp["session_factory"], c.store))
+    c.dp.callback_query.middleware(I18nMiddleware(ru, en, c.dp["session_factory"], c.store))
     c.dp.message.middleware(InjectSessionMiddleware(c.dp["session_factory"]))
     c.dp.callback_query.middleware(InjectSessionMiddleware(c.dp["session_factory"]))
     c.dp.message.middleware(
         InjectDepsMiddleware(
             cfg=c.dp["cfg"], adzuna=c.dp["adzuna"], store=c.dp["store"], settings=c.dp["settings"],
+            index=c.index, ranker=c.ranker,
         ),
     )
     c.dp.callback_query.middleware(
         InjectDepsMiddleware(
             cfg=c.dp["cfg"], adzuna=c.dp["adzuna"], store=c.dp["store"], settings=c.dp["settings"],
+            index=c.index, ranker=c.ranker,
         ),
     )
-    c.dp.message.middleware(RateLimitMiddleware(c.cfg.ratelimit.per_user_per_minute, c.store))
 
     # Routers
     router = Router()
@@ -97,13 +143,37 @@ async def main() -> None:
     router.include_router(h_health.router)
     c.dp.include_router(router)
 
+    # Subscription digests
+    scheduler = Scheduler()
+    await schedule_digests(scheduler, c.cfg, c.adzuna, c.dp["session_factory"], c.bot, c.ranker)
+    if c.corpus is not None:
+        c.corpus.start()
+
     try:
-        await c.dp.start_polling(c.bot)
+        if ingress is not None:
+            ingress.start()
+            await c.bot.set_webhook(
+                webhook_url.rstrip("/") + c.cfg.webhook.path,
+                secret_token=c.settings.WEBHOOK_SECRET,
+                allowed_updates=c.dp.resolve_used_update_types(),
+            )
+            await asyncio.Event().wait()
+        else:
+            await c.dp.start_polling(c.bot)
     finally:
-        lock_refresher.cancel()
-        with contextlib.suppress(asyncio.CancelledError):
-            await lock_refresher
-        await c.store.delete(lock_key)
+        await scheduler.stop()
+        if c.corpus is not None:
+            await c.corpus.stop()
+        if ingress is not None:
+            await ingress.stop()
+        if leases is not None:
+            await leases.release()
+        await runner.cleanup()
+        if lock_refresher is not None:
+            lock_refresher.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await lock_refresher
+            await c.store.delete(lock_key)
 
 
 if __name__ == "__main__":
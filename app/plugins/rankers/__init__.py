@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from typing import Callable
+
+from .base import Ranker
+from .tfidf_title_desc import TfidfTitleDescRanker
+
+# Names accepted in config.yaml under scoring.ranker
+RANKERS: dict[str, Callable[[], Ranker]] = {
+    "tfidf_title_desc": TfidfTitleDescRanker,
+}
+
+_INSTANCES: dict[str, Ranker] = {}
+
+
+def get_ranker(name: str | None) -> Ranker | None:
+    """Shared instance of the ranker registered as ``name``; ``None`` for no ranker."""
+    if not name:
+        return None
+    r = _INSTANCES.get(name)
+    if r is None:
+        factory = RANKERS.get(name)
+        if factory is None:
+            raise ValueError(f"Unknown ranker {name!r}; expected one of {sorted(RANKERS)}")
+        r = _INSTANCES[name] = factory()
+    return r
+
+
+__all__ = ["RANKERS", "Ranker", "get_ranker"]
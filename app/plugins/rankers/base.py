@@ -1,10 +1,13 @@
 from __future__ import annotations
 
-from typing import Protocol
+from typing import Protocol, Sequence
 
 from app.domain.models import NormalizedJob, Profile
 
 
 class Ranker(Protocol):
-    def extra_score(self, job: NormalizedJob, profile: Profile) -> float: ...
+    """Extra relevance signal in [0, 1], scored over a whole result set at once."""
+
+    def scores(self, jobs: Sequence[NormalizedJob], profile: Profile) -> list[float]: ...
 
+    def extra_score(self, job: NormalizedJob, profile: Profile) -> float: ...
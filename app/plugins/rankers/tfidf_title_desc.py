@@ -2,28 +2,84 @@ from __future__ import annotations
 
 import math
 import re
-from collections import Counter
-from typing import Iterable
+from collections import Counter, OrderedDict
+from typing import Iterable, Sequence
 
+from app.domain.dedup import vacancy_hash
 from app.domain.models import NormalizedJob, Profile
 from .base import Ranker
 
+_NON_TOKEN_RE = re.compile(r"[^a-z0-9+_.-]")
+TITLE_WEIGHT = 2  # a title occurrence counts as two description ones
+
 
 def _tokens(text: str) -> list[str]:
-    t = re.sub(r"[^a-zA-Z0-9+_.-]", " ", text.lower())
+    t = _NON_TOKEN_RE.sub(" ", text.lower())
     t = t.replace("javascript", "js").replace("typescript", "ts")
     return [w for w in t.split() if len(w) > 1]
 
 
+def _tf(job: NormalizedJob) -> Counter[str]:
+    tf = Counter(_tokens(job["description"]))
+    for w in _tokens(job["title"]):
+        tf[w] += TITLE_WEIGHT
+    return tf
+
+
 class TfidfTitleDescRanker(Ranker):
-    def extra_score(self, job: NormalizedJob, profile: Profile) -> float:
-        # Simple TF weighting relative to provided skills
-        sk = {s.lower().replace("javascript", "js").replace("typescript", "ts") for s in profile.skills}
-        if not sk:
-            return 0.0
-        tokens = _tokens(job["title"]) * 2 + _tokens(job["description"])  # weight title tokens
-        tf = Counter(tokens)
-        total = sum(tf.values()) or 1
-        score = sum(tf.get(s, 0) for s in sk) / total
-        return min(1.0, score)
+    """Cosine similarity of profile skills to title+description TF-IDF vectors.
+
+    IDF comes from the corpus fed through ``update`` once it holds
+    ``min_corpus_docs`` vacancies, otherwise from the batch being scored.
+    Scores are plain cosines in [0, 1], not rescaled per batch, so a weak
+    best match stays weak.
+    """
 
+    def __init__(self, max_docs: int = 50_000, min_corpus_docs: int = 500) -> None:
+        self.max_docs = max_docs
+        self.min_corpus_docs = min_corpus_docs
+        self._docs: OrderedDict[str, frozenset[str]] = OrderedDict()
+        self._df: Counter[str] = Counter()
+
+    def update(self, jobs: Iterable[NormalizedJob]) -> None:
+        """Add vacancies to the corpus document frequencies; re-seen ones are replaced."""
+        for j in jobs:
+            key = vacancy_hash(j)
+            old = self._docs.pop(key, None)
+            if old is not None:
+                self._df.subtract(old)
+            terms = frozenset(_tokens(j["title"])) | frozenset(_tokens(j["description"]))
+            self._docs[key] = terms
+            self._df.update(terms)
+        while len(self._docs) > self.max_docs:
+            _, terms = self._docs.popitem(last=False)
+            self._df.subtract(terms)
+
+    def scores(self, jobs: Sequence[NormalizedJob], profile: Profile) -> list[float]:
+        query = {w for s in profile.skills for w in _tokens(s)}
+        if not jobs or not query:
+            return [0.0] * len(jobs)
+        tfs = [_tf(j) for j in jobs]
+        if len(self._docs) >= self.min_corpus_docs:
+            df, n = self._df, len(self._docs)
+        else:
+            df = Counter(w for tf in tfs for w in tf)
+            n = len(jobs)
+        # Smoothed IDF, so a term in every document still weighs 1
+        idf = {w: math.log((1 + n) / (1 + df.get(w, 0))) + 1.0 for w in query}
+        q_norm = math.sqrt(sum(v * v for v in idf.values()))
+        out: list[float] = []
+        for tf in tfs:
+            dot = sum(tf[w] * idf[w] * idf[w] for w in query if w in tf)
+            if not dot:
+                out.append(0.0)
+                continue
+            # Document norm over its own terms; unseen terms get the maximal IDF
+            d_norm = math.sqrt(
+                sum((c * (math.log((1 + n) / (1 + df.get(w, 0))) + 1.0)) ** 2 for w, c in tf.items())
+            )
+            out.append(dot / (d_norm * q_norm))
+        return out
+
+    def extra_score(self, job: NormalizedJob, profile: Profile) -> float:
+        return self.scores([job], profile)[0]
@@ -1,9 +1,11 @@
 from __future__ import annotations
 
 from datetime import datetime, timedelta, timezone
+from typing import Iterable
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.infra.db import bulk_upsert
 from app.infra.db_models import Applied
 
 
@@ -12,18 +14,15 @@ class AppliedRepo:
         self.s = session
 
     async def mark(self, user_id: int, redirect_url: str, ttl_seconds: int = 300) -> None:
-        now = datetime.now(timezone.utc)
-        exist = await self.s.get(Applied, {"user_id": user_id, "redirect_url": redirect_url})
-        if exist:
-            exist.applied_at = now
-            exist.expire_at = now + timedelta(seconds=ttl_seconds)
-        else:
-            self.s.add(
-                Applied(
-                    user_id=user_id,
-                    redirect_url=redirect_url,
-                    applied_at=now,
-                    expire_at=now + timedelta(seconds=ttl_seconds),
-                )
-            )
+        await self.mark_many([(user_id, redirect_url)], ttl_seconds)
 
+    async def mark_many(self, rows: Iterable[tuple[int, str]], ttl_seconds: int = 300) -> None:
+        """Mark ``(user_id, redirect_url)`` pairs applied now, refreshing existing marks."""
+        now = datetime.now(timezone.utc)
+        expire = now + timedelta(seconds=ttl_seconds)
+        await bulk_upsert(
+            self.s,
+            Applied,
+            ({"user_id": u, "redirect_url": url, "applied_at": now, "expire_at": expire} for u, url in rows),
+            update=("applied_at", "expire_at"),
+        )
@@ -1,7 +1,12 @@
 from __future__ import annotations
 
+from typing import Iterable
+
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.domain.filters import normalize_company
+from app.infra.db import bulk_upsert
 from app.infra.db_models import BlacklistCompany
 
 
@@ -10,7 +15,35 @@ class BlacklistRepo:
         self.s = session
 
     async def add(self, user_id: int, company: str) -> None:
-        rec = await self.s.get(BlacklistCompany, {"user_id": user_id, "company": company})
-        if not rec:
-            self.s.add(BlacklistCompany(user_id=user_id, company=company))
+        await self.add_many([(user_id, company)])
+
+    async def add_many(self, rows: Iterable[tuple[int, str]]) -> None:
+        """Insert ``(user_id, company)`` pairs; existing ones are left as they are.
+
+        Names are stored normalized; the no-company placeholder is skipped.
+        """
+        items = [(u, normalize_company(c)) for u, c in rows]
+        await bulk_upsert(self.s, BlacklistCompany, ({"user_id": u, "company": c} for u, c in items if c))
+
+    async def companies(self, user_id: int) -> frozenset[str]:
+        return (await self.companies_many([user_id]))[user_id]
+
+    async def companies_many(self, user_ids: Iterable[int], chunk: int = 1000) -> dict[int, frozenset[str]]:
+        """Normalized blacklists per user, one query per chunk.
 
+        Names are normalized again on read, so rows written before names were
+        stored normalized still match.
+        """
+        ids = list(user_ids)
+        out: dict[int, set[str]] = {uid: set() for uid in ids}
+        for i in range(0, len(ids), chunk):
+            res = await self.s.execute(
+                select(BlacklistCompany.user_id, BlacklistCompany.company).where(
+                    BlacklistCompany.user_id.in_(ids[i : i + chunk])
+                )
+            )
+            for uid, company in res.all():
+                key = normalize_company(company)
+                if key:
+                    out[uid].add(key)
+        return {uid: frozenset(companies) for uid, companies in out.items()}
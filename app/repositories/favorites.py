@@ -1,7 +1,10 @@
 from __future__ import annotations
 
+from typing import Iterable
+
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.infra.db import bulk_upsert
 from app.infra.db_models import Favorite
 
 
@@ -10,7 +13,8 @@ class FavoritesRepo:
         self.s = session
 
     async def add(self, user_id: int, redirect_url: str) -> None:
-        fav = await self.s.get(Favorite, {"user_id": user_id, "redirect_url": redirect_url})
-        if not fav:
-            self.s.add(Favorite(user_id=user_id, redirect_url=redirect_url))
+        await self.add_many([(user_id, redirect_url)])
 
+    async def add_many(self, rows: Iterable[tuple[int, str]]) -> None:
+        """Insert ``(user_id, redirect_url)`` pairs; existing ones are left as they are."""
+        await bulk_upsert(self.s, Favorite, ({"user_id": u, "redirect_url": url} for u, url in rows))
@@ -1,9 +1,37 @@
 from __future__ import annotations
 
+from typing import Any, Iterable
+
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.domain.models import Profile as DProfile
+from app.infra.db import bulk_upsert, upsert_stmt
 from app.infra.db_models import Profile as DBProfile
 
+_FIELDS = (
+    "role",
+    "employment_types",
+    "skills",
+    "locations",
+    "salary_min",
+    "salary_max",
+    "formats",
+    "experience_yrs",
+)
+
+
+def to_domain(prof: DBProfile) -> DProfile:
+    return DProfile(
+        role=prof.role or "",
+        skills=prof.skills or [],
+        locations=prof.locations or [],
+        salary_min=prof.salary_min or 0,
+        salary_max=prof.salary_max,
+        formats=prof.formats or [],
+        experience_yrs=prof.experience_yrs or 0,
+    )
+
 
 class ProfilesRepo:
     def __init__(self, session: AsyncSession):
@@ -22,18 +50,32 @@ class ProfilesRepo:
         formats: list[str],
         experience_yrs: int,
     ) -> None:
-        prof = await self.s.get(DBProfile, user_id)
-        if not prof:
-            prof = DBProfile(user_id=user_id)
-            self.s.add(prof)
-        prof.role = role
-        prof.employment_types = employment_types
-        prof.skills = skills
-        prof.locations = locations
-        prof.salary_min = salary_min
-        prof.salary_max = salary_max
-        prof.formats = formats
-        prof.experience_yrs = experience_yrs
+        row = {
+            "user_id": user_id,
+            "role": role,
+            "employment_types": employment_types,
+            "skills": skills,
+            "locations": locations,
+            "salary_min": salary_min,
+            "salary_max": salary_max,
+            "formats": formats,
+            "experience_yrs": experience_yrs,
+        }
+        # RETURNING + populate_existing keeps an already loaded profile in step
+        stmt = upsert_stmt(self.s, DBProfile, [row], update=_FIELDS).returning(DBProfile)
+        await self.s.execute(stmt, execution_options={"populate_existing": True})
+
+    async def upsert_many(self, rows: Iterable[dict[str, Any]], chunk: int | None = None) -> None:
+        """Upsert profiles given as dicts with ``user_id`` and every profile field."""
+        await bulk_upsert(self.s, DBProfile, rows, update=_FIELDS, chunk=chunk)
 
     async def get(self, user_id: int) -> DBProfile | None:
         return await self.s.get(DBProfile, user_id)
+
+    async def get_many(self, user_ids: Iterable[int], chunk: int = 1000) -> dict[int, DBProfile]:
+        ids = list(user_ids)
+        out: dict[int, DBProfile] = {}
+        for i in range(0, len(ids), chunk):
+            res = await self.s.execute(select(DBProfile).where(DBProfile.user_id.in_(ids[i : i + chunk])))
+            out.update({p.user_id: p for p in res.scalars().all()})
+        return out
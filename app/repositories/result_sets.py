@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import json
+import secrets
+
+from app.domain.models import Card
+from app.infra.cache import TTLCache
+from app.infra.redis import KeyValueStore
+
+# Result sets never change once saved, so a local copy is always valid
+_LOCAL: TTLCache[str, list[Card]] = TTLCache(maxsize=2048, ttl=300.0)
+
+
+class ResultSetsRepo:
+    """Search results stored apart from ``ui_sessions``; the session keeps only id + cursor."""
+
+    def __init__(self, store: KeyValueStore, ttl: int = 86400):
+        self.store = store
+        self.ttl = ttl
+
+    async def save(self, cards: list[Card]) -> str:
+        rs_id = secrets.token_urlsafe(8)
+        blob = json.dumps(cards, ensure_ascii=False, separators=(",", ":"))
+        await self.store.setex(f"rs:{rs_id}", self.ttl, blob)
+        _LOCAL.set(rs_id, cards)
+        return rs_id
+
+    async def load(self, rs_id: str | None) -> list[Card]:
+        """Cards of ``rs_id``; empty when unknown or expired."""
+        if not rs_id:
+            return []
+        cards = _LOCAL.get(rs_id)
+        if cards is None:
+            v = await self.store.get(f"rs:{rs_id}")
+            if not v:
+                return []
+            cards = json.loads(v)
+            _LOCAL.set(rs_id, cards)
+        return cards
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from typing import Iterable
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.infra.db import bulk_upsert
+from app.infra.db_models import ShownCache
+from app.repositories.blacklist import BlacklistRepo
+
+
+class ShownRepo:
+    """Vacancies already shown to a user, kept in ``shown_cache`` for ``days``.
+
+    Rows older than ``days`` are ignored, so a vacancy can resurface later;
+    showing it again refreshes ``shown_at``. ``days <= 0`` turns suppression off.
+    """
+
+    def __init__(self, session: AsyncSession, days: int = 30):
+        self.s = session
+        self.days = days
+
+    async def seen(self, user_id: int) -> set[str]:
+        return (await self.seen_many([user_id]))[user_id]
+
+    async def seen_many(self, user_ids: Iterable[int], chunk: int = 1000) -> dict[int, set[str]]:
+        """Seen hashes per user, read from the table with one query per chunk.
+
+        There is no process cache: the query walks the primary-key prefix, and
+        reading the table keeps every replica consistent with what was committed.
+        """
+        ids = list(user_ids)
+        out: dict[int, set[str]] = {uid: set() for uid in ids}
+        if self.days <= 0:
+            return out
+        cutoff = datetime.now(timezone.utc) - timedelta(days=self.days)
+        for i in range(0, len(ids), chunk):
+            res = await self.s.execute(
+                select(ShownCache.user_id, ShownCache.vacancy_hash).where(
+                    ShownCache.user_id.in_(ids[i : i + chunk]), ShownCache.shown_at >= cutoff
+                )
+            )
+            for uid, h in res.all():
+                out[uid].add(h)
+        return out
+
+    async def record(self, user_id: int, hashes: Iterable[str]) -> None:
+        await self.record_many((user_id, h) for h in hashes)
+
+    async def record_many(self, rows: Iterable[tuple[int, str]]) -> None:
+        """Mark ``(user_id, vacancy_hash)`` pairs shown now, in one upsert per chunk."""
+        if self.days <= 0:
+            return
+        now = datetime.now(timezone.utc)
+        items = [(uid, h) for uid, h in rows if h]
+        await bulk_upsert(
+            self.s,
+            ShownCache,
+            ({"user_id": uid, "vacancy_hash": h, "shown_at": now} for uid, h in items),
+            update=("shown_at",),
+        )
+
+
+async def load_exclusions(session: AsyncSession, days: int, user_id: int) -> tuple[set[str], frozenset[str]]:
+    """Vacancy hashes already shown to ``user_id`` and the companies they hid."""
+    seen = await ShownRepo(session, days).seen(user_id)
+    return seen, await BlacklistRepo(session).companies(user_id)
@@ -1,9 +1,13 @@
 from __future__ import annotations
 
-from sqlalchemy import select
+from datetime import datetime
+from typing import Iterable
+
+from sqlalchemy import case, select, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.infra.db_models import Subscription
+from app.infra.db import dialect_insert, row_params, rows_per_statement, unique_rows
+from app.infra.db_models import Subscription, User
 
 
 class SubscriptionsRepo:
@@ -11,14 +15,75 @@ class SubscriptionsRepo:
         self.s = session
 
     async def upsert(self, user_id: int, kind: str, schedule_cron: str, enabled: bool) -> None:
-        sub = await self.s.get(Subscription, {"user_id": user_id, "kind": kind})
-        if not sub:
-            sub = Subscription(user_id=user_id, kind=kind)
-            self.s.add(sub)
-        sub.schedule_cron = schedule_cron
-        sub.enabled = enabled
+        await self.upsert_many([(user_id, kind, schedule_cron, enabled)])
+
+    async def upsert_many(self, rows: Iterable[tuple[int, str, str, bool]], chunk: int | None = None) -> None:
+        """Upsert ``(user_id, kind, schedule_cron, enabled)`` rows.
+
+        A changed cron clears ``next_run_at`` so the scheduler recomputes it.
+        """
+        items = unique_rows(
+            Subscription,
+            ({"user_id": u, "kind": k, "schedule_cron": cron, "enabled": on} for u, k, cron, on in rows),
+        )
+        chunk = rows_per_statement(self.s, row_params(Subscription), chunk)
+        for i in range(0, len(items), chunk):
+            ins = dialect_insert(self.s, Subscription).values(items[i : i + chunk])
+            cron = ins.excluded.schedule_cron
+            await self.s.execute(
+                ins.on_conflict_do_update(
+                    index_elements=["user_id", "kind"],
+                    set_={
+                        "schedule_cron": cron,
+                        "enabled": ins.excluded.enabled,
+                        # recomputed by the scheduler
+                        "next_run_at": case(
+                            (Subscription.schedule_cron == cron, Subscription.next_run_at), else_=None
+                        ),
+                    },
+                )
+            )
 
     async def list_enabled(self) -> list[Subscription]:
         res = await self.s.execute(select(Subscription).where(Subscription.enabled == True))  # noqa: E712
         return list(res.scalars().all())
 
+    async def list_enabled_with_tz(self) -> list[tuple[Subscription, str | None]]:
+        res = await self.s.execute(
+            select(Subscription, User.tz)
+            .outerjoin(User, User.id == Subscription.user_id)
+            .where(Subscription.enabled == True)  # noqa: E712
+        )
+        return [(sub, tz) for sub, tz in res.all()]
+
+    async def set_next_runs(self, rows: Iterable[tuple[int, str, datetime]]) -> None:
+        params = [{"user_id": u, "kind": k, "next_run_at": at} for u, k, at in rows]
+        if params:
+            await self.s.execute(update(Subscription), params)
+
+    async def claim_runs(
+        self, keys: Iterable[tuple[int, str]], expected: datetime, next_run: datetime
+    ) -> list[tuple[int, str]]:
+        """Advance ``next_run_at`` to ``next_run`` for rows still at ``expected``.
+
+        Compare-and-set: returns only the keys this caller advanced, so a
+        recovered or concurrent scheduler cannot fire the same slot twice.
+        Keys go in chunks that fit the dialect's parameter limit.
+        """
+        keys = list(keys)
+        # Two parameters per key, plus expected and next_run
+        chunk = rows_per_statement(self.s, 2, extra=2)
+        out: list[tuple[int, str]] = []
+        for i in range(0, len(keys), chunk):
+            res = await self.s.execute(
+                update(Subscription)
+                .where(
+                    tuple_(Subscription.user_id, Subscription.kind).in_(keys[i : i + chunk]),
+                    Subscription.next_run_at == expected,
+                )
+                .values(next_run_at=next_run)
+                .returning(Subscription.user_id, Subscription.kind)
+                .execution_options(synchronize_session=False)
+            )
+            out += [(u, k) for u, k in res.all()]
+        return out
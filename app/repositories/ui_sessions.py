@@ -1,10 +1,14 @@
 from __future__ import annotations
 
+import copy
 from datetime import datetime, timezone
 from typing import Any
 
+from sqlalchemy import event, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
 
+from app.infra.db import dialect_insert
 from app.infra.db_models import UiSession
 
 
@@ -12,35 +16,125 @@ def _utcnow() -> datetime:
     return datetime.now(timezone.utc)
 
 
+_COLS = ("anchor_message_id", "screen_state", "payload", "result_set_id", "cursor")
+_PK = ("chat_id", "user_id")
+# session.info key: (chat_id, user_id) -> (row, column values as last written,
+# or None for a row not in the table yet)
+_UOW = "ui_sessions.uow"
+_DEFAULTS: dict[str, Any] = {
+    "anchor_message_id": None,
+    "screen_state": "welcome",
+    "result_set_id": None,
+    "cursor": 0,
+}
+
+Tracked = dict[tuple[int, int], tuple[UiSession, dict[str, Any] | None]]
+
+
+def _snapshot(row: UiSession) -> dict[str, Any]:
+    return {c: copy.deepcopy(getattr(row, c)) for c in _COLS}
+
+
+def _upsert_stmt(session: Any, values: dict[str, Any], update: list[str]) -> Any:
+    ins = dialect_insert(session, UiSession).values(**values)
+    return ins.on_conflict_do_update(
+        index_elements=list(_PK),
+        set_={c: ins.excluded[c] for c in (*update, "updated_at")},
+    )
+
+
+def _write_ui_sessions(session: Session) -> None:
+    """Write every session row changed during this unit of work in one statement each."""
+    tracked: Tracked | None = session.info.get(_UOW)
+    if not tracked:
+        return
+    for (chat_id, user_id), (row, snap) in tracked.items():
+        changed = list(_COLS) if snap is None else [c for c in _COLS if getattr(row, c) != snap[c]]
+        if not changed:
+            continue
+        row.updated_at = _utcnow()
+        values = {c: getattr(row, c) for c in (*_PK, *_COLS, "updated_at")}
+        session.execute(_upsert_stmt(session, values, changed))
+        tracked[(chat_id, user_id)] = (row, _snapshot(row))
+
+
+def _drop_ui_sessions(session: Session) -> None:
+    session.info.pop(_UOW, None)
+
+
 class UiSessionsRepo:
+    """UI state per (chat, user) with at most one write per row per commit.
+
+    Rows come back as detached snapshots: the first access in a unit of work
+    is one ``SELECT`` (a missing row is created in memory). ``upsert``/``set_*``
+    calls and in-place payload edits only change the snapshot; rows that
+    changed are written with one ``INSERT .. ON CONFLICT DO UPDATE`` each when
+    the session commits, and untouched rows are not written at all.
+    """
+
     def __init__(self, session: AsyncSession):
         self.s = session
 
+    def _tracked(self) -> Tracked:
+        tracked = self.s.info.get(_UOW)
+        if tracked is None:
+            tracked = self.s.info[_UOW] = {}
+            # Hook only sessions that hold UI rows
+            sync = self.s.sync_session
+            if not event.contains(sync, "before_commit", _write_ui_sessions):
+                event.listen(sync, "before_commit", _write_ui_sessions)
+                event.listen(sync, "after_rollback", _drop_ui_sessions)
+        return tracked
+
+    def _track(self, row: UiSession, new: bool = False) -> UiSession:
+        self._tracked()[(row.chat_id, row.user_id)] = (row, None if new else _snapshot(row))
+        return row
+
+    async def _load(self, chat_id: int, user_id: int) -> UiSession | None:
+        hit = self._tracked().get((chat_id, user_id))
+        if hit:
+            return hit[0]
+        res = await self.s.execute(
+            select(*UiSession.__table__.c).where(UiSession.chat_id == chat_id, UiSession.user_id == user_id)
+        )
+        m = res.mappings().first()
+        return self._track(UiSession(**m)) if m else None
+
     async def get(self, chat_id: int, user_id: int) -> UiSession | None:
-        return await self.s.get(UiSession, (chat_id, user_id))
+        return await self._load(chat_id, user_id)
 
     async def upsert(self, chat_id: int, user_id: int, *, anchor_message_id: int | None = None, screen_state: str | None = None, payload: dict[str, Any] | None = None) -> UiSession:
-        row = await self.s.get(UiSession, (chat_id, user_id))
-        if not row:
-            row = UiSession(chat_id=chat_id, user_id=user_id, anchor_message_id=anchor_message_id, screen_state=screen_state or "welcome", payload=payload or {}, updated_at=_utcnow())
-            self.s.add(row)
-        else:
-            if anchor_message_id is not None:
-                row.anchor_message_id = anchor_message_id
-            if screen_state is not None:
-                row.screen_state = screen_state
-            if payload is not None:
-                row.payload = payload
-            row.updated_at = _utcnow()
+        changes: dict[str, Any] = {}
+        if anchor_message_id is not None:
+            changes["anchor_message_id"] = anchor_message_id
+        if screen_state is not None:
+            changes["screen_state"] = screen_state
+        if payload is not None:
+            changes["payload"] = payload
+        row = await self._load(chat_id, user_id)
+        if row is None:
+            row = self._track(
+                UiSession(chat_id=chat_id, user_id=user_id, **_DEFAULTS, payload={}, updated_at=_utcnow()), new=True
+            )
+        for k, v in changes.items():
+            setattr(row, k, v)
         return row
 
     async def set_state(self, chat_id: int, user_id: int, *, screen_state: str, payload: dict[str, Any] | None = None) -> None:
-        row = await self.s.get(UiSession, (chat_id, user_id))
-        if not row:
-            row = UiSession(chat_id=chat_id, user_id=user_id, anchor_message_id=None, screen_state=screen_state, payload=payload or {}, updated_at=_utcnow())
-            self.s.add(row)
-        else:
-            row.screen_state = screen_state
-            if payload is not None:
-                row.payload = payload
-            row.updated_at = _utcnow()
+        await self.upsert(chat_id, user_id, screen_state=screen_state, payload=payload)
+
+    async def set_results(self, chat_id: int, user_id: int, result_set_id: str) -> None:
+        """Point the session at a fresh result set and show its first card."""
+        row = await self.upsert(chat_id, user_id, screen_state="search_card")
+        row.result_set_id = result_set_id
+        row.cursor = 0
+        # Highest card recorded as shown; the first one is, by whoever shows it
+        row.payload.pop("seen_upto", None)
+        if "cards" in row.payload:
+            # Sessions saved before result sets kept cards inline
+            row.payload.pop("cards", None)
+            row.payload.pop("cursor", None)
+
+    async def set_cursor(self, chat_id: int, user_id: int, cursor: int) -> None:
+        row = await self.upsert(chat_id, user_id, screen_state="search_card")
+        row.cursor = cursor
@@ -1,9 +1,52 @@
 from __future__ import annotations
 
-from sqlalchemy import select
+from typing import Any, Iterable
+
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.infra.db import dialect_insert
 from app.infra.db_models import User
+from app.infra.redis import KeyValueStore
+from app.telemetry.logger import get_logger
+
+log = get_logger("repositories.users")
+
+
+class LangCache:
+    """User languages read by I18nMiddleware on every update, kept in the shared store.
+
+    Every replica sees one copy, so a language change is visible everywhere
+    once the writer calls ``invalidate`` after its commit. ``""`` marks a user
+    with no row yet. Store errors read as misses.
+    """
+
+    def __init__(self, store: KeyValueStore, ttl: int = 600) -> None:
+        self.store = store
+        self.ttl = ttl
+
+    @staticmethod
+    def _key(user_id: int) -> str:
+        return f"user:lang:{user_id}"
+
+    async def get(self, user_id: int) -> str | None:
+        try:
+            return await self.store.get(self._key(user_id))
+        except Exception as e:  # noqa: BLE001
+            log.warning("lang_cache.store_error", err=str(e))
+            return None
+
+    async def set(self, user_id: int, lang: str) -> None:
+        try:
+            await self.store.setex(self._key(user_id), self.ttl, lang)
+        except Exception as e:  # noqa: BLE001
+            log.warning("lang_cache.store_error", err=str(e))
+
+    async def invalidate(self, user_id: int) -> None:
+        try:
+            await self.store.delete(self._key(user_id))
+        except Exception as e:  # noqa: BLE001
+            log.warning("lang_cache.store_error", err=str(e))
 
 
 class UsersRepo:
@@ -11,13 +54,12 @@ class UsersRepo:
         self.s = session
 
     async def upsert(self, user_id: int, lang: str, full_name: str | None = None) -> None:
-        user = await self.s.get(User, user_id)
-        if user:
-            user.lang = lang
-            if full_name is not None:
-                user.full_name = full_name
-        else:
-            self.s.add(User(id=user_id, lang=lang, full_name=full_name))
+        ins = dialect_insert(self.s, User).values(id=user_id, lang=lang, full_name=full_name)
+        stmt = ins.on_conflict_do_update(
+            index_elements=["id"],
+            set_={"lang": ins.excluded.lang, "full_name": func.coalesce(ins.excluded.full_name, User.full_name)},
+        )
+        await self._write(stmt)
 
     async def set_lang(self, user_id: int, lang: str) -> None:
         await self.upsert(user_id, lang)
@@ -26,9 +68,25 @@ class UsersRepo:
         user = await self.s.get(User, user_id)
         return user.lang if user else None
 
+    async def get_lang_cached(self, user_id: int, langs: LangCache) -> str | None:
+        lang = await langs.get(user_id)
+        if lang is None:
+            lang = await self.get_lang(user_id) or ""
+            await langs.set(user_id, lang)
+        return lang or None
+
+    async def get_langs(self, user_ids: Iterable[int], chunk: int = 1000) -> dict[int, str]:
+        ids = list(user_ids)
+        out: dict[int, str] = {}
+        for i in range(0, len(ids), chunk):
+            res = await self.s.execute(select(User.id, User.lang).where(User.id.in_(ids[i : i + chunk])))
+            out.update({uid: lang for uid, lang in res.all()})
+        return out
+
     async def set_full_name(self, user_id: int, full_name: str) -> None:
-        user = await self.s.get(User, user_id)
-        if user:
-            user.full_name = full_name
-        else:
-            self.s.add(User(id=user_id, lang="ru", full_name=full_name))
+        ins = dialect_insert(self.s, User).values(id=user_id, lang="ru", full_name=full_name)
+        await self._write(ins.on_conflict_do_update(index_elements=["id"], set_={"full_name": ins.excluded.full_name}))
+
+    async def _write(self, stmt: Any) -> None:
+        # RETURNING + populate_existing keeps an already loaded user in step
+        await self.s.execute(stmt.returning(User), execution_options={"populate_existing": True})
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Any, Iterable
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.domain.dedup import vacancy_hash
+from app.domain.models import NormalizedJob
+from app.infra.db import bulk_upsert
+from app.infra.db_models import Vacancy
+
+_FIELDS = (
+    "redirect_url",
+    "title",
+    "company",
+    "city_region",
+    "location",
+    "created",
+    "salary_min",
+    "salary_max",
+    "category_tag",
+    "category_label",
+    "description",
+)
+
+
+def _row(j: NormalizedJob, now: datetime) -> dict[str, Any]:
+    row: dict[str, Any] = {f: j[f] for f in _FIELDS}  # type: ignore[literal-required]
+    row["redirect_url"] = row["redirect_url"] or ""
+    row.update(vacancy_hash=vacancy_hash(j), first_seen_at=now, last_seen_at=now)
+    return row
+
+
+class VacanciesRepo:
+    def __init__(self, session: AsyncSession):
+        self.s = session
+
+    async def upsert_many(self, jobs: Iterable[NormalizedJob], chunk: int | None = None) -> None:
+        """Insert or refresh jobs by ``vacancy_hash``; ``first_seen_at`` is kept."""
+        now = datetime.now(timezone.utc)
+        await bulk_upsert(
+            self.s, Vacancy, (_row(j, now) for j in jobs), update=(*_FIELDS, "last_seen_at"), chunk=chunk
+        )
+
+    async def get_many(self, hashes: Iterable[str], chunk: int = 1000) -> dict[str, Vacancy]:
+        keys = list(hashes)
+        out: dict[str, Vacancy] = {}
+        for i in range(0, len(keys), chunk):
+            res = await self.s.execute(select(Vacancy).where(Vacancy.vacancy_hash.in_(keys[i : i + chunk])))
+            out.update({v.vacancy_hash: v for v in res.scalars().all()})
+        return out
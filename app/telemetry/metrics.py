@@ -1,20 +1,193 @@
 from __future__ import annotations
 
+import math
 import time
+from bisect import bisect_left
 from contextlib import contextmanager
 from typing import Iterator
 
+# Prometheus client defaults; fine for request latencies in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
 
-def counter(name: str, **labels: str) -> None:
-    # Placeholder for Prometheus counter
-    return
+LabelKey = tuple[tuple[str, str], ...]
+
+
+def _key(labels: dict[str, str]) -> LabelKey:
+    if not labels:
+        return ()
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _fmt_labels(key: LabelKey, extra: tuple[str, str] | None = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    esc = (v.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, esc)) + "}"
+
+
+def _fmt_value(v: float) -> str:
+    if math.isnan(v):
+        return "NaN"
+    if math.isinf(v):
+        return "+Inf" if v > 0 else "-Inf"
+    return repr(float(v)) if v != int(v) else str(int(v))
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help: str = "") -> None:
+        self.name = name
+        self.help = help
+        # Samples carry the _total suffix, so HELP/TYPE must name it too
+        self.family = f"{name}_total"
+        self._values: dict[LabelKey, float] = {}
+
+    def inc(self, value: float = 1.0, **labels: str) -> None:
+        if value < 0:
+            raise ValueError("Counters can only increase")
+        key = _key(labels)
+        self._values[key] = self._values.get(key, 0.0) + value
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(_key(labels), 0.0)
+
+    def samples(self) -> Iterator[str]:
+        for key, v in self._values.items():
+            yield f"{self.family}{_fmt_labels(key)} {_fmt_value(v)}"
+
+
+class Gauge:
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str = "") -> None:
+        self.name = name
+        self.help = help
+        self.family = name
+        self._values: dict[LabelKey, float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        self._values[_key(labels)] = value
+
+    def inc(self, value: float = 1.0, **labels: str) -> None:
+        key = _key(labels)
+        self._values[key] = self._values.get(key, 0.0) + value
+
+    def dec(self, value: float = 1.0, **labels: str) -> None:
+        self.inc(-value, **labels)
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(_key(labels), 0.0)
+
+    def samples(self) -> Iterator[str]:
+        for key, v in self._values.items():
+            yield f"{self.name}{_fmt_labels(key)} {_fmt_value(v)}"
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str = "", buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.name = name
+        self.help = help
+        self.family = name
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: non-cumulative bucket counts (+Inf last), sum, count
+        self._values: dict[LabelKey, tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = _key(labels)
+        entry = self._values.get(key)
+        if entry is None:
+            entry = self._values[key] = ([0] * (len(self.buckets) + 1), [0.0, 0.0])
+        counts, totals = entry
+        counts[bisect_left(self.buckets, value)] += 1
+        totals[0] += value
+        totals[1] += 1
+
+    def count(self, **labels: str) -> int:
+        entry = self._values.get(_key(labels))
+        return int(entry[1][1]) if entry else 0
+
+    def samples(self) -> Iterator[str]:
+        for key, (counts, (total, n)) in self._values.items():
+            acc = 0
+            for le, c in zip((*self.buckets, math.inf), counts):
+                acc += c
+                yield f"{self.name}_bucket{_fmt_labels(key, ('le', _fmt_value(le)))} {acc}"
+            yield f"{self.name}_sum{_fmt_labels(key)} {_fmt_value(total)}"
+            yield f"{self.name}_count{_fmt_labels(key)} {_fmt_value(n)}"
+
+
+Metric = Counter | Gauge | Histogram
+
+
+class Registry:
+    """In-process metric store rendered in the Prometheus text format.
+
+    Recording is a dict lookup and an add; everything runs on the event loop
+    thread, so no locking is done.
+    """
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, Metric] = {}
+
+    def _get(self, cls: type[Metric], name: str, **kwargs: object) -> Metric:
+        m = self._metrics.get(name)
+        if m is None:
+            m = self._metrics[name] = cls(name, **kwargs)  # type: ignore[arg-type]
+        elif not isinstance(m, cls):
+            raise ValueError(f"Metric {name!r} already registered as {m.kind}")
+        return m
+
+    def counter(self, name: str, help: str = "") -> Counter:
+        return self._get(Counter, name, help=help)  # type: ignore[return-value]
+
+    def gauge(self, name: str, help: str = "") -> Gauge:
+        return self._get(Gauge, name, help=help)  # type: ignore[return-value]
+
+    def histogram(self, name: str, help: str = "", buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get(Histogram, name, help=help, buckets=buckets)  # type: ignore[return-value]
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for _, m in sorted(self._metrics.items()):
+            if m.help:
+                lines.append(f"# HELP {m.family} {m.help}")
+            lines.append(f"# TYPE {m.family} {m.kind}")
+            lines.extend(m.samples())
+        return "\n".join(lines) + "\n"
+
+    def clear(self) -> None:
+        self._metrics.clear()
+
+
+REGISTRY = Registry()
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def counter(name: str, value: float = 1.0, **labels: str) -> None:
+    REGISTRY.counter(name).inc(value, **labels)
+
+
+def gauge(name: str, value: float, **labels: str) -> None:
+    REGISTRY.gauge(name).set(value, **labels)
+
+
+def observe(name: str, value: float, **labels: str) -> None:
+    REGISTRY.histogram(name).observe(value, **labels)
 
 
 @contextmanager
 def timer(name: str, **labels: str) -> Iterator[None]:
-    _ = time.time()
+    """Record the block's wall time in the ``<name>_seconds`` histogram."""
+    start = time.perf_counter()
     try:
         yield
     finally:
-        _ = time.time()
+        observe(f"{name}_seconds", time.perf_counter() - start, **labels)
+
 
+def render() -> str:
+    return REGISTRY.render()
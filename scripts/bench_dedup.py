@@ -0,0 +1,88 @@
+"""Micro-benchmark for ``app.domain.dedup.deduplicate``.
+
+Compares the union-find dedup against the previous three-dictionary
+implementation on synthetic normalized jobs with URL and triple collisions.
+
+    python -m scripts.bench_dedup [sizes...]
+"""
+from __future__ import annotations
+
+import random
+import sys
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Callable
+
+from app.domain.dedup import _triple_key, choose_better, deduplicate
+from app.domain.models import NormalizedJob
+
+
+def make_jobs(n: int, seed: int = 42) -> list[NormalizedJob]:
+    rnd = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    jobs: list[NormalizedJob] = []
+    for _ in range(n):
+        lo = rnd.choice([None, 2000, 3000])
+        jobs.append(
+            {
+                "title": f"Developer {rnd.randint(1, n // 3 + 1)}",
+                "company": f"Company {rnd.randint(1, 20)}",
+                "city_region": rnd.choice(["Berlin", "London", ""]),
+                "created": now - timedelta(minutes=rnd.randint(0, 40_000)),
+                "posted_at_human": "",
+                "redirect_url": rnd.choice(["", f"https://example.com/{rnd.randint(1, n)}"]),
+                "salary_min": lo,
+                "salary_max": lo + 1000 if lo else None,
+                "salary_text": "",
+                "category_label": None,
+                "category_tag": None,
+                "description": "",
+                "is_remote": False,
+                "is_negotiable": False,
+                "is_clickbait": False,
+                "minhash": None,
+            }
+        )
+    return jobs
+
+
+def legacy_deduplicate(jobs: list[NormalizedJob]) -> list[NormalizedJob]:
+    by_url: dict[str, NormalizedJob] = OrderedDict()
+    by_triple: dict[str, NormalizedJob] = OrderedDict()
+    for j in jobs:
+        url = j.get("redirect_url") or ""
+        if url:
+            prev = by_url.get(url)
+            by_url[url] = choose_better(prev, j) if prev else j
+        t = _triple_key(j)
+        prev_t = by_triple.get(t)
+        by_triple[t] = choose_better(prev_t, j) if prev_t else j
+    merged: dict[str, NormalizedJob] = OrderedDict()
+    for j in by_url.values():
+        merged[j["redirect_url"]] = j
+    for j in by_triple.values():
+        merged.setdefault(j["redirect_url"] or _triple_key(j), j)
+    return list(merged.values())
+
+
+def best_of(fn: Callable[[list[NormalizedJob]], list[NormalizedJob]], jobs: list[NormalizedJob], runs: int = 5) -> tuple[float, int]:
+    best = float("inf")
+    out: list[NormalizedJob] = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        out = fn(jobs)
+        best = min(best, time.perf_counter() - t0)
+    return best, len(out)
+
+
+def main(sizes: list[int]) -> None:
+    for n in sizes:
+        jobs = make_jobs(n)
+        for name, fn in (("legacy", legacy_deduplicate), ("union-find", deduplicate)):
+            elapsed, kept = best_of(fn, jobs)
+            print(f"n={n:<6} {name:<10} {elapsed * 1000:8.2f} ms  kept={kept}")
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [10_000])
@@ -0,0 +1,120 @@
+"""Latency / peak-memory benchmark for ``app.domain.pipeline.process``.
+
+Compares the streaming pipeline against an eager reference that materializes
+every intermediate list and fully sorts, on synthetic Adzuna-like inputs.
+
+    python -m scripts.bench_pipeline [sizes...]
+"""
+from __future__ import annotations
+
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable
+
+from app.config import AppConfig
+from app.domain.dedup import deduplicate
+from app.domain.filters import passes_filters
+from app.domain.models import AdzunaRaw, PipelineResult, Profile, SearchParams
+from app.domain.normalization import normalize_item, summary_from_description
+from app.domain.pipeline import process
+from app.domain.scoring import compute_score
+from app.plugins.postprocessors.enforce_salary_mix import enforce
+
+
+WORDS = (
+    "react typescript javascript node python django go kubernetes remote senior junior "
+    "developer engineer team product agile office berlin london salary benefits"
+).split()
+
+
+def make_items(n: int, seed: int = 42) -> list[AdzunaRaw]:
+    rnd = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    items: list[AdzunaRaw] = []
+    for i in range(n):
+        body = " ".join(rnd.choices(WORDS, k=300))
+        items.append(
+            {
+                "title": " ".join(rnd.choices(WORDS, k=3)),
+                "company": {"display_name": f"Company {rnd.randint(1, n // 4 + 1)}"},
+                "location": {"display_name": rnd.choice(["Berlin, DE", "London, UK", "Paris"])},
+                "created": (now - timedelta(days=rnd.randint(0, 30))).isoformat(),
+                "redirect_url": f"https://example.com/{rnd.randint(1, n)}",
+                "salary_min": rnd.choice([None, 2000, 3000]),
+                "salary_max": rnd.choice([None, 4000, 5000]),
+                "category": {"label": "IT Jobs", "tag": "it-jobs"},
+                "description": f"<p>{body}</p>",
+            }
+        )
+    return items
+
+
+def eager_process(
+    items: list[AdzunaRaw], profile: Profile, params: SearchParams, cfg: AppConfig
+) -> PipelineResult:
+    normalized = [normalize_item(i) for i in items]
+    filtered = [j for j in normalized if passes_filters(j, profile, params)]
+    deduped = deduplicate(filtered)
+    scored = [(j, compute_score(j, profile, cfg, params.category)) for j in deduped]
+    scored.sort(
+        key=lambda x: (x[1], 1 if (x[0]["salary_min"] or x[0]["salary_max"]) else 0, x[0]["created"]),
+        reverse=True,
+    )
+    cards = enforce(
+        [
+            {
+                "title": f"{j['title']} — {j['company']}",
+                "subtitle": f"{j['city_region']} • {j['salary_text']} • {j['posted_at_human']}",
+                "summary": summary_from_description(j["description"], 300),
+                "apply_url": j["redirect_url"],
+                "short_reason": f"score={sc}",
+            }
+            for j, sc in scored[:50]
+        ]
+    )
+    return {
+        "cards": cards,
+        "shown": len(cards),
+        "filtered_out_by_rules": len(normalized) - len(filtered),
+        "duplicates_removed": len(filtered) - len(deduped),
+    }
+
+
+def measure(fn: Callable[..., Any], *args: Any) -> tuple[float, int, Any]:
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    out = fn(*args)
+    elapsed = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, out
+
+
+def main(sizes: list[int]) -> None:
+    cfg = AppConfig()
+    profile = Profile(
+        role="Frontend Developer",
+        skills=["React", "TypeScript", "Node", "Python", "Kubernetes"],
+        locations=["Berlin", "Remote"],
+        salary_min=2500,
+        salary_max=None,
+        formats=["remote"],
+        experience_yrs=3,
+    )
+    params = SearchParams(max_days_old=14)
+    for n in sizes:
+        items = make_items(n)
+        for name, fn in (("eager", eager_process), ("streaming", process)):
+            elapsed, peak, out = measure(fn, items, profile, params, cfg)
+            print(
+                f"n={n:<6} {name:<10} {elapsed * 1000:8.1f} ms  peak {peak / 1024:9.1f} KiB"
+                f"  shown={out['shown']} filtered={out['filtered_out_by_rules']}"
+                f" dups={out['duplicates_removed']}"
+            )
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [1_000, 10_000])
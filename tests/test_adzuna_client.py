@@ -1,7 +1,10 @@
+import asyncio
+
 import pytest
 
 from app.integrations.adzuna_client import AdzunaClient
 from app.config import Settings, AppConfig
+from app.infra.redis import InMemoryStore
 
 
 class DummyResp:
@@ -80,3 +83,123 @@ async def test_search_requires_credentials():
     client = AdzunaClient(settings, cfg)
     with pytest.raises(ValueError):
         await client.search("gb", 1, 10)
+
+
+class CountingClient(DummyClient):
+    def __init__(self, resp: DummyResp):
+        super().__init__(resp)
+        self.calls = 0
+
+    async def get(self, url, params):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return await super().get(url, params)
+
+
+@pytest.mark.asyncio
+async def test_search_cached_and_coalesced(monkeypatch):
+    settings = Settings(ADZUNA_APP_ID="id", ADZUNA_APP_KEY="key")
+    cfg = AppConfig()
+    store = InMemoryStore()
+    client = AdzunaClient(settings, cfg, store)
+    dummy = CountingClient(DupResp())
+    monkeypatch.setattr(client, "_client_or_create", lambda: dummy)
+
+    first = await asyncio.gather(*(client.search("gb", 1, 10, what="React ") for _ in range(5)))
+    again = await client.search("GB", 1, 10, what="react")
+
+    assert dummy.calls == 1
+    assert all(r == again for r in first) and len(again) == 1
+
+
+@pytest.mark.asyncio
+async def test_failing_sink_does_not_refetch(monkeypatch):
+    settings = Settings(ADZUNA_APP_ID="id", ADZUNA_APP_KEY="key")
+    cfg = AppConfig()
+    cfg.search.cache_ttl_seconds = 0
+
+    def sink(items):
+        raise RuntimeError("corpus down")
+
+    client = AdzunaClient(settings, cfg, sink=sink)
+    dummy = CountingClient(DupResp())
+    monkeypatch.setattr(client, "_client_or_create", lambda: dummy)
+
+    assert len(await client.search("gb", 1, 10)) == 1
+    assert dummy.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_search_cache_falls_back_to_local_lru(monkeypatch):
+    class DownStore(InMemoryStore):
+        async def get(self, key):
+            raise ConnectionError("redis down")
+
+        async def setex(self, key, seconds, value):
+            raise ConnectionError("redis down")
+
+    settings = Settings(ADZUNA_APP_ID="id", ADZUNA_APP_KEY="key")
+    client = AdzunaClient(settings, AppConfig(), DownStore())
+    dummy = CountingClient(DupResp())
+    monkeypatch.setattr(client, "_client_or_create", lambda: dummy)
+
+    await client.search("gb", 1, 10)
+    await client.search("gb", 1, 10)
+    assert dummy.calls == 1
+
+
+class PagedClient:
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+        self.pages: list[int] = []
+
+    async def get(self, url, params):
+        page = int(url.rsplit("/", 1)[1])
+        self.pages.append(page)
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.01 * page)
+        self.active -= 1
+        resp = DummyResp()
+        resp.json = lambda: {"results": [{"title": f"p{page}", "redirect_url": f"u{page}"}]}
+        return resp
+
+
+@pytest.mark.asyncio
+async def test_search_many_concurrency_and_early_stop(monkeypatch):
+    settings = Settings(ADZUNA_APP_ID="id", ADZUNA_APP_KEY="key")
+    client = AdzunaClient(settings, AppConfig())
+    dummy = PagedClient()
+    monkeypatch.setattr(client, "_client_or_create", lambda: dummy)
+
+    gen = client.search_many("gb", 6, 10, concurrency=2)
+    first = await anext(gen)
+    await gen.aclose()
+
+    assert first[0]["title"] == "p1"
+    assert dummy.peak <= 2
+    assert len(dummy.pages) < 6
+
+
+@pytest.mark.asyncio
+async def test_search_many_yields_in_page_order_and_starts_later_pages_lazily(monkeypatch):
+    settings = Settings(ADZUNA_APP_ID="id", ADZUNA_APP_KEY="key")
+    client = AdzunaClient(settings, AppConfig())
+    dummy = PagedClient()
+    monkeypatch.setattr(client, "_client_or_create", lambda: dummy)
+    # Later pages answer faster than earlier ones
+    real_get = dummy.get
+
+    async def get(url, params):
+        page = int(url.rsplit("/", 1)[1])
+        await asyncio.sleep(0.03 / page)
+        return await real_get(url, params)
+
+    monkeypatch.setattr(dummy, "get", get)
+
+    gen = client.search_many("gb", 3, 10, concurrency=3)
+    first = await anext(gen)
+    assert first[0]["title"] == "p1" and dummy.pages == [1]
+    rest = [p[0]["title"] async for p in gen]
+    assert rest == ["p2", "p3"]
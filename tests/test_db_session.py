@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.bot.middlewares import InjectSessionMiddleware
+from app.config import DBConfig
+from app.infra.db import LazySession, make_engine, make_session_factory
+
+
+class CountingFactory:
+    def __init__(self, sf):
+        self.sf = sf
+        self.created = 0
+
+    def __call__(self):
+        self.created += 1
+        return self.sf()
+
+
+@pytest.mark.asyncio
+async def test_session_is_only_built_when_used():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    factory = CountingFactory(make_session_factory(engine))
+    mw = InjectSessionMiddleware(factory)
+
+    async def idle(event, data):
+        assert not data["session"].started
+
+    async def query(event, data):
+        assert (await data["session"].execute(text("SELECT 1"))).scalar() == 1
+        await data["session"].commit()
+
+    await mw(idle, None, {})
+    assert factory.created == 0
+    await mw(query, None, {})
+    assert factory.created == 1
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_lazy_session_noops_when_unused():
+    s = LazySession(lambda: pytest.fail("session should not be created"))
+    await s.commit()
+    await s.rollback()
+    await s.close()
+
+
+def test_make_engine_applies_pool_options():
+    engine = make_engine(
+        "postgresql+psycopg://u:p@localhost:5432/app",
+        DBConfig(pool_size=3, max_overflow=2, pool_timeout=1.5),
+    )
+    assert engine.url.drivername == "postgresql+asyncpg"
+    assert engine.pool.size() == 3
+    assert engine.pool._max_overflow == 2
+    assert engine.pool._timeout == 1.5
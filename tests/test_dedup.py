@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import random
+from datetime import datetime, timedelta, timezone
+
+from app.domain.dedup import Deduplicator, _triple_key, collapse_near, deduplicate
+from app.domain.models import NormalizedJob
+
+
+def _job(rnd: random.Random, i: int) -> NormalizedJob:
+    lo = rnd.choice([None, 2000, 3000])
+    return {
+        "title": rnd.choice(["Dev", "dev", "QA", "PM"]),
+        "company": rnd.choice(["Acme", "Globex"]),
+        "city_region": rnd.choice(["Berlin", "", "Paris"]),
+        "location": "",
+        # Distinct timestamps make choose_better's winner unique
+        "created": datetime(2024, 1, 1, tzinfo=timezone.utc) + timedelta(minutes=i),
+        "posted_at_human": "",
+        "redirect_url": rnd.choice(["", "", "u1", "u2", "u3", "u4", "u5"]),
+        "salary_min": lo,
+        "salary_max": (lo + rnd.choice([0, 1000, 2000])) if lo else None,
+        "salary_text": "",
+        "category_label": None,
+        "category_tag": None,
+        "description": "",
+        "is_remote": False,
+        "is_negotiable": False,
+        "is_clickbait": False,
+        "minhash": None,
+    }
+
+
+def _rank(j: NormalizedJob) -> tuple[int, datetime]:
+    return (j["salary_max"] or 0) - (j["salary_min"] or 0), j["created"]
+
+
+def _reference(jobs: list[NormalizedJob]) -> list[NormalizedJob]:
+    # Connected components over shared URL / triple, by brute force
+    n = len(jobs)
+    keys = [({_triple_key(j)} | ({"url:" + j["redirect_url"]} if j["redirect_url"] else set())) for j in jobs]
+    comp = [-1] * n
+    groups: list[list[int]] = []
+    for i in range(n):
+        if comp[i] >= 0:
+            continue
+        comp[i] = len(groups)
+        stack, members = [i], []
+        while stack:
+            x = stack.pop()
+            members.append(x)
+            for y in range(n):
+                if comp[y] < 0 and keys[x] & keys[y]:
+                    comp[y] = comp[i]
+                    stack.append(y)
+        groups.append(sorted(members))
+    groups.sort(key=lambda m: m[0])
+    return [max((jobs[x] for x in m), key=_rank) for m in groups]
+
+
+def test_dedup_matches_connected_components():
+    for seed in range(200):
+        rnd = random.Random(seed)
+        jobs = [_job(rnd, i) for i in range(rnd.randint(0, 40))]
+        out = deduplicate(jobs)
+        assert out == _reference(jobs), seed
+        assert deduplicate(out) == out
+        urls = [j["redirect_url"] for j in out if j["redirect_url"]]
+        assert len(urls) == len(set(urls))
+        assert len({_triple_key(j) for j in out}) == len(out)
+
+
+def test_merges_transitively_in_first_seen_order():
+    rnd = random.Random(0)
+    a, b, c, d = (_job(rnd, i) for i in range(4))
+    a.update(title="A", redirect_url="u1")
+    b.update(title="B", redirect_url="u2")
+    c.update(title="C", redirect_url="")
+    # d links a (same url) and b (same triple)
+    d.update(title="B", company=b["company"], city_region=b["city_region"], redirect_url="u1")
+    dd = Deduplicator()
+    for j in (a, c, b, d):
+        dd.add(j)
+    out = dd.result()
+    assert out == [max((a, b, d), key=_rank), c]
+    assert dd.seen - len(out) == 2
+
+
+def test_near_collapse_compares_with_the_surviving_copy():
+    rnd = random.Random(3)
+    a = tuple(range(64))
+    b = tuple(x + 100 if x < 10 else x for x in a)  # 54/64 with a
+    c = tuple(x + 100 if 10 <= x < 20 else x for x in b)  # 54/64 with b, 44/64 with a
+    jobs = []
+    for i, sig in enumerate((a, b, c)):
+        j = _job(rnd, i)
+        j.update(title=f"T{i}", redirect_url="", salary_min=None, salary_max=None, minhash=sig)
+        jobs.append(j)
+    # b is newer than a, so it survives and c is judged against it
+    assert collapse_near(jobs, 0.8) == [jobs[2]]
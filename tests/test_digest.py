@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.config import AppConfig
+from app.infra.db import Base, make_session_factory
+from app.infra.db_models import Profile, Subscription, User
+from app.jobs.scheduler import Scheduler
+from app.jobs.tasks import schedule_digests, send_subscriptions
+from app.repositories.subscriptions import SubscriptionsRepo
+
+
+def _raw(title: str, url: str) -> dict:
+    return {
+        "title": title,
+        "company": {"display_name": "Acme"},
+        "location": {"display_name": "Berlin"},
+        "created": datetime.now(timezone.utc).isoformat(),
+        "redirect_url": url,
+        "salary_min": None,
+        "salary_max": None,
+        "category": {"label": "IT Jobs", "tag": "it"},
+        "description": "React and TypeScript",
+    }
+
+
+class FakeAdzuna:
+    def __init__(self):
+        self.queries: list[tuple] = []
+
+    async def search_pages(self, params, *, what=None, where=None, salary_min=None, country="gb"):
+        self.queries.append((what, where))
+        yield [_raw(f"React Dev {i}", f"u{i}") for i in range(10)]
+
+
+class FakeBot:
+    def __init__(self):
+        self.sent: list[tuple[int, str]] = []
+
+    async def send_message(self, chat_id, text, **kwargs):
+        self.sent.append((chat_id, text))
+
+
+@pytest.mark.asyncio
+async def test_digest_fetches_once_per_distinct_query():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    sf = make_session_factory(engine)
+    async with sf() as s:
+        for uid, role in [(1, "React Dev"), (2, "react dev"), (3, "Designer")]:
+            s.add(User(id=uid, lang="en"))
+            s.add(Profile(user_id=uid, role=role, skills=["React", "TypeScript"], locations=["Berlin"], salary_min=0))
+            s.add(Subscription(user_id=uid, kind="daily", schedule_cron="0 9 * * *", enabled=True))
+        s.add(Subscription(user_id=4, kind="daily", schedule_cron="0 9 * * *", enabled=False))
+        await s.commit()
+
+    cfg = AppConfig()
+    adzuna, bot = FakeAdzuna(), FakeBot()
+    sent = await send_subscriptions(cfg, adzuna, sf, bot)
+
+    assert sent == 3
+    assert sorted(adzuna.queries) == [("designer", "berlin"), ("react dev", "berlin")]
+    assert sorted(uid for uid, _ in bot.sent) == [1, 2, 3]
+    assert all(text.count("React Dev") == 7 for _, text in bot.sent)
+    assert all(text.startswith("<b>📬 Job digest</b>") for _, text in bot.sent)
+
+    # The next digest only carries what was not shown yet
+    bot.sent.clear()
+    assert await send_subscriptions(cfg, adzuna, sf, bot, [1]) == 1
+    assert bot.sent[0][1].count("React Dev") == 3
+    bot.sent.clear()
+    await send_subscriptions(cfg, adzuna, sf, bot, [1])
+    assert bot.sent == []
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_missed_slot_fires_once_and_advances():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    sf = make_session_factory(engine)
+    missed = datetime.now(timezone.utc) - timedelta(hours=1)
+    async with sf() as s:
+        s.add(User(id=1, lang="en", tz="Europe/Berlin"))
+        s.add(Profile(user_id=1, role="React Dev", skills=["React", "TypeScript"], locations=["Berlin"], salary_min=0))
+        s.add(Subscription(user_id=1, kind="daily", schedule_cron="0 9 * * *", enabled=True, next_run_at=missed))
+        await s.commit()
+
+    cfg = AppConfig()
+    adzuna, bot = FakeAdzuna(), FakeBot()
+    # Two schedulers stand in for a restart racing a second replica
+    scheds = [Scheduler(), Scheduler()]
+    for sched in scheds:
+        await schedule_digests(sched, cfg, adzuna, sf, bot)
+    await asyncio.sleep(0.2)
+    for sched in scheds:
+        await sched.stop()
+
+    assert [uid for uid, _ in bot.sent] == [1]
+    async with sf() as s:
+        sub = await s.get(Subscription, {"user_id": 1, "kind": "daily"})
+    assert sub.next_run_at.replace(tzinfo=timezone.utc) > datetime.now(timezone.utc)
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_refresh_survives_a_failed_load(monkeypatch):
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    sf = make_session_factory(engine)
+    loads = 0
+    real = SubscriptionsRepo.list_enabled_with_tz
+
+    async def flaky(self):
+        nonlocal loads
+        loads += 1
+        if loads == 2:  # the first refresh hits a DB blip
+            raise ConnectionError("db down")
+        return await real(self)
+
+    monkeypatch.setattr(SubscriptionsRepo, "list_enabled_with_tz", flaky)
+    cfg = AppConfig()
+    cfg.digest.refresh_seconds = 0.02  # type: ignore[assignment]
+    sched = Scheduler(retry_seconds=0.02)
+    await schedule_digests(sched, cfg, FakeAdzuna(), sf, FakeBot())
+    await asyncio.sleep(0.2)
+    await sched.stop()
+    assert loads > 3
+    await engine.dispose()
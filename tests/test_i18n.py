@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.bot.middlewares import I18nMiddleware
+from app.infra.db import Base, make_session_factory
+from app.infra.redis import InMemoryStore
+from app.repositories.users import LangCache, UsersRepo
+
+
+class CountingFactory:
+    def __init__(self, sf):
+        self.sf = sf
+        self.opened = 0
+
+    def __call__(self):
+        self.opened += 1
+        return self.sf()
+
+
+@pytest.mark.asyncio
+async def test_language_is_cached_and_invalidated_on_set_lang():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    sf = make_session_factory(engine)
+    async with sf() as s:
+        await UsersRepo(s).set_lang(1, "en")
+        await s.commit()
+
+    factory = CountingFactory(sf)
+    store = InMemoryStore()
+    mw = I18nMiddleware({"k": "ru"}, {"k": "en"}, factory, store)
+    # A second replica sharing the store
+    other = I18nMiddleware({"k": "ru"}, {"k": "en"}, factory, store)
+    seen: list[str] = []
+
+    async def handler(event, data):
+        seen.append(data["t"]("k"))
+
+    event = SimpleNamespace(from_user=SimpleNamespace(id=1))
+    for _ in range(3):
+        await mw(handler, event, {})
+    await other(handler, event, {})
+    assert seen == ["en"] * 4
+    assert factory.opened == 1
+
+    async with sf() as s:
+        await UsersRepo(s).set_lang(1, "ru")
+        await s.commit()
+    await LangCache(store).invalidate(1)
+    await other(handler, event, {})
+    await mw(handler, event, {})
+    assert seen[-2:] == ["ru", "ru"]
+    assert factory.opened == 2
+    await engine.dispose()
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+from app.config import AppConfig
+from app.domain.models import Profile, SearchParams
+from app.domain.pipeline import process
+from app.telemetry.metrics import REGISTRY, Registry, counter, timer
+
+
+def test_exposition_format():
+    reg = Registry()
+    reg.counter("hits", help="Cache hits").inc(result="hit")
+    reg.counter("hits").inc(2, result="hit")
+    reg.gauge("queue_depth").set(3)
+    h = reg.histogram("latency_seconds", buckets=(0.1, 1.0))
+    for v in (0.05, 0.1, 0.5, 3.0):
+        h.observe(v, op='say "hi"')
+    out = reg.render().splitlines()
+    assert "# HELP hits_total Cache hits" in out
+    assert "# TYPE hits_total counter" in out
+    assert "# TYPE queue_depth gauge" in out
+    assert 'hits_total{result="hit"} 3' in out
+    assert "queue_depth 3" in out
+    assert 'latency_seconds_bucket{op="say \\"hi\\"",le="0.1"} 2' in out
+    assert 'latency_seconds_bucket{op="say \\"hi\\"",le="1"} 3' in out
+    assert 'latency_seconds_bucket{op="say \\"hi\\"",le="+Inf"} 4' in out
+    assert 'latency_seconds_count{op="say \\"hi\\""} 4' in out
+
+
+def test_timer_records_histogram():
+    with timer("unit_test_block", step="a"):
+        pass
+    assert REGISTRY.histogram("unit_test_block_seconds").count(step="a") >= 1
+
+
+def test_pipeline_exports_stage_counts():
+    jobs = REGISTRY.counter("pipeline_jobs")
+    before = jobs.value(stage="filtered_out_by_rules")
+    raw = {"title": "X", "created": "2000-01-01T00:00:00Z", "redirect_url": "u"}
+    pr = process([raw], Profile("dev", [], [], 0, None, [], 0), SearchParams(max_days_old=7), AppConfig())
+    assert pr["filtered_out_by_rules"] == 1
+    assert jobs.value(stage="filtered_out_by_rules") == before + 1
+
+
+def test_counter_helper_uses_global_registry():
+    counter("unit_test_events", kind="x")
+    assert REGISTRY.counter("unit_test_events").value(kind="x") >= 1
@@ -8,7 +8,8 @@ from app.config import AppConfig
 from app.domain.models import AdzunaRaw, Profile, SearchParams
 from app.domain.pipeline import process
 from app.domain.dedup import deduplicate
-from app.domain.normalization import normalize_item
+from app.domain.filters import normalize_company
+from app.domain.normalization import UNKNOWN_COMPANY, normalize_item
 from app.domain.scoring import title_desc_skill_score
 from app.plugins.postprocessors.enforce_salary_mix import enforce
 
@@ -93,3 +94,126 @@ def test_anti_noise_enforcer():
     # First two stay, third moves later
     assert out[0]["title"] == "a" and out[1]["title"] == "b"
     assert any(c["title"] == "c" for c in out[2:])
+
+
+def test_skill_matcher_overlapping_skills():
+    from app.domain.skills import SkillMatcher
+
+    m = SkillMatcher(["Node", "Node.js", "React Native", "native app", "JavaScript"])
+    hits = m.find("react native app on node.js and js")
+    assert hits == {"node", "node.js", "react native", "native app", "js"}
+    assert m.find("nodejs") == frozenset()
+
+
+def test_process_streams_generator_and_caps_top_k():
+    cfg = AppConfig()
+    prof = base_profile()
+    params = SearchParams(max_days_old=14)
+    raw = (
+        make_raw(f"React Dev {i}", f"Acme {i}", "Berlin", i % 20, desc="React and TypeScript", url=str(i))
+        for i in range(120)
+    )
+    pr = process(raw, prof, params, cfg)
+    assert pr["shown"] == 50
+    assert pr["filtered_out_by_rules"] == sum(1 for i in range(120) if i % 20 > 14)
+    scores = [float(c["short_reason"].split("=")[1]) for c in pr["cards"]]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_normalize_extracts_marker_features():
+    job = normalize_item(
+        make_raw("URGENT React Ninja", "Acme", "Berlin", 0, desc="<b>Home office</b>, salary negotiable")
+    )
+    assert job["is_remote"] and job["is_negotiable"] and job["is_clickbait"]
+    plain = normalize_item(make_raw("React Dev", "Acme", "Berlin", 0, desc="Office only"))
+    assert not (plain["is_remote"] or plain["is_negotiable"] or plain["is_clickbait"])
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_batch_scores_match_scalar(monkeypatch, use_numpy):
+    from app.domain import scoring
+
+    if not use_numpy:
+        monkeypatch.setattr(scoring, "np", None)
+    elif scoring.np is None:
+        pytest.skip("numpy not installed")
+    cfg = AppConfig()
+    prof = base_profile()
+    jobs = [
+        normalize_item(make_raw("URGENT React Dev", "Acme", "Berlin", 0, desc="React TypeScript")),
+        normalize_item(make_raw("Designer", "Beta", "Paris", 1, desc="Remote, negotiable")),
+        normalize_item(make_raw("Node.js Dev", "Gamma", "EU West", 9, desc="Next.js and Node.js")),
+        normalize_item(make_raw("Old", "Delta", "Rome", 40)),
+    ]
+    with monkeypatch.context() as mp:
+        mp.setattr(scoring, "np", None)
+        expected = [scoring.compute_score(j, prof, cfg, "it") for j in jobs]
+    assert scoring.compute_scores(jobs, prof, cfg, "it") == expected
+    assert expected[0] == round(
+        (45 * scoring.title_desc_skill_score(jobs[0], prof) + 20 * scoring.location_score(jobs[0], prof)
+         + 15 * scoring.salary_score(jobs[0], prof) + 10 * 1.0 + 10 * 1.0) * 0.7 * 0.85, 2
+    )
+
+
+def test_sampled_run_reports_stage_timings():
+    prof = base_profile()
+    params = SearchParams(max_days_old=14)
+    raw = [make_raw(f"React Dev {i}", "Acme", "Berlin", 0, desc="React and TypeScript", url=str(i)) for i in range(5)]
+    plain = process(raw, prof, params, AppConfig())
+    assert "debug" not in plain
+
+    cfg = AppConfig()
+    cfg.telemetry.pipeline_sample_rate = 1.0
+    timed = process(raw, prof, params, cfg)
+    assert set(timed["debug"]) == {"normalize", "filter", "dedup", "score", "rank", "cards", "enforce"}
+    assert all(v >= 0 for v in timed["debug"].values())
+    assert timed["cards"] == plain["cards"]
+
+
+def test_seen_jobs_are_dropped_before_scoring():
+    prof = base_profile()
+    params = SearchParams(max_days_old=14)
+    raw = [make_raw(f"React Dev {i}", "Acme", "Berlin", 0, desc="React and TypeScript", url=str(i)) for i in range(5)]
+    first = process(raw, prof, params, AppConfig())
+    seen = {c["vacancy_hash"] for c in first["cards"][:2]}
+    again = process(raw, prof, params, AppConfig(), seen)
+    assert again["already_seen"] == 2
+    assert {c["vacancy_hash"] for c in again["cards"]}.isdisjoint(seen)
+    assert len(again["cards"]) == len(first["cards"]) - 2
+
+
+def test_blacklisted_companies_are_filtered():
+    prof = base_profile()
+    params = SearchParams(max_days_old=14)
+    raw = [
+        make_raw("React Dev", company, "Berlin", 0, desc="React and TypeScript", url=company)
+        for company in ("Acme", "  ACME ", "Globex")
+    ]
+    pr = process(raw, prof, params, AppConfig(), blocked={normalize_company("acme")})
+    assert [c["company"] for c in pr["cards"]] == ["Globex"]
+    assert pr["filtered_out_by_rules"] == 2
+    # The no-company placeholder never becomes a blacklist key
+    assert normalize_company(UNKNOWN_COMPANY) == ""
+
+
+def test_near_duplicates_collapse_to_the_better_copy():
+    prof = base_profile()
+    params = SearchParams(max_days_old=14)
+    desc = (
+        "We build a React and TypeScript design system for our Berlin product team, "
+        "ship features weekly and review each other's code with care. You will own "
+        "component APIs, accessibility and performance budgets, pair with designers "
+        "on new patterns and help other teams adopt them across a dozen web apps."
+    )
+    a = make_raw("React Developer", "Acme", "Berlin", 0, desc=desc, url="a")
+    b = make_raw("React Developer (m/w/d)", "Acme Recruiting", "Berlin", 0, desc=desc + " Apply now!", url="b")
+    b["salary_min"], b["salary_max"] = 3000, 5000
+    other = make_raw("React Engineer", "Globex", "Berlin", 0, desc="React and TypeScript for a payments dashboard used by banks across Europe", url="c")
+
+    pr = process([a, b, other], prof, params, AppConfig())
+    assert sorted(c["apply_url"] for c in pr["cards"]) == ["b", "c"]
+    assert pr["duplicates_removed"] == 1
+
+    cfg = AppConfig()
+    cfg.dedup.near_threshold = 0
+    assert process([a, b, other], prof, params, cfg)["duplicates_removed"] == 0
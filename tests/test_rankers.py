@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.config import AppConfig
+from app.domain.models import AdzunaRaw, Profile
+from app.domain.normalization import normalize_item
+from app.domain.scoring import compute_scores
+from app.plugins.rankers import get_ranker
+from app.plugins.rankers.tfidf_title_desc import TfidfTitleDescRanker
+
+
+def make_raw(title: str, company: str, city: str, days_ago: int, desc: str = "", url: str = "u") -> AdzunaRaw:
+    return {
+        "title": title,
+        "company": {"display_name": company},
+        "location": {"display_name": city},
+        "created": (datetime.now(timezone.utc) - timedelta(days=days_ago)).isoformat(),
+        "redirect_url": url,
+        "salary_min": None,
+        "salary_max": None,
+        "category": {"label": "IT Jobs", "tag": "it-jobs"},
+        "description": desc,
+    }
+
+
+def _profile(*skills: str) -> Profile:
+    return Profile(role="dev", skills=list(skills), locations=[], salary_min=0, salary_max=None, formats=[], experience_yrs=0)
+
+
+def test_idf_favours_rare_skills_and_titles():
+    jobs = [
+        normalize_item(make_raw("Python Dev", "A", "Berlin", 0, desc="Python python and more python", url="1")),
+        normalize_item(make_raw("Backend Dev", "B", "Berlin", 0, desc="Kubernetes with Python", url="2")),
+        normalize_item(make_raw("Backend Dev", "C", "Berlin", 0, desc="Go with Python", url="3")),
+        normalize_item(make_raw("Designer", "D", "Berlin", 0, desc="Figma", url="4")),
+    ]
+    r = TfidfTitleDescRanker(min_corpus_docs=10**9)
+    scores = r.scores(jobs, _profile("python", "kubernetes"))
+    # Kubernetes appears once in the batch, so it outweighs Python repeated everywhere
+    assert 1.0 > scores[1] > scores[0] > scores[2] > 0.0
+    assert scores[3] == 0.0
+    assert r.scores(jobs, _profile()) == [0.0] * 4
+
+
+def test_corpus_idf_replaces_batch_idf():
+    batch = [
+        normalize_item(make_raw("Rust Dev", "A", "Berlin", 0, desc="rust", url="1")),
+        normalize_item(make_raw("Go Dev", "B", "Berlin", 0, desc="golang", url="2")),
+    ]
+    r = TfidfTitleDescRanker(max_docs=3, min_corpus_docs=3)
+    corpus = [normalize_item(make_raw(f"Rust Dev {i}", "C", "Berlin", 0, url=f"c{i}")) for i in range(4)]
+    r.update(corpus)
+    r.update(corpus[-1:])  # re-seen: no double counting
+    assert len(r._docs) == 3 and r._df["rust"] == 3
+    # Rust is in every corpus doc, so golang now dominates the query
+    scores = r.scores(batch, _profile("rust", "golang"))
+    assert scores[1] > scores[0]
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_configured_ranker_adds_to_batch_scores(monkeypatch, use_numpy):
+    from app.domain import scoring
+
+    if not use_numpy:
+        monkeypatch.setattr(scoring, "np", None)
+    elif scoring.np is None:
+        pytest.skip("numpy not installed")
+    prof = _profile("react")
+    jobs = [
+        normalize_item(make_raw("React Dev", "A", "Berlin", 0, desc="react", url="1")),
+        normalize_item(make_raw("Designer", "B", "Berlin", 0, desc="figma", url="2")),
+    ]
+    cfg = AppConfig()
+    cfg.scoring.ranker_weight = 10
+    ranker = TfidfTitleDescRanker()
+    base = compute_scores(jobs, prof, cfg, None)
+    ranked = compute_scores(jobs, prof, cfg, None, ranker=ranker)
+    cosine = ranker.scores(jobs, prof)[0]
+    # Absolute cosine, not scaled up to the batch's best match
+    assert 0.0 < cosine < 1.0
+    assert ranked[0] == pytest.approx(base[0] + 10 * cosine, abs=0.01)
+    assert ranked[1] == base[1]
+
+
+def test_unknown_ranker_name():
+    assert get_ranker(None) is None
+    assert get_ranker("tfidf_title_desc") is get_ranker("tfidf_title_desc")
+    with pytest.raises(ValueError):
+        get_ranker("nope")
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from aiogram.methods import AnswerCallbackQuery, SendMessage
+
+from app.bot.middlewares import RateLimitMiddleware
+from app.config import RateLimit
+from app.infra.redis import InMemoryStore
+from app.infra.throttle import OutgoingRateLimiter
+
+
+class Clock:
+    def __init__(self, now: float):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.mark.asyncio
+async def test_sliding_window_counts_previous_window(monkeypatch):
+    clock = Clock(600.0)  # start of a 60s window
+    monkeypatch.setattr("app.infra.redis.time.time", clock)
+    store = InMemoryStore()
+    assert [await store.allow("k", 3, 60) for _ in range(4)] == [True, True, True, False]
+    # Half-way into the next window half of the previous hits still count
+    clock.now = 690.0
+    assert [await store.allow("k", 3, 60) for _ in range(3)] == [True, True, False]  # 1.5 + cur < 3
+    clock.now = 900.0
+    assert await store.allow("k", 3, 60) is True
+
+
+@pytest.mark.asyncio
+async def test_allow_is_atomic_under_concurrency():
+    store = InMemoryStore()
+    results = await asyncio.gather(*(store.allow("c", 10, 60) for _ in range(50)))
+    assert sum(results) == 10
+
+
+@pytest.mark.asyncio
+async def test_middleware_drops_over_limit_and_answers_callbacks():
+    from aiogram.types import CallbackQuery, User
+
+    store = InMemoryStore()
+    handled: list[int] = []
+
+    async def handler(event, data):
+        handled.append(1)
+
+    mw = RateLimitMiddleware(2, store, kind="cb")
+    user = User(id=1, is_bot=False, first_name="a")
+    cq = CallbackQuery(id="1", from_user=user, chat_instance="x", data="p")
+    answered: list[str] = []
+
+    async def fake_answer(*args, **kwargs):
+        answered.append("y")
+
+    object.__setattr__(cq, "answer", fake_answer)
+    for _ in range(3):
+        await mw(handler, cq, {})
+    assert len(handled) == 2 and answered == ["y"]
+
+
+@pytest.mark.asyncio
+async def test_outgoing_limiter_holds_sends_per_chat(monkeypatch):
+    sleeps: list[float] = []
+
+    async def fake_sleep(d):
+        sleeps.append(d)
+        # Age the window so the parked send gets through
+        store.windows.clear()
+
+    monkeypatch.setattr("app.infra.throttle.asyncio.sleep", fake_sleep)
+    store = InMemoryStore()
+    cfg = RateLimit(send_per_chat_per_minute=2, send_global_per_sec=100)
+    limiter = OutgoingRateLimiter(store, cfg)
+    sent: list[str] = []
+
+    async def make_request(bot, method):
+        sent.append(type(method).__name__)
+        return SimpleNamespace(ok=True)
+
+    for _ in range(3):
+        await limiter(make_request, None, SendMessage(chat_id=5, text="x"))
+    await limiter(make_request, None, AnswerCallbackQuery(callback_query_id="1"))
+    assert sent == ["SendMessage"] * 3 + ["AnswerCallbackQuery"]
+    assert sleeps == [30.0]
+
+
+@pytest.mark.asyncio
+async def test_redis_window_keys_share_a_hash_tag(monkeypatch):
+    from app.infra.redis import RedisStore
+
+    seen = {}
+
+    async def script(*, keys, args):
+        seen["keys"] = keys
+        return 1
+
+    store = RedisStore.__new__(RedisStore)
+    store._allow = script
+    monkeypatch.setattr("app.infra.redis.time.time", Clock(630.0))
+    assert await store.allow("tg:send:42", 20, 60) is True
+    assert seen["keys"] == ["{tg:send:42}:10", "{tg:send:42}:9"]
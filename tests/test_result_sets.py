@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.infra.db import Base, make_session_factory
+from app.infra.redis import InMemoryStore
+from app.repositories import result_sets
+from app.repositories.result_sets import ResultSetsRepo
+from app.repositories.ui_sessions import UiSessionsRepo
+
+
+CARDS = [
+    {"title": f"Dev {i} — Acme", "subtitle": "Berlin • — • сегодня", "summary": "", "apply_url": f"u{i}", "short_reason": "score=1"}
+    for i in range(3)
+]
+
+
+@pytest.mark.asyncio
+async def test_result_set_roundtrip_through_store():
+    store = InMemoryStore()
+    rs_id = await ResultSetsRepo(store).save(CARDS)
+    result_sets._LOCAL.clear()  # as seen from another process
+    assert await ResultSetsRepo(store).load(rs_id) == CARDS
+    assert await ResultSetsRepo(store).load("missing") == []
+    assert await ResultSetsRepo(store).load(None) == []
+
+
+@pytest.mark.asyncio
+async def test_paging_updates_cursor_without_touching_payload():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    sf = make_session_factory(engine)
+    async with sf() as s:
+        ui = UiSessionsRepo(s)
+        await ui.upsert(1, 1, payload={"filters": {"what": "dev"}, "cards": CARDS, "cursor": 2, "seen_upto": 2})
+        await ui.set_results(1, 1, "rs1")
+        await s.commit()
+    async with sf() as s:
+        await UiSessionsRepo(s).set_cursor(1, 1, 2)
+        await s.commit()
+    async with sf() as s:
+        row = await UiSessionsRepo(s).get(1, 1)
+        assert (row.result_set_id, row.cursor, row.screen_state) == ("rs1", 2, "search_card")
+        assert row.payload == {"filters": {"what": "dev"}}
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_state_changes_in_one_update_are_merged_into_one_write():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    statements: list[str] = []
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _count(conn, cursor, statement, *args):
+        if not statement.startswith(("BEGIN", "COMMIT")):
+            statements.append(statement.split()[0])
+
+    sf = make_session_factory(engine)
+    async with sf() as s:
+        ui = UiSessionsRepo(s)
+        row = await ui.upsert(1, 1)  # missing: created in memory
+        row.payload["applied_urls"] = ["u1"]
+        await ui.upsert(1, 1, screen_state="menu")
+        await ui.set_cursor(1, 1, 2)
+        await s.commit()
+    assert statements == ["SELECT", "INSERT"]
+
+    statements.clear()
+    async with sf() as s:
+        row = await UiSessionsRepo(s).get(1, 1)
+        await s.commit()
+    assert statements == ["SELECT"]
+    assert (row.screen_state, row.cursor, row.payload) == ("search_card", 2, {"applied_urls": ["u1"]})
+    stamp = row.updated_at
+
+    statements.clear()
+    async with sf() as s:
+        ui = UiSessionsRepo(s)
+        await ui.upsert(1, 1)
+        await ui.upsert(1, 1, screen_state="menu", payload={"page": 1})
+        await s.commit()
+    assert statements == ["SELECT", "INSERT"]
+
+    statements.clear()
+    async with sf() as s:
+        row = await UiSessionsRepo(s).get(1, 1)
+    assert statements == ["SELECT"]
+    assert (row.screen_state, row.cursor, row.payload) == ("menu", 2, {"page": 1})
+    assert row.updated_at != stamp
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_sessions_without_ui_rows_are_not_hooked():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    sf = make_session_factory(engine)
+    async with sf() as s:
+        await s.commit()
+        assert "ui_sessions.uow" not in s.info
+    async with sf() as s:
+        await UiSessionsRepo(s).upsert(1, 1, screen_state="menu")
+        await s.rollback()
+        await s.commit()
+    async with sf() as s:
+        assert await UiSessionsRepo(s).get(1, 1) is None
+    await engine.dispose()
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.infra.db import Base, make_session_factory
+from app.infra.db_models import Subscription
+from app.jobs.scheduler import CronSpec, Scheduler
+from app.repositories.subscriptions import SubscriptionsRepo
+
+
+UTC = timezone.utc
+
+
+def test_cron_next_after_respects_timezone():
+    spec = CronSpec.parse("0 9 * * *")
+    after = datetime(2024, 1, 10, 12, 0, tzinfo=UTC)
+    assert spec.next_after(after) == datetime(2024, 1, 11, 9, 0, tzinfo=UTC)
+    # 09:00 in Berlin (UTC+1 in winter) is 08:00 UTC, still ahead of 07:00 UTC
+    early = datetime(2024, 1, 10, 7, 0, tzinfo=UTC)
+    assert spec.next_after(early, ZoneInfo("Europe/Berlin")) == datetime(2024, 1, 10, 8, 0, tzinfo=UTC)
+
+
+def test_cron_fields_steps_ranges_and_aliases():
+    spec = CronSpec.parse("*/15 8-10 * * 1-5")
+    assert spec.minutes == {0, 15, 30, 45}
+    assert spec.hours == {8, 9, 10}
+    # Saturday 2024-01-13 -> next Monday 08:00
+    assert spec.next_after(datetime(2024, 1, 13, 9, 0, tzinfo=UTC)) == datetime(2024, 1, 15, 8, 0, tzinfo=UTC)
+    assert CronSpec.parse("@daily") == CronSpec.parse("0 0 * * *")
+    assert CronSpec.parse("0 0 * * 7").weekdays == {0}
+    for bad in ("0 9 * *", "60 * * * *", "*/0 * * * *"):
+        with pytest.raises(ValueError):
+            CronSpec.parse(bad)
+
+
+def test_cron_day_of_month_or_weekday():
+    # Both restricted: the 1st of the month OR any Monday
+    spec = CronSpec.parse("0 0 1 * 1")
+    after = datetime(2024, 1, 1, 0, 0, tzinfo=UTC)  # Monday the 1st, already fired
+    assert spec.next_after(after) == datetime(2024, 1, 8, 0, 0, tzinfo=UTC)
+
+
+@pytest.mark.asyncio
+async def test_scheduler_fires_due_entries_in_batches():
+    sched = Scheduler()
+    fired: list[list[str]] = []
+
+    async def handler(items):
+        fired.append(sorted(k for k, _ in items))
+        return {}
+
+    sched.register("j", handler)
+    now = datetime.now(UTC)
+    sched.schedule("j", "b", now - timedelta(seconds=1))
+    sched.schedule("j", "a", now - timedelta(seconds=2))
+    sched.schedule("j", "later", now + timedelta(hours=1))
+    await asyncio.sleep(0.05)
+    assert fired == [["a", "b"]]
+    sched.reset("j")
+    await sched.stop()
+
+
+@pytest.mark.asyncio
+async def test_failed_handler_is_retried_with_its_slot():
+    sched = Scheduler(retry_seconds=0.02)
+    calls: list[datetime] = []
+
+    async def handler(items):
+        calls.append(items[0][1])
+        if len(calls) == 1:
+            raise RuntimeError("db blip")
+        return {}
+
+    sched.register("j", handler)
+    slot = datetime.now(UTC) - timedelta(seconds=1)
+    sched.schedule("j", "k", slot)
+    await asyncio.sleep(0.15)
+    await sched.stop()
+    assert calls == [slot, slot]
+
+
+@pytest.mark.asyncio
+async def test_claim_runs_is_compare_and_set():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    sf = make_session_factory(engine)
+    slot = datetime(2024, 1, 10, 9, 0, tzinfo=UTC)
+    nxt = slot + timedelta(days=1)
+    async with sf() as s:
+        s.add(Subscription(user_id=1, kind="daily", schedule_cron="0 9 * * *", enabled=True))
+        s.add(Subscription(user_id=2, kind="daily", schedule_cron="0 9 * * *", enabled=True))
+        await s.commit()
+        repo = SubscriptionsRepo(s)
+        await repo.set_next_runs([(1, "daily", slot), (2, "daily", slot)])
+        await s.commit()
+        first = await repo.claim_runs([(1, "daily"), (2, "daily")], slot, nxt)
+        second = await repo.claim_runs([(1, "daily"), (2, "daily")], slot, nxt)
+        await s.commit()
+    assert sorted(first) == [(1, "daily"), (2, "daily")]
+    assert second == []
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_claim_runs_splits_large_slots():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    sf = make_session_factory(engine)
+    slot = datetime(2024, 1, 10, 9, 0, tzinfo=UTC)
+    keys = [(u, "daily") for u in range(1200)]
+    async with sf() as s:
+        repo = SubscriptionsRepo(s)
+        await repo.upsert_many([(u, k, "0 9 * * *", True) for u, k in keys])
+        await repo.set_next_runs([(u, k, slot) for u, k in keys])
+        await s.commit()
+        params: list[int] = []
+        event.listen(
+            engine.sync_engine,
+            "before_cursor_execute",
+            lambda *a: a[2].startswith("UPDATE") and params.append(len(a[3])),
+        )
+        claimed = await repo.claim_runs(keys, slot, slot + timedelta(days=1))
+        await s.commit()
+    assert sorted(claimed) == keys
+    assert len(params) == 3 and max(params) <= 999
+    await engine.dispose()
+
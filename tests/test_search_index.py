@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.config import AppConfig
+from app.domain.models import SearchParams
+from app.domain.normalization import normalize_item
+from app.infra.db import Base, make_session_factory
+from app.infra.redis import InMemoryStore
+from app.infra.search_index import IndexQuery, MemoryIndex, search_pages
+from app.repositories.vacancies import VacanciesRepo
+
+
+def _item(i: int, title: str, city: str = "London", days: int = 0, salary: int | None = 40000) -> dict:
+    return {
+        "title": title,
+        "company": {"display_name": f"Co {i}"},
+        "location": {"display_name": f"{city}, UK" if "," not in city else city},
+        "created": (datetime.now(timezone.utc) - timedelta(days=days)).isoformat(),
+        "redirect_url": f"u{i}",
+        "salary_min": salary,
+        "salary_max": None,
+        "category": {"label": "IT Jobs", "tag": "it-jobs"},
+        "description": f"Listing {i}: {title.lower()} wanted.",
+    }
+
+
+class Adzuna:
+    def __init__(self):
+        self.calls = 0
+
+    async def search_pages(self, params, *, what=None, where=None, salary_min=None, country="gb"):
+        self.calls += 1
+        yield [_item(99, "From API")]
+
+
+@pytest.mark.asyncio
+async def test_memory_index_matches_adzuna_filters():
+    idx = MemoryIndex(None, fresh_seconds=3600, max_docs=100)  # type: ignore[arg-type]
+    idx.add([
+        normalize_item(_item(1, "Python Developer")),
+        normalize_item(_item(2, "Senior Python Developer", city="Leeds")),
+        normalize_item(_item(3, "Python Developer", days=10)),
+        normalize_item(_item(4, "Python Developer", salary=20000)),
+        normalize_item(_item(5, "Java Developer")),
+        normalize_item(_item(6, "Python Developer", city="Hackney, London", days=1)),
+    ])
+
+    hits = await idx.search(IndexQuery(what="python developer"), 10)
+    assert {h["redirect_url"] for h in hits} == {"u1", "u2", "u3", "u4", "u6"}
+    hits = await idx.search(
+        IndexQuery(what="Python developer", where="london", max_days_old=7, salary_min=30000), 10
+    )
+    # Any part of the location matches, not only the first
+    assert [h["redirect_url"] for h in hits] == ["u1", "u6"]
+    assert [h["location"]["display_name"] for h in hits] == ["London, UK", "Hackney, London"]
+    assert normalize_item(hits[0])["title"] == "Python Developer"  # type: ignore[arg-type]
+    assert await idx.search(IndexQuery(what="rust"), 10) == []
+
+    # Re-adding replaces the document; the oldest is evicted past max_docs
+    idx.max_docs = 4
+    idx.add([normalize_item(_item(5, "Java Developer"))])
+    assert len(idx) == 4
+    assert {h["redirect_url"] for h in await idx.search(IndexQuery(), 10)} == {"u3", "u4", "u6", "u5"}
+
+
+@pytest.mark.asyncio
+async def test_search_pages_serves_only_queries_adzuna_answered_recently():
+    idx = MemoryIndex(None, fresh_seconds=3600)  # type: ignore[arg-type]
+    idx.add([normalize_item(_item(i, "Python Developer")) for i in range(3)])
+    adzuna, store, cfg = Adzuna(), InMemoryStore(), AppConfig()
+    cfg.index.min_results = 3
+    params = SearchParams(max_days_old=14, sort="relevance")
+
+    async def run(**kw):
+        return [p async for p in search_pages(idx, adzuna, store, cfg, params, **kw)]  # type: ignore[arg-type]
+
+    # Enough local hits, but Adzuna has not answered this query yet
+    assert [[h["title"] for h in p] for p in await run(what="python")] == [["From API"]]
+    pages = await run(what="Python ")
+    assert len(pages) == 1 and len(pages[0]) == 3 and adzuna.calls == 1
+
+    # Another query, or too few hits, goes to Adzuna
+    await run(what="python", where="London")
+    assert adzuna.calls == 2
+    cfg.index.min_results = 4
+    await run(what="python")
+    assert adzuna.calls == 3
+
+    # Stale documents no longer count as local hits
+    cfg.index.min_results = 1
+    idx.fresh_seconds = -1
+    await run(what="python")
+    assert adzuna.calls == 4
+
+
+@pytest.mark.asyncio
+async def test_memory_index_warms_from_vacancies():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    sf = make_session_factory(engine)
+    async with sf() as s:
+        await VacanciesRepo(s).upsert_many(
+            [normalize_item(_item(i, "Python Developer", city="Hackney, London")) for i in range(3)]
+        )
+        await s.commit()
+
+    idx = MemoryIndex(sf, fresh_seconds=3600, max_docs=2)
+    await idx.warm()
+    hits = await idx.search(IndexQuery(what="python", where="London"), 10)
+    assert len(idx) == 2 and len(hits) == 2
+    assert hits[0]["location"]["display_name"] == "Hackney, London"
+    assert all(h["description"].endswith("python developer wanted.") for h in hits)
+    await engine.dispose()
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import event, func, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.infra.db import Base, bulk_upsert, make_session_factory, row_params, rows_per_statement, upsert_stmt
+from app.infra.db_models import Applied, BlacklistCompany, Favorite, Subscription, User
+from app.domain.normalization import UNKNOWN_COMPANY
+from app.repositories.applied import AppliedRepo
+from app.repositories.blacklist import BlacklistRepo
+from app.repositories.favorites import FavoritesRepo
+from app.repositories.profiles import ProfilesRepo
+from app.repositories.subscriptions import SubscriptionsRepo
+from app.repositories.users import UsersRepo
+
+
+async def _factory():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    return engine, make_session_factory(engine)
+
+
+def _count_statements(engine) -> list[str]:
+    seen: list[str] = []
+    event.listen(engine.sync_engine, "before_cursor_execute", lambda *a: seen.append(a[2]))
+    return seen
+
+
+@pytest.mark.asyncio
+async def test_batched_adds_are_single_idempotent_statements():
+    engine, sf = await _factory()
+    seen = _count_statements(engine)
+    async with sf() as s:
+        await FavoritesRepo(s).add_many([(1, "u1"), (1, "u2"), (2, "u1"), (1, "u1")])
+        await FavoritesRepo(s).add(1, "u1")
+        await BlacklistRepo(s).add_many([(1, "Acme"), (1, "Acme")])
+        await AppliedRepo(s).mark_many([(1, "u1"), (2, "u1")])
+        await s.commit()
+    assert sum(q.lstrip().upper().startswith("INSERT") for q in seen) == 4
+    assert not any(q.lstrip().upper().startswith("SELECT") for q in seen)
+    async with sf() as s:
+        assert await s.scalar(select(func.count()).select_from(Favorite)) == 3
+        assert await s.scalar(select(func.count()).select_from(BlacklistCompany)) == 1
+        assert await s.scalar(select(func.count()).select_from(Applied)) == 2
+
+
+@pytest.mark.asyncio
+async def test_mark_refreshes_existing_expiry():
+    _, sf = await _factory()
+    async with sf() as s:
+        await AppliedRepo(s).mark(1, "u1", ttl_seconds=0)
+        await s.commit()
+        first = await s.scalar(select(Applied.expire_at))
+        await AppliedRepo(s).mark(1, "u1", ttl_seconds=3600)
+        await s.commit()
+        assert await s.scalar(select(Applied.expire_at)) > first
+
+
+@pytest.mark.asyncio
+async def test_subscription_upsert_resets_next_run_only_on_cron_change():
+    _, sf = await _factory()
+    at = datetime(2030, 1, 1, tzinfo=timezone.utc)
+    async with sf() as s:
+        repo = SubscriptionsRepo(s)
+        await repo.upsert_many([(1, "digest", "0 9 * * *", True), (2, "digest", "0 9 * * *", True)])
+        await repo.set_next_runs([(1, "digest", at), (2, "digest", at)])
+        await repo.upsert_many([(1, "digest", "0 9 * * *", False), (2, "digest", "0 18 * * *", True)])
+        await s.commit()
+        rows = {r.user_id: r for r in (await s.execute(select(Subscription))).scalars()}
+    assert rows[1].enabled is False and rows[1].next_run_at is not None
+    assert rows[2].schedule_cron == "0 18 * * *" and rows[2].next_run_at is None
+
+
+@pytest.mark.asyncio
+async def test_upserts_refresh_loaded_rows():
+    _, sf = await _factory()
+    async with sf() as s:
+        users = UsersRepo(s)
+        await users.upsert(1, "ru", "Ann")
+        await users.upsert(1, "en")
+        assert (await s.get(User, 1)).full_name == "Ann"
+        assert await users.get_lang(1) == "en"
+        profiles = ProfilesRepo(s)
+        fields = dict(
+            employment_types=None, skills=[], locations=[], salary_min=0,
+            salary_max=None, formats=[], experience_yrs=0,
+        )
+        await profiles.upsert(1, role="dev", **fields)
+        assert (await profiles.get(1)).role == "dev"
+        await profiles.upsert(1, role="qa", **fields)
+        assert (await profiles.get(1)).role == "qa"
+        await profiles.upsert_many([{"user_id": 2, "role": "pm", **fields}])
+        assert set(await profiles.get_many([1, 2])) == {1, 2}
+
+
+@pytest.mark.asyncio
+async def test_blacklist_is_normalized_on_write_and_read():
+    _, sf = await _factory()
+    async with sf() as s:
+        repo = BlacklistRepo(s)
+        assert await repo.companies(7) == frozenset()
+        await repo.add(7, "  Acme  GmbH ")
+        await repo.add(7, UNKNOWN_COMPANY)
+        s.add(BlacklistCompany(user_id=7, company="Initech  LLC"))  # stored before normalization
+        await s.commit()
+        assert await repo.companies(7) == {"acme gmbh", "initech llc"}
+
+
+class _PgSession:
+    # Enough of a session for rows_per_statement/upsert_stmt to pick Postgres
+    def get_bind(self):
+        return self
+
+    dialect = postgresql.dialect()
+
+
+@pytest.mark.asyncio
+async def test_chunks_count_python_side_defaults():
+    engine, sf = await _factory()
+    params: list[int] = []
+    event.listen(engine.sync_engine, "before_cursor_execute", lambda *a: a[2].startswith("INSERT") and params.append(len(a[3])))
+    async with sf() as s:
+        # added_at is filled in per row although callers never pass it
+        await bulk_upsert(s, Favorite, ({"user_id": 1, "redirect_url": f"u{i}"} for i in range(1200)))
+        await s.commit()
+        assert await s.scalar(select(func.count()).select_from(Favorite)) == 1200
+    assert len(params) == 4 and max(params) <= 999
+
+    pg = _PgSession()
+    n = rows_per_statement(pg, row_params(Subscription))
+    rows = [{"user_id": i, "kind": "digest", "schedule_cron": "0 9 * * *"} for i in range(n)]
+    compiled = upsert_stmt(pg, Subscription, rows).compile(dialect=pg.dialect)
+    assert len(compiled.params) <= 32767
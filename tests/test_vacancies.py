@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import event, func, select
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.config import AppConfig, CorpusConfig, Settings
+from app.infra.db import Base, make_session_factory
+from app.infra.db_models import Vacancy
+from app.integrations.adzuna_client import AdzunaClient
+from app.jobs.corpus import VacancyCorpus
+from app.repositories.vacancies import VacanciesRepo
+from app.telemetry.metrics import REGISTRY
+
+
+def _item(i: int) -> dict:
+    return {
+        "title": f"Dev {i}",
+        "company": {"display_name": "Acme"},
+        "location": {"display_name": "Berlin, DE"},
+        "created": datetime.now(timezone.utc).isoformat(),
+        "redirect_url": f"u{i}",
+        "salary_min": 3000,
+        "salary_max": None,
+        "category": {"label": "IT Jobs", "tag": "it-jobs"},
+        "description": "<p>React</p>",
+    }
+
+
+class Resp:
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {"results": [_item(1), _item(2)]}
+
+
+class Client:
+    async def get(self, url, params):
+        return Resp()
+
+
+@pytest.mark.asyncio
+async def test_fetched_results_land_in_vacancies(monkeypatch):
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    sf = make_session_factory(engine)
+    corpus = VacancyCorpus(sf, CorpusConfig(max_pending=3))
+    cfg = AppConfig()
+    cfg.search.cache_ttl_seconds = 0
+    adzuna = AdzunaClient(Settings(ADZUNA_APP_ID="id", ADZUNA_APP_KEY="key"), cfg, sink=corpus.add)
+    monkeypatch.setattr(adzuna, "_client_or_create", lambda: Client())
+
+    await adzuna.search("gb", 1, 10)
+    assert await corpus.flush() == 2
+    async with sf() as s:
+        first = {v.vacancy_hash: v for v in (await s.execute(select(Vacancy))).scalars()}
+    assert {v.title for v in first.values()} == {"Dev 1", "Dev 2"}
+    assert all(v.city_region == "Berlin" and v.category_tag == "it-jobs" for v in first.values())
+
+    # Seen again: refreshed in place, not duplicated; the buffer is bounded
+    await adzuna.search("gb", 1, 10)
+    await adzuna.search("gb", 1, 10)
+    assert await corpus.flush() == 3
+    async with sf() as s:
+        assert await s.scalar(select(func.count()).select_from(Vacancy)) == 2
+        again = {v.vacancy_hash: v for v in (await s.execute(select(Vacancy))).scalars()}
+    for h, v in again.items():
+        assert v.first_seen_at == first[h].first_seen_at
+        assert v.last_seen_at >= first[h].last_seen_at
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_batches_respect_the_parameter_limit_and_failed_flushes_count_as_dropped(monkeypatch):
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    sf = make_session_factory(engine)
+    inserts: list[int] = []
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _count(conn, cursor, statement, params, *args):
+        if statement.startswith("INSERT"):
+            inserts.append(len(params))
+
+    corpus = VacancyCorpus(sf, CorpusConfig(batch_size=500))
+    corpus.add([_item(i) for i in range(200)])
+    assert await corpus.flush() == 200
+    # 14 columns per vacancy row: at most 71 rows under sqlite's 999 parameters
+    assert len(inserts) == 3 and max(inserts) <= 999
+
+    async def boom(self, jobs, chunk=None):
+        raise RuntimeError("db down")
+
+    monkeypatch.setattr(VacanciesRepo, "upsert_many", boom)
+    dropped = REGISTRY.counter("vacancies_dropped").value()
+    corpus.add([_item(1), _item(2)])
+    with pytest.raises(RuntimeError):
+        await corpus.flush()
+    assert REGISTRY.counter("vacancies_dropped").value() == dropped + 2
+    await engine.dispose()
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+
+from app.infra.redis import InMemoryStore
+from app.infra.sharding import ShardLeases, shard_of
+from app.infra.webhook import SECRET_HEADER, WebhookIngress
+
+
+UPDATE = {"update_id": 7, "message": {"message_id": 1, "date": 0, "chat": {"id": 5, "type": "private"}, "text": "hi"}}
+
+
+class FakeDispatcher:
+    def __init__(self):
+        self.fed: list[int] = []
+        self.gate = asyncio.Event()
+
+    async def feed_update(self, bot, update):
+        await self.gate.wait()
+        self.fed.append(update.update_id)
+
+
+async def _client(ingress: WebhookIngress) -> TestClient:
+    app = web.Application()
+    ingress.setup(app, "/hook")
+    client = TestClient(TestServer(app))
+    await client.start_server()
+    return client
+
+
+@pytest.mark.asyncio
+async def test_webhook_checks_secret_and_queues():
+    dp = FakeDispatcher()
+    ingress = WebhookIngress(dp, bot=None, secret="s3cret", queue_size=1, workers=1)
+    client = await _client(ingress)
+    try:
+        assert (await client.post("/hook", json=UPDATE)).status == 401
+        assert (await client.post("/hook", json=UPDATE, headers={SECRET_HEADER: "nope"})).status == 401
+        assert (await client.post("/hook", data="{", headers={SECRET_HEADER: "s3cret"})).status == 400
+        # Workers not started: first update fills the queue, second is pushed back to Telegram
+        assert (await client.post("/hook", json=UPDATE, headers={SECRET_HEADER: "s3cret"})).status == 200
+        assert (await client.post("/hook", json=UPDATE, headers={SECRET_HEADER: "s3cret"})).status == 503
+        ingress.start()
+        dp.gate.set()
+        await ingress.stop()
+        assert dp.fed == [7]
+    finally:
+        await client.close()
+
+
+def _update(update_id: int, chat_id: int) -> dict:
+    msg = {"message_id": update_id, "date": 0, "chat": {"id": chat_id, "type": "private"}, "text": "x"}
+    return {"update_id": update_id, "message": msg}
+
+
+class RecordingDispatcher:
+    def __init__(self):
+        self.fed: list[tuple[int, int]] = []
+
+    async def feed_update(self, bot, update):
+        # Yield so updates from different chats interleave across workers
+        await asyncio.sleep(0.001 * (update.update_id % 3))
+        self.fed.append((update.message.chat.id, update.update_id))
+
+
+@pytest.mark.asyncio
+async def test_updates_of_one_chat_stay_in_order():
+    dp = RecordingDispatcher()
+    ingress = WebhookIngress(dp, bot=None, secret="s", queue_size=100, workers=4)
+    client = await _client(ingress)
+    ingress.start()
+    try:
+        for i in range(30):
+            resp = await client.post("/hook", json=_update(i, 100 + i % 3), headers={SECRET_HEADER: "s"})
+            assert resp.status == 200
+        await ingress.stop()
+    finally:
+        await client.close()
+    for chat in (100, 101, 102):
+        ids = [u for c, u in dp.fed if c == chat]
+        assert ids == sorted(ids) and len(ids) == 10
+
+
+@pytest.mark.asyncio
+async def test_leases_split_shards_and_fail_over():
+    store = InMemoryStore()
+    a = ShardLeases(store, 4, "http://a", ttl=30, max_owned=2)
+    b = ShardLeases(store, 4, "http://b", ttl=30, max_owned=2)
+    await a.renew()
+    await b.renew()
+    assert len(a.owned) == 2 and a.owned.isdisjoint(b.owned)
+    assert a.owned | b.owned == {0, 1, 2, 3}
+    await a.release()
+    b.max_owned = 4
+    await b.renew()
+    assert b.owned == {0, 1, 2, 3}
+    assert shard_of(12345, 4) == shard_of(12345, 4)
+
+
+@pytest.mark.asyncio
+async def test_leases_rebalance_to_fair_share_when_a_replica_joins():
+    store = InMemoryStore()
+    a = ShardLeases(store, 4, "http://a")
+    b = ShardLeases(store, 4, "http://b")
+    await a.renew()
+    assert a.owned == {0, 1, 2, 3}
+    await b.renew()  # nothing free yet, but b now counts as live
+    assert b.owned == set()
+    await a.renew()
+    await b.renew()
+    assert len(a.owned) == len(b.owned) == 2 and a.owned | b.owned == {0, 1, 2, 3}
+    # Another process's lease is never extended or dropped by a stale holder
+    (shard, *_) = b.owned
+    assert not await store.expire_if_eq(f"bot:shard:{shard}", "http://a", 30)
+    assert not await store.delete_if_eq(f"bot:shard:{shard}", "http://a")
+    assert await a.owner_of(shard) == "http://b"
+
+
+@pytest.mark.asyncio
+async def test_update_for_foreign_shard_is_forwarded_to_owner():
+    store = InMemoryStore()
+    owner_dp, front_dp = RecordingDispatcher(), RecordingDispatcher()
+    owner_leases = ShardLeases(store, 2, "", max_owned=1)
+    owner = WebhookIngress(owner_dp, bot=None, secret="s", leases=owner_leases)
+    owner_client = await _client(owner)
+    owner_url = str(owner_client.make_url(""))
+    owner_leases.owner = owner_url
+    await owner_leases.renew()
+    front_leases = ShardLeases(store, 2, "http://front")
+    await front_leases.renew()
+    front = WebhookIngress(front_dp, bot=None, secret="s", leases=front_leases)
+    front_client = await _client(front)
+    owner.start()
+    front.start()
+    try:
+        (foreign,) = owner_leases.owned
+        chat = next(c for c in range(1000) if shard_of(c, 2) == foreign)
+        resp = await front_client.post("/hook", json=_update(1, chat), headers={SECRET_HEADER: "s"})
+        assert resp.status == 200
+        await owner.stop()
+        await front.stop()
+        assert owner_dp.fed == [(chat, 1)] and front_dp.fed == []
+    finally:
+        await owner_client.close()
+        await front_client.close()